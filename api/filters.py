@@ -1,12 +1,15 @@
 import django_filters
+from rest_framework import filters
 
+from products.categories import get_category_tree
 from products.models import Product
+from products.search import order_by_rank, search_products
 
 
 class ProductFilter(django_filters.FilterSet):
     """Filter for Product model."""
 
-    category = django_filters.CharFilter(field_name='category__slug')
+    category = django_filters.CharFilter(method='filter_category')
     min_price = django_filters.NumberFilter(
         field_name='price', lookup_expr='gte'
     )
@@ -18,3 +21,32 @@ class ProductFilter(django_filters.FilterSet):
     class Meta:
         model = Product
         fields = ['category', 'min_price', 'max_price', 'is_active']
+
+    def filter_category(self, queryset, name, value):
+        """Filter by category slug including its subcategories."""
+        tree = get_category_tree()
+        category = tree.get_by_slug(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(
+            category_id__in=tree.descendant_ids(category.pk)
+        )
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """Full-text product search ranked by relevance.
+
+    Results are ordered by relevance unless the request asks for an
+    explicit ordering, so place this backend after ``OrderingFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter queryset with the product search index."""
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        queryset = search_products(queryset, query)
+        if request.query_params.get(
+                filters.OrderingFilter.ordering_param):
+            return queryset
+        return order_by_rank(queryset)
@@ -0,0 +1,84 @@
+from functools import partial
+
+from rest_framework.response import Response
+
+from products.conditional import (get_list_validators, get_object_validators,
+                                  make_etag, respond_conditionally)
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve requests for unchanged data with 304.
+
+    Lists are validated by the count and latest ``updated_at`` of the
+    filtered queryset, objects by their own ``updated_at``. Relations
+    named in ``etag_related`` are serialized with each row, so their
+    ``updated_at`` is taken into account too. Subclasses customize
+    listing by overriding ``list_response`` and may serve validators
+    from a cache by overriding ``get_list_validators``.
+    """
+
+    etag_related: tuple[str, ...] = ()
+
+    def get_request_parts(self) -> tuple:
+        """Return request state the response depends on."""
+        return (self.request.build_absolute_uri(),
+                self.request.accepted_media_type,
+                self.request.user.is_staff)
+
+    def get_list_validators(self) -> tuple:
+        """Return count and latest change of the filtered rows."""
+        return get_list_validators(
+            self.filter_queryset(self.get_queryset()), self.etag_related
+        )
+
+    def list(self, request, *args, **kwargs):
+        """List rows unless the client copy is current."""
+        return respond_conditionally(
+            request,
+            make_etag(self.get_list_validators(), *self.get_request_parts()),
+            partial(self.list_response, request, *args, **kwargs)
+        )
+
+    def list_response(self, request, *args, **kwargs):
+        """Return rendered list of rows."""
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Serialize the object unless the client copy is current.
+
+        Last-Modified is only sent here: on lists, deleted rows change
+        the count but not the latest timestamp.
+        """
+        instance = self.get_object()
+        validators = get_object_validators(instance, self.etag_related)
+        return respond_conditionally(
+            request, make_etag(validators, *self.get_request_parts()),
+            lambda: Response(self.get_serializer(instance).data),
+            last_modified=max(filter(None, validators))
+        )
+
+
+class ValuesListMixin:
+    """Serve list actions from ``.values()`` rows.
+
+    ``values_serializer_class`` reproduces the output of the regular
+    serializer, so responses keep their shape while skipping model
+    instances and DRF field machinery for every row.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        """List rows through the values serializer."""
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class(
+            self.get_serializer_context()
+        )
+        queryset = serializer.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
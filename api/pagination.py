@@ -0,0 +1,89 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from products.pagination import (CachedCountPaginator, InvalidCursor,
+                                 KeysetPaginator, get_cached_count)
+
+
+class HybridPagination(PageNumberPagination):
+    """Page number pagination with an opt-in keyset (cursor) mode.
+
+    Passing ``cursor`` (empty for the first page) switches to keyset
+    pagination over the current ordering plus ``id``: no OFFSET scans
+    and no COUNT unless ``count=true`` is requested. Views setting
+    ``cache_count = True`` read totals from the catalog count cache.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate by cursor when requested, by page number otherwise."""
+        self.request = request
+        self.cursor_page = None
+        if not self.uses_cursor(request):
+            self.django_paginator_class = (
+                CachedCountPaginator if getattr(view, 'cache_count', False)
+                else PageNumberPagination.django_paginator_class
+            )
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            self.cursor_page = KeysetPaginator(
+                queryset, page_size
+            ).page(cursor)
+        except InvalidCursor as e:
+            raise NotFound(str(e)) from e
+
+        self.cursor_count = None
+        count_requested = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() in ('1', 'true')
+        if count_requested:
+            self.cursor_count = (
+                get_cached_count(queryset)
+                if getattr(view, 'cache_count', False)
+                else queryset.count()
+            )
+        return self.cursor_page.object_list
+
+    def uses_cursor(self, request) -> bool:
+        """Return whether the request asks for keyset pagination."""
+        return self.cursor_query_param in request.query_params
+
+    def get_paginated_response(self, data):
+        """Return page number or keyset envelope for the page."""
+        if self.cursor_page is None:
+            return super().get_paginated_response(data)
+        payload = {'next': self.get_next_cursor_link()}
+        if self.cursor_count is not None:
+            payload['count'] = self.cursor_count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_cursor_link(self) -> str | None:
+        """Return URL of the following keyset page."""
+        if not self.cursor_page.has_next():
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.cursor_page.next_cursor
+        )
+
+
+class KeysetPagination(HybridPagination):
+    """Keyset pagination, starting at the first page without a cursor."""
+
+    def uses_cursor(self, request) -> bool:
+        """Always paginate by cursor."""
+        return True
@@ -1,11 +1,18 @@
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
 from drf_spectacular.utils import extend_schema_field
 from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from orders.models import Order, OrderItem
-from products.models import Category, Product, Review
+from products.media import get_url_builder
+from products.models import (DEFAULT_PRODUCT_IMAGE_URL, Category, Product,
+                             Review, describe_rendition)
 
 user_model = get_user_model()
 
@@ -46,14 +53,31 @@ class ProductSerializer(serializers.ModelSerializer):
     """Serializer for Product model."""
     category = CategorySerializer(read_only=True)
     category_id = serializers.IntegerField(write_only=True)
+    get_image_url = serializers.SerializerMethodField(
+        method_name='get_card_image_url'
+    )
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = (
             'id', 'name', 'slug', 'description', 'category', 'category_id',
-            'price', 'image', 'get_image_url', 'is_active', 'stock'
+            'price', 'image', 'get_image_url', 'images', 'is_active', 'stock'
         )
-        read_only_fields = ('id', 'slug', 'get_image_url')
+        read_only_fields = ('id', 'slug', 'get_image_url', 'images')
+
+    @extend_schema_field(serializers.CharField())
+    def get_card_image_url(self, obj: Product) -> str:
+        """Return URL of the product card image."""
+        return obj.get_rendition_url('card')
+
+    @extend_schema_field(serializers.DictField())
+    def get_images(self, obj: Product) -> dict[str, dict]:
+        """Return URLs and sizes of all resized images."""
+        return {
+            name: obj.get_rendition(name)
+            for name in obj.image_renditions or {}
+        }
 
     def create(self, validated_data):
         """Create product with category_id."""
@@ -69,6 +93,19 @@ class ProductSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ProductRatingSerializer(serializers.ModelSerializer):
+    """Serializer for stored rating summary of a product."""
+    histogram = serializers.ListField(
+        source='rating_histogram', child=serializers.DictField(),
+        read_only=True
+    )
+
+    class Meta:
+        model = Product
+        fields = ('id', 'rating_avg', 'rating_count', 'histogram')
+        read_only_fields = fields
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Serializer for Review model."""
 
@@ -82,6 +119,9 @@ class ReviewSerializer(serializers.ModelSerializer):
 
 class OrderItemSerializer(serializers.ModelSerializer):
     """Serializer for OrderItem model."""
+    total = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = OrderItem
@@ -92,14 +132,17 @@ class OrderItemSerializer(serializers.ModelSerializer):
 class OrderSerializer(serializers.ModelSerializer):
     """Serializer for Order model."""
     items = OrderItemSerializer(many=True, write_only=True)
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = Order
         fields = (
             'id', 'status', 'get_status_display', 'shipping_address',
-            'total_price', 'items', 'created_at'
+            'total_price', 'items_count', 'items', 'created_at'
         )
-        read_only_fields = ('id', 'created_at')
+        read_only_fields = ('id', 'items_count', 'created_at')
 
     def create(self, validated_data):
         """Create order with items."""
@@ -156,7 +199,12 @@ class CartItemSerializer(serializers.Serializer):
     product_id = serializers.IntegerField(read_only=True)
     product = ProductSerializer(read_only=True)
     quantity = serializers.IntegerField(read_only=True)
-    total_price = serializers.CharField(read_only=True)
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
     name = serializers.CharField(read_only=True)
     stock = serializers.IntegerField(read_only=True)
 
@@ -167,13 +215,15 @@ class CartSerializer(serializers.Serializer):
     total_price = serializers.SerializerMethodField()
     items_count = serializers.SerializerMethodField()
 
-    @extend_schema_field(serializers.CharField())
+    @extend_schema_field(
+        serializers.DecimalField(max_digits=12, decimal_places=2)
+    )
     def get_total_price(self, obj) -> str:
         """Get total cart price from session cart."""
         cart = obj.get('cart_instance')
         if cart:
-            return cart.get_total_price()
-        return "$0.00"
+            return str(cart.get_total_price())
+        return '0.00'
 
     @extend_schema_field(serializers.IntegerField())
     def get_items_count(self, obj) -> int:
@@ -182,3 +232,152 @@ class CartSerializer(serializers.Serializer):
         if cart:
             return len(cart)
         return 0
+
+
+RAW_VALUE_FIELDS = (
+    serializers.BooleanField, serializers.CharField,
+    serializers.IntegerField, serializers.PrimaryKeyRelatedField,
+)
+
+
+def make_mapper(source: str, field: serializers.Field
+                ) -> Callable[[dict], Any]:
+    """Return function reading a field from a ``.values()`` row.
+
+    Columns the database already returns in their JSON form are read
+    as they are; others go through the field's ``to_representation``.
+    """
+    if isinstance(field, RAW_VALUE_FIELDS):
+        return itemgetter(source)
+    to_representation = field.to_representation
+
+    def mapper(row: dict) -> Any:
+        value = row[source]
+        return None if value is None else to_representation(value)
+    return mapper
+
+
+class ValuesSerializer:
+    """Read-only serializer of ``.values()`` rows for list actions.
+
+    Produces the same output as ``serializer_class`` without model
+    instances or per-row field lookups: row mappers are compiled once
+    per request. Fields built from several columns are produced by
+    ``represent_<field>`` methods reading the extra ``columns``.
+    """
+
+    serializer_class: type[serializers.ModelSerializer]
+    columns: tuple[str, ...] = ()
+
+    def __init__(self, context: dict[str, Any] | None = None) -> None:
+        self.context = context or {}
+        self.lookups = dict.fromkeys(self.columns)
+        self.mappers = []
+        fields = self.serializer_class(context=self.context).fields
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+            method = getattr(self, f'represent_{name}', None)
+            if method is None:
+                if field.source == '*' or isinstance(
+                        field, serializers.BaseSerializer):
+                    raise ImproperlyConfigured(
+                        f'{type(self).__name__} needs represent_{name}()'
+                    )
+                method = make_mapper(field.source, field)
+                self.lookups[field.source] = None
+            self.mappers.append((name, method))
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        """Return rows to serialize, keeping columns cursors need."""
+        ordering = [
+            field.lstrip('-') for field in
+            queryset.query.order_by or queryset.model._meta.ordering
+            if isinstance(field, str) and field != '?'
+        ]
+        return queryset.values(*dict.fromkeys([
+            *self.lookups, *ordering, *queryset.query.annotation_select
+        ]))
+
+    def to_representation(self, row: dict) -> dict[str, Any]:
+        """Return representation of a single row."""
+        return {name: mapper(row) for name, mapper in self.mappers}
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict[str, Any]]:
+        """Return representations of all rows."""
+        return [self.to_representation(row) for row in rows]
+
+
+class CategoryValuesSerializer(ValuesSerializer):
+    """Category list rows in the shape of ``CategorySerializer``."""
+
+    serializer_class = CategorySerializer
+    columns = ('parent', 'parent__name', 'parent__slug')
+
+    def represent_parent(self, row: dict) -> dict | None:
+        """Return nested parent data."""
+        if row['parent'] is None:
+            return None
+        return {'id': row['parent'], 'name': row['parent__name'],
+                'slug': row['parent__slug']}
+
+
+class ProductValuesSerializer(ValuesSerializer):
+    """Product list rows in the shape of ``ProductSerializer``."""
+
+    serializer_class = ProductSerializer
+    columns = (
+        'category', 'category__name', 'category__slug', 'category__parent',
+        'category__parent__name', 'category__parent__slug', 'image',
+        'image_renditions',
+    )
+
+    def __init__(self, context: dict[str, Any] | None = None) -> None:
+        super().__init__(context)
+        self.url = get_url_builder(Product._meta.get_field('image').storage)
+        request = self.context.get('request')
+        self.absolute_url = request.build_absolute_uri if request else None
+
+    def represent_category(self, row: dict) -> dict[str, Any]:
+        """Return nested category with its parent."""
+        parent = row['category__parent']
+        return {
+            'id': row['category'],
+            'name': row['category__name'],
+            'slug': row['category__slug'],
+            'parent': None if parent is None else {
+                'id': parent,
+                'name': row['category__parent__name'],
+                'slug': row['category__parent__slug'],
+            },
+        }
+
+    def represent_image(self, row: dict) -> str | None:
+        """Return URL of the original image."""
+        if not row['image']:
+            return None
+        url = self.url(row['image'])
+        return self.absolute_url(url) if self.absolute_url else url
+
+    def represent_get_image_url(self, row: dict) -> str:
+        """Return URL of the product card image."""
+        rendition = describe_rendition(
+            (row['image_renditions'] or {}).get('card'), self.url
+        )
+        if rendition:
+            return rendition['url']
+        if row['image']:
+            return self.url(row['image'])
+        return DEFAULT_PRODUCT_IMAGE_URL
+
+    def represent_images(self, row: dict) -> dict[str, dict]:
+        """Return URLs and sizes of all resized images."""
+        renditions = row['image_renditions'] or {}
+        return {name: describe_rendition(renditions[name], self.url)
+                for name in renditions}
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    """Review list rows in the shape of ``ReviewSerializer``."""
+
+    serializer_class = ReviewSerializer
@@ -2,9 +2,9 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 
-from .views import (CartViewSet, CategoryViewSet, CustomTokenObtainPairView,
-                    OrderViewSet, ProductViewSet, ReviewViewSet,
-                    UserRegistrationView, UserViewSet)
+from .views import (CartViewSet, CatalogCacheStatsView, CategoryViewSet,
+                    CustomTokenObtainPairView, OrderViewSet, ProductViewSet,
+                    ReviewViewSet, UserRegistrationView, UserViewSet)
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
@@ -31,5 +31,9 @@ urlpatterns = [
         'users/register/', UserRegistrationView.as_view(),
         name='user_register'
     ),
+    path(
+        'cache/stats/', CatalogCacheStatsView.as_view(),
+        name='catalog_cache_stats'
+    ),
     path('', include(router.urls)),
 ]
@@ -1,26 +1,41 @@
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from api.filters import ProductFilter
+from api.filters import ProductFilter, ProductSearchFilter
+from api.mixins import ConditionalGetMixin, ValuesListMixin
+from api.pagination import KeysetPagination
 from api.permissions import IsAdminOrReadOnly, IsOwnerOrAdminOrReadOnly
 from api.serializers import (CartSerializer, CategorySerializer,
-                             OrderSerializer, ProductSerializer,
-                             ReviewSerializer, UserRegistrationSerializer,
-                             UserSerializer)
+                             CategoryValuesSerializer, OrderSerializer,
+                             ProductRatingSerializer, ProductSerializer,
+                             ProductValuesSerializer, ReviewSerializer,
+                             ReviewValuesSerializer,
+                             UserRegistrationSerializer, UserSerializer)
 from orders.cart import Cart as SessionCart
 from orders.models import Order
+from products.cache import get_cache_stats, get_or_build, get_stock_stamps
+from products.conditional import make_etag, respond_conditionally
+from products.categories import get_category_tree
 from products.models import Category, Product, Review
 
 user_model = get_user_model()
 
 
+def get_row_ids(data) -> list[int]:
+    """Return ids of the rows of a list response, paginated or not."""
+    rows = data['results'] if isinstance(data, dict) else data
+    return [row['id'] for row in rows]
+
+
 @extend_schema_view(
     list=extend_schema(
         summary="List Categories",
@@ -54,11 +69,13 @@ user_model = get_user_model()
         tags=["Categories"]
     ),
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, ValuesListMixin,
+                      viewsets.ModelViewSet):
     """ViewSet for managing product categories."""
 
-    queryset = Category.objects.all()
+    queryset = Category.objects.select_related('parent')
     serializer_class = CategorySerializer
+    values_serializer_class = CategoryValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (
         DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter
@@ -66,6 +83,68 @@ class CategoryViewSet(viewsets.ModelViewSet):
     search_fields = ('name',)
     ordering_fields = ('name', 'created_at')
     ordering = ('name',)
+    cache_count = True
+    etag_related = ('parent',)
+
+    def get_list_validators(self) -> tuple:
+        """Return validators from the category tree unless filtered."""
+        if set(self.request.query_params) - {'page'}:
+            return super().get_list_validators()
+        categories = get_category_tree().all()
+        return len(categories), max(
+            (category.updated_at for category in categories), default=None
+        )
+
+    def list_response(self, request, *args, **kwargs):
+        """List categories, from the category tree unless filtered."""
+        if set(request.query_params) - {'page'}:
+            return super().list_response(request, *args, **kwargs)
+        categories = get_category_tree().all()
+        page = self.paginate_queryset(categories)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.get_serializer(categories, many=True).data)
+
+    @extend_schema(
+        summary="Category Ancestors",
+        description="Get parent categories from the root down",
+        tags=["Categories"]
+    )
+    @action(detail=True, methods=['get'])
+    def ancestors(self, request, pk=None):
+        """Return parents of a category from the root down."""
+        tree = get_category_tree()
+        category = self._get_tree_category(tree, pk)
+        serializer = self.get_serializer(
+            tree.ancestors(category.pk), many=True
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        summary="Category Descendants",
+        description="Get all subcategories of a category",
+        tags=["Categories"]
+    )
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        """Return all subcategories of a category."""
+        tree = get_category_tree()
+        category = self._get_tree_category(tree, pk)
+        serializer = self.get_serializer(
+            tree.descendants(category.pk), many=True
+        )
+        return Response(serializer.data)
+
+    def _get_tree_category(self, tree, pk) -> Category:
+        """Return category from tree or raise 404."""
+        try:
+            category = tree.get(int(pk))
+        except (TypeError, ValueError):
+            category = None
+        if category is None:
+            raise NotFound()
+        return category
 
 
 @extend_schema_view(
@@ -100,19 +179,22 @@ class CategoryViewSet(viewsets.ModelViewSet):
         tags=["Products"]
     ),
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """ViewSet for managing products with filtering and search."""
 
-    queryset = Product.objects.all().select_related('category')
+    queryset = Product.objects.all().select_related('category__parent')
     serializer_class = ProductSerializer
+    values_serializer_class = ProductValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (
-        DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter
+        DjangoFilterBackend, filters.OrderingFilter, ProductSearchFilter
     )
     filterset_class = ProductFilter
-    search_fields = ('name', 'description')
     ordering_fields = ('price', 'created_at', 'name')
     ordering = ('-created_at',)
+    cache_count = True
+    etag_related = ('category', 'category__parent')
 
     def get_queryset(self):
         """Filter products by active status for non-admin users."""
@@ -121,6 +203,79 @@ class ProductViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=True)
         return queryset
 
+    def get_list_validators(self) -> tuple:
+        """Return validators, from the catalog cache for non-staff users.
+
+        They only depend on filters, so all orderings and pages of a
+        filtered list share one cache entry.
+        """
+        if self.request.user.is_staff:
+            return super().get_list_validators()
+        params = self.request.query_params.copy()
+        for name in ('ordering', 'page', 'page_size', 'cursor', 'count'):
+            params.pop(name, None)
+        validators, _ = get_or_build(
+            'api_product_list_etag', params, super().get_list_validators
+        )
+        return validators
+
+    def list(self, request, *args, **kwargs):
+        """List products, serving non-staff users from the catalog cache.
+
+        Sales only expire cached lists showing the products sold, so
+        the stock stamps of listed products are part of the ETag.
+        """
+        if request.user.is_staff:
+            return super().list(request, *args, **kwargs)
+        list_products = super().list_response
+
+        def build_data():
+            return list_products(request, *args, **kwargs).data
+
+        params = request.query_params.copy()
+        params['host'] = request.get_host()
+        data, hit = get_or_build(
+            'api_product_list', params, build_data, stocked=get_row_ids
+        )
+        etag = make_etag(
+            self.get_list_validators(),
+            sorted(get_stock_stamps(get_row_ids(data)).items()),
+            *self.get_request_parts()
+        )
+        return respond_conditionally(request, etag, lambda: Response(
+            data, headers={'X-Cache': 'HIT' if hit else 'MISS'}
+        ))
+
+    @extend_schema(
+        summary="Product Reviews",
+        description="Get reviews of a product, newest first, by cursor",
+        tags=["Products"]
+    )
+    @action(
+        detail=True, methods=['get'], serializer_class=ReviewSerializer,
+        pagination_class=KeysetPagination
+    )
+    def reviews(self, request, pk=None):
+        """Return a keyset page of reviews of a product."""
+        product = self.get_object()
+        page = self.paginate_queryset(
+            product.reviews.order_by('-created_at', '-id')
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        summary="Product Rating",
+        description="Get average rating and 5 to 1 star histogram",
+        tags=["Products"]
+    )
+    @action(
+        detail=True, methods=['get'], serializer_class=ProductRatingSerializer
+    )
+    def rating(self, request, pk=None):
+        """Return the stored rating summary of a product."""
+        return Response(self.get_serializer(self.get_object()).data)
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -154,15 +309,18 @@ class ProductViewSet(viewsets.ModelViewSet):
         tags=["Reviews"]
     ),
 )
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ValuesListMixin,
+                    viewsets.ModelViewSet):
     """ViewSet for managing product reviews."""
 
     queryset = Review.objects.all().select_related('user', 'product')
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrAdminOrReadOnly)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     ordering_fields = ('created_at', 'rating')
     ordering = ('-created_at',)
+    cache_count = True
 
     def perform_create(self, serializer):
         """Set the user when creating a review."""
@@ -219,7 +377,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
 class OrderViewSet(viewsets.ModelViewSet):
     """ViewSet for managing customer orders."""
 
-    queryset = Order.objects.all().prefetch_related('items__product')
+    queryset = Order.objects.alias(total_price=F('subtotal'))
     serializer_class = OrderSerializer
     permission_classes = (IsAuthenticated, IsOwnerOrAdminOrReadOnly)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
@@ -229,11 +387,10 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter orders by user (all for staff, own orders for users)."""
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
-            return Order.objects.all().prefetch_related('items__product')
-        return Order.objects.filter(
-            user=self.request.user
-        ).prefetch_related('items__product')
+            return queryset
+        return queryset.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         """Set the user when creating an order."""
@@ -352,6 +509,22 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@extend_schema(
+    summary="Catalog Cache Stats",
+    description="Hit and miss counters of the catalog cache (admin only)",
+    tags=["Products"],
+    responses={200: None}
+)
+class CatalogCacheStatsView(APIView):
+    """View exposing catalog cache hit and miss counters."""
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """Return hit and miss counters per cached namespace."""
+        return Response(get_cache_stats())
+
+
 @extend_schema(
     summary="User Registration",
     description="Create new user account",
@@ -495,15 +668,7 @@ class CartViewSet(viewsets.ViewSet):
 
     def _prepare_cart_data(self, cart):
         """Prepare cart data for serialization."""
-        items = []
-        for item in cart:
-            try:
-                product = Product.objects.get(id=item['product_id'])
-                item['product'] = product
-                items.append(item)
-            except Product.DoesNotExist:
-                continue
-
+        items = list(cart.items_with_products())
         return {'items': items, 'cart_instance': cart}
 
 
@@ -0,0 +1,28 @@
+from typing import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from config.query_budget import (check_budget, get_endpoint_name,
+                                 record_queries, report_problems)
+
+
+class QueryBudgetMiddleware:
+    """Record query count and DB time per view and enforce budgets."""
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.2f}'
+        endpoint = get_endpoint_name(request)
+        if endpoint is not None:
+            report_problems(check_budget(endpoint, recorder))
+        return response
@@ -0,0 +1,133 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when an endpoint exceeds its query budget."""
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce SQL statement to its shape, dropping literal values."""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = shape.replace('%s', '?')
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryRecorder:
+    """Execute wrapper recording SQL statements and their duration."""
+
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries.append(sql)
+
+    @property
+    def count(self) -> int:
+        """Return number of recorded queries."""
+        return len(self.queries)
+
+    def repeated_shapes(self, threshold: int | None = None
+                        ) -> list[tuple[str, int]]:
+        """Return query shapes executed at least ``threshold`` times."""
+        if threshold is None:
+            threshold = settings.QUERY_BUDGET_DUPLICATE_THRESHOLD
+        shapes = Counter(normalize_sql(sql) for sql in self.queries)
+        return [(shape, times) for shape, times in shapes.most_common()
+                if times >= threshold]
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Record all queries executed on the default connection."""
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+
+def get_endpoint_name(request: HttpRequest) -> str | None:
+    """Return budget key for the resolved view of a request.
+
+    DRF viewset actions are keyed as ``<basename>.<action>``, regular
+    views by their namespaced URL name.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    actions = getattr(match.func, 'actions', None)
+    initkwargs = getattr(match.func, 'initkwargs', None) or {}
+    if actions and initkwargs.get('basename'):
+        action = actions.get(request.method.lower())
+        if action:
+            return f"{initkwargs['basename']}.{action}"
+    return match.view_name
+
+
+def get_budget(endpoint: str | None) -> int:
+    """Return configured query budget for endpoint."""
+    return settings.QUERY_BUDGETS.get(
+        endpoint, settings.QUERY_BUDGET_DEFAULT
+    )
+
+
+def check_budget(endpoint: str | None, recorder: QueryRecorder,
+                 budget: int | None = None) -> list[str]:
+    """Return budget violations and suspected N+1 query shapes."""
+    if budget is None:
+        budget = get_budget(endpoint)
+    problems = []
+    if recorder.count > budget:
+        problems.append(
+            f'{endpoint}: {recorder.count} queries exceed budget of {budget}'
+        )
+    for shape, times in recorder.repeated_shapes():
+        problems.append(
+            f'{endpoint}: suspected N+1, query repeated {times} times: '
+            f'{shape}'
+        )
+    return problems
+
+
+def report_problems(problems: list[str]) -> None:
+    """Raise or log budget problems depending on settings."""
+    if not problems:
+        return
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded('\n'.join(problems))
+    for problem in problems:
+        logger.warning(problem)
+
+
+@contextmanager
+def assert_query_budget(endpoint: str | None = None,
+                        budget: int | None = None
+                        ) -> Iterator[QueryRecorder]:
+    """Fail if wrapped code exceeds budget or repeats query shapes."""
+    with record_queries() as recorder:
+        yield recorder
+    problems = check_budget(endpoint, recorder, budget)
+    if problems:
+        raise QueryBudgetExceeded('\n'.join(problems))
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.utils import timezone
+from django.contrib.sessions.backends.cached_db import \
+    SessionStore as CachedDBStore
+
+
+class SessionStore(CachedDBStore):
+    """Cached database sessions with write-behind to the database.
+
+    Every change is written to the cache, while the ``django_session``
+    row is refreshed at most once per
+    ``SESSION_WRITE_BEHIND_INTERVAL`` seconds for each session. Cart
+    updates therefore stop rewriting the table on every request.
+
+    A change made within the interval only reaches the database with
+    a later save of the session or with the ``flush_session_writes``
+    command, which should run once per interval. Changes still held
+    only by the cache are lost if the entry is evicted or the cache is
+    restarted before that; the database copy is then served as it was
+    last written. Requires a cache shared by all processes.
+    """
+
+    cache_key_prefix = 'config.sessions'
+
+    @property
+    def sync_key(self) -> str:
+        """Return cache key marking a recent database write."""
+        return f'{self.cache_key}:synced'
+
+    def save(self, must_create: bool = False) -> None:
+        """Save session to the cache and, when due, to the database."""
+        interval = settings.SESSION_WRITE_BEHIND_INTERVAL
+        if not interval:
+            super().save(must_create=must_create)
+        elif must_create or self.session_key is None:
+            super().save(must_create=must_create)
+            self._cache.set(self.sync_key, True, interval)
+        elif self._cache.add(self.sync_key, True, interval):
+            super().save()
+        else:
+            self._cache.set(
+                self.cache_key, self._get_session(), self.get_expiry_age()
+            )
+
+    def delete(self, session_key: str | None = None) -> None:
+        """Delete session from the cache and the database."""
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key:
+            self._cache.delete(f'{self.cache_key_prefix}{key}:synced')
+
+    @classmethod
+    def flush_pending(cls, batch_size: int) -> int:
+        """Write cached sessions that are ahead of their database copy.
+
+        Active sessions are compared in primary key batches, each
+        costing one read of the table and one cache lookup. Returns the
+        number of sessions written.
+        """
+        model = cls.get_model_class()
+        decoder = cls()
+        last_key = ''
+        flushed = 0
+        while True:
+            rows = list(
+                model.objects.filter(
+                    session_key__gt=last_key, expire_date__gt=timezone.now()
+                ).order_by('session_key').values_list(
+                    'session_key', 'session_data'
+                )[:batch_size]
+            )
+            if not rows:
+                return flushed
+            last_key = rows[-1][0]
+            cached = decoder._cache.get_many(
+                [cls.cache_key_prefix + key for key, _ in rows]
+            )
+            pending = []
+            for key, data in rows:
+                session = cached.get(cls.cache_key_prefix + key)
+                if session is not None and session != decoder.decode(data):
+                    pending.append(cls(key).create_model_instance(session))
+            model.objects.bulk_update(
+                pending, ['session_data', 'expire_date']
+            )
+            flushed += len(pending)
@@ -40,6 +40,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -123,7 +124,7 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_PAGINATION_CLASS': (
-        'rest_framework.pagination.PageNumberPagination'
+        'api.pagination.HybridPagination'
     ),
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -202,6 +203,8 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Uploads larger than this are streamed to a temporary file on disk
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -212,7 +215,17 @@ LOGOUT_REDIRECT_URL = '/products'
 
 
 # Session settings
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Set SESSION_ENGINE=config.sessions with a cache shared by all processes
+# (e.g. Redis) to keep cart writes off the session table, and run
+# "manage.py flush_session_writes --loop" to bound the database lag.
+SESSION_ENGINE = os.getenv(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db'
+)
+SESSION_CACHE_ALIAS = os.getenv('SESSION_CACHE_ALIAS', 'default')
+SESSION_WRITE_BEHIND_INTERVAL = int(
+    os.getenv('SESSION_WRITE_BEHIND_INTERVAL', '60')
+)
+SESSION_CLEANUP_BATCH_SIZE = 1000
 SESSION_COOKIE_AGE = 1209600
 SESSION_COOKIE_SECURE = False  # Set to True in production
 SESSION_COOKIE_HTTPONLY = True
@@ -227,10 +240,85 @@ CSRF_TRUSTED_ORIGINS = ['http://localhost', 'http://127.0.0.1']
 # Cart settings
 CART_SESSION_ID = 'cart'
 
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'hop-and-barley'),
+    }
+}
+
+# Catalog read cache, invalidated by product, category and review changes
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = 300
+CATALOG_CACHE_NAMESPACES = (
+    'product_list', 'product_detail', 'api_product_list',
+    'product_list_etag', 'api_product_list_etag',
+)
+
 # Pagination settings
 PRODUCTS_PER_PAGE = 9
+REVIEWS_PER_PAGE = 10
 ORDERS_PER_PAGE = 10
 
+# Query budget settings
+# Per-endpoint SQL query budgets. HTML views are keyed by URL name,
+# API viewset actions by "<basename>.<action>".
+QUERY_BUDGET_ENABLED = (
+    os.getenv('QUERY_BUDGET_ENABLED', 'False').lower() == 'true'
+)
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False').lower() == 'true'
+QUERY_BUDGET_DEFAULT = 20
+QUERY_BUDGET_DUPLICATE_THRESHOLD = 3
+QUERY_BUDGETS = {
+    'products:product-list': 6,
+    'products:product-detail': 5,
+    'orders:cart_detail': 4,
+    'orders:checkout': 25,
+    'orders:order_list': 5,
+    'users:account': 6,
+    'category.list': 5,
+    'category.retrieve': 4,
+    'category.ancestors': 2,
+    'category.descendants': 2,
+    'category.create': 6,
+    'category.update': 5,
+    'category.partial_update': 5,
+    'category.destroy': 8,
+    'product.list': 6,
+    'product.retrieve': 4,
+    'product.create': 10,
+    'product.update': 9,
+    'product.partial_update': 9,
+    'product.destroy': 11,
+    'product.reviews': 3,
+    'product.rating': 2,
+    'review.list': 5,
+    'review.retrieve': 4,
+    'review.create': 8,
+    'review.update': 8,
+    'review.partial_update': 8,
+    'review.destroy': 8,
+    'order.list': 5,
+    'order.retrieve': 5,
+    'order.create': 10,
+    'order.update': 6,
+    'order.partial_update': 6,
+    'order.destroy': 8,
+    'order.cancel': 8,
+    'user.list': 4,
+    'user.retrieve': 3,
+    'user.me': 2,
+    'user.update_me': 4,
+    'cart.list': 3,
+    'cart.create': 4,
+    'cart.update': 4,
+    'cart.destroy': 4,
+    'cart.clear': 2,
+}
+
 # Order statuses
 ORDER_STATUS_PENDING = 'pending'
 ORDER_STATUS_PLACED = 'placed'
@@ -255,6 +343,12 @@ CANCELLABLE_STATUSES = [
     ORDER_STATUS_PAID,
 ]
 
+# Cancellable statuses whose orders already took their stock
+STOCK_TAKEN_STATUSES = [
+    ORDER_STATUS_PLACED,
+    ORDER_STATUS_PAID,
+]
+
 # Payment methods
 PAYMENT_METHOD_CARD = 'card'
 PAYMENT_METHOD_CASH_ON_DELIVERY = 'cash_on_delivery'
@@ -424,6 +518,12 @@ CATEGORY_SPECIFICATIONS = {
     }
 }
 
+# Full-text product search
+# PostgreSQL text search configuration
+PRODUCT_SEARCH_CONFIG = 'english'
+# SQLite bm25 column weights for name and description
+PRODUCT_SEARCH_WEIGHTS = (10.0, 1.0)
+
 # Default specifications for unknown categories
 DEFAULT_CATEGORY_SPECIFICATIONS = {
     'type': 'Brewing Ingredient',
@@ -448,6 +548,16 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 DEFAULT_FROM_EMAIL = 'noreply@hopandbarley.com'
 ADMIN_EMAIL = 'admin@hopandbarley.com'
 
+# Email outbox worker
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after each attempt
+EMAIL_OUTBOX_LEASE = 300  # seconds a worker may take to send its batch
+
+# Stock reservation
+STOCK_HOLD_TTL = 900  # seconds a checkout may hold stock before payment
+STOCK_HOLD_SWEEP_BATCH_SIZE = 500
+
 # Email templates
 PASSWORD_RESET_EMAIL_SUBJECT = 'Password Reset - Hop & Barley'
 PASSWORD_RESET_EMAIL_TEMPLATE = '''
@@ -572,3 +682,28 @@ Reset session cleared
 ==================================================
 ''',
 }
+
+# Product image renditions
+# Boxes (width, height) each rendition is scaled down to cover, about
+# 1.5x the size they are displayed at; stored as JPEG and WebP.
+PRODUCT_IMAGE_RENDITIONS = {
+    'card': (420, 370),
+    'detail': (960, 726),
+    'cart': (240, 240),
+}
+PRODUCT_IMAGE_FORMATS = ('jpeg', 'webp')
+PRODUCT_IMAGE_QUALITY = 80
+MEDIA_PIPELINE_WORKERS = int(os.getenv('MEDIA_PIPELINE_WORKERS', '4'))
+
+# Profile images
+# Uploads are re-encoded without metadata, capped to AVATAR_MAX_DIMENSION
+# and cropped into square renditions about 2x their display size.
+AVATAR_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+AVATAR_MAX_PIXELS = 25_000_000
+AVATAR_MAX_DIMENSION = 512
+AVATAR_RENDITIONS = {
+    'small': 80,
+    'medium': 160,
+}
+AVATAR_FORMATS = ('jpeg', 'webp')
+AVATAR_QUALITY = 80
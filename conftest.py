@@ -1,6 +1,7 @@
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import RequestFactory
 from rest_framework.test import APIClient
 
@@ -17,6 +18,14 @@ def django_db_setup(django_db_setup, django_db_blocker):
         pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     """API client for testing API endpoints."""
@@ -187,6 +196,14 @@ def mock_media_root(django_settings, tmp_path):
     return settings
 
 
+@pytest.fixture
+def query_budget(settings):
+    """Enforce per-endpoint query budgets on every test client request."""
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_RAISE = True
+    return settings
+
+
 @pytest.fixture
 def mock_static_root(django_settings, tmp_path):
     """Use temporary directory for static files during testing."""
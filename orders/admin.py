@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.contrib.admin import TabularInline
 from django.db.models import QuerySet
 
-from orders.models import Order, OrderItem
+from orders.models import (Order, OrderItem, OutboxEmail, ReviewEligibility,
+                           StockHold)
 
 
 class OrderItemInline(TabularInline):
@@ -24,11 +25,14 @@ class OrderAdmin(admin.ModelAdmin):
     """
     inlines = [OrderItemInline]
     list_display = (
-        'id', 'user', 'status', 'total_price', 'created_at', 'updated_at'
+        'id', 'user', 'status', 'items_count', 'subtotal', 'created_at',
+        'updated_at'
     )
     list_filter = ('status', 'created_at', 'updated_at')
     search_fields = ('user__username', 'user__email', 'id')
-    readonly_fields = ('total_price', 'created_at', 'updated_at')
+    readonly_fields = (
+        'subtotal', 'items_count', 'created_at', 'updated_at'
+    )
     ordering = ('-created_at',)
 
     def get_queryset(self, request) -> QuerySet[Order]:
@@ -52,3 +56,55 @@ class OrderItemAdmin(admin.ModelAdmin):
     def get_queryset(self, request) -> QuerySet[OrderItem]:
         """Get queryset with optimized queries."""
         return super().get_queryset(request).select_related('order', 'product')
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Admin interface for queued emails.
+
+    Shows delivery status and errors of emails sent by the outbox worker.
+    """
+    list_display = (
+        'id', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at'
+    )
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'order__id')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+    raw_id_fields = ('order',)
+
+
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    """Read-only admin interface for stock held by pending checkouts.
+
+    Holds are only changed through reservations, which keep
+    ``Product.reserved`` in step with them.
+    """
+    list_display = ('id', 'order', 'product', 'quantity', 'expires_at')
+    list_filter = ('expires_at',)
+    search_fields = ('order__id', 'product__name')
+    list_select_related = ('order__user', 'product')
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
+
+
+@admin.register(ReviewEligibility)
+class ReviewEligibilityAdmin(admin.ModelAdmin):
+    """Read-only admin interface for products users may review.
+
+    Rows follow order deliveries and are only changed by orders.
+    """
+    list_display = ('id', 'user', 'product', 'delivered_at')
+    list_filter = ('delivered_at',)
+    search_fields = ('user__email', 'product__name')
+    list_select_related = ('user', 'product')
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
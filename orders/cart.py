@@ -1,40 +1,54 @@
-from typing import Any
+from decimal import Decimal
+from typing import Any, Iterator
 
 from django.conf import settings
 from django.http import HttpRequest
 
+from products.cache import get_product_summaries
 from products.models import Product
+from products.money import from_cents, to_cents
+
+CART_VERSION = 2
 
 
 class Cart:
-    """Cart management class using Django sessions."""
+    """Cart management class using Django sessions.
+
+    The session holds a compact versioned payload mapping product ids
+    to ``[quantity, price_cents]``, the price being a snapshot taken
+    when the product was added. Names, images and stock are read
+    lazily from the shared product cache.
+    """
 
     def __init__(self, request: HttpRequest) -> None:
         """Initialize cart with session data."""
         self.session = request.session
-        cart = self.session.get(settings.CART_SESSION_ID)
-        if not cart:
-            cart = self.session[settings.CART_SESSION_ID] = {}
+        data = self.session.get(settings.CART_SESSION_ID)
+        if isinstance(data, dict) and data.get('v') == CART_VERSION:
+            self.cart = data['items']
+        elif data:
+            self.cart = self._migrate_cart_data(data)
+            self.save()
         else:
-            self._clean_cart_data(cart)
-        self.cart = cart
+            self.cart = {}
+        self._products = None
+        self._summaries = {}
 
     @staticmethod
-    def _clean_cart_data(cart: dict[str, Any]) -> None:
-        """Clean corrupted data in cart."""
-        items_to_remove = []
+    def _migrate_cart_data(cart: Any) -> dict[str, list[int]]:
+        """Convert a legacy cart of item dicts, dropping corrupted items."""
+        items = {}
+        if not isinstance(cart, dict):
+            return items
         for product_id, item in cart.items():
             try:
-                required_keys = ['quantity', 'price', 'name', 'stock']
-                if not all(key in item for key in required_keys):
-                    items_to_remove.append(product_id)
-                    continue
-                int(item['quantity'])
-                float(item['price'])
+                quantity = int(item['quantity'])
+                price = to_cents(item['price'])
             except (ValueError, TypeError, KeyError):
-                items_to_remove.append(product_id)
-        for product_id in items_to_remove:
-            del cart[product_id]
+                continue
+            if str(product_id).isdigit() and quantity > 0:
+                items[str(product_id)] = [quantity, price]
+        return items
 
     def add(self, product: Product, quantity: int = 1,
             override_quantity: bool = False) -> None:
@@ -44,29 +58,29 @@ class Cart:
 
         product_id = str(product.id)
         if product_id not in self.cart:
-            try:
-                price = float(product.price)
-            except (ValueError, TypeError):
-                price = 0.0
-            self.cart[product_id] = {
-                'quantity': quantity,
-                'price': price,
-                'name': product.name,
-                'image': product.image.url if product.image else None,
-                'stock': product.stock
-            }
+            self.cart[product_id] = [quantity, to_cents(product.price)]
+            if self._products is not None:
+                self._products[product.id] = product
+        elif override_quantity:
+            self.cart[product_id][0] = quantity
         else:
-            if override_quantity:
-                self.cart[product_id]['quantity'] = quantity
-            else:
-                self.cart[product_id]['quantity'] += quantity
-        if self.cart[product_id]['quantity'] > product.stock:
-            self.cart[product_id]['quantity'] = product.stock
+            self.cart[product_id][0] += quantity
+        if self.cart[product_id][0] > product.available_stock:
+            self.cart[product_id][0] = product.available_stock
 
         self.save()
 
     def save(self) -> None:
-        """Mark session as modified to ensure data persistence."""
+        """Store cart in session, leaving empty carts out of it.
+
+        Visitors who never add a product get no session write at all.
+        """
+        if self.cart:
+            self.session[settings.CART_SESSION_ID] = {
+                'v': CART_VERSION, 'items': self.cart
+            }
+        else:
+            self.session.pop(settings.CART_SESSION_ID, None)
         self.session.modified = True
 
     def remove(self, product: Product) -> None:
@@ -74,73 +88,99 @@ class Cart:
         product_id = str(product.id)
         if product_id in self.cart:
             del self.cart[product_id]
+            if self._products is not None:
+                self._products.pop(product.id, None)
             self.save()
 
+    def get_summaries(self) -> dict[int, dict[str, Any]]:
+        """Return display fields of all products in the cart."""
+        missing = [
+            int(product_id) for product_id in self.cart
+            if int(product_id) not in self._summaries
+        ]
+        if missing:
+            self._summaries.update(
+                get_product_summaries(missing, self._products)
+            )
+        return self._summaries
+
     def __iter__(self) -> Any:
         """Iterate over cart items with formatted data."""
-        for product_id, item in self.cart.items():
-            item_copy = item.copy()
-            try:
-                price = item_copy['price']
-                quantity = item_copy['quantity']
-                if isinstance(price, str):
-                    price = float(price.replace('$', ''))
-                else:
-                    price = float(price)
-                quantity = int(quantity)
-                if price <= 0 or quantity <= 0:
-                    continue
-                item_copy['price'] = f"${price:.2f}"
-                total_price = price * quantity
-                item_copy['total_price'] = f"${total_price:.2f}"
-                item_copy['product_id'] = product_id
-                yield item_copy
-            except (ValueError, TypeError):
+        summaries = self.get_summaries()
+        for product_id, (quantity, price) in self.cart.items():
+            summary = summaries.get(int(product_id))
+            if summary is None or price <= 0 or quantity <= 0:
                 continue
+            yield {
+                **summary,
+                'product_id': product_id,
+                'quantity': quantity,
+                'price_cents': price,
+                'price': from_cents(price),
+                'total_price': from_cents(price * quantity),
+            }
 
     def __len__(self) -> int:
         """Return total number of items in cart."""
-        return sum(int(item['quantity']) for item in self.cart.values())
+        return sum(quantity for quantity, _ in self.cart.values())
 
-    def get_total_price(self) -> str:
-        """Calculate and return total cart price."""
-        total = 0
+    def get_total_cents(self) -> int:
+        """Return total cart price in cents."""
+        return sum(
+            quantity * price for quantity, price in self.cart.values()
+            if quantity > 0 and price > 0
+        )
 
-        for item in self.cart.values():
-            try:
-                price = item['price']
-                quantity = item['quantity']
-                if isinstance(price, str):
-                    price = float(price.replace('$', ''))
-                else:
-                    price = float(price)
-                quantity = int(quantity)
-                if price > 0 and quantity > 0:
-                    subtotal = price * quantity
-                    total += subtotal
-            except (ValueError, TypeError):
-                continue
-        return f"${total:.2f}"
+    def get_total_price(self) -> Decimal:
+        """Return total cart price."""
+        return from_cents(self.get_total_cents())
 
     def clear(self) -> None:
         """Remove cart from session."""
-        del self.session[settings.CART_SESSION_ID]
         self.cart = {}
+        self._products = {}
         self.save()
 
     def get_product_quantity(self, product_id: int | str) -> int:
         """Get quantity of specific product in cart."""
-        quantity = self.cart.get(str(product_id), {}).get('quantity', 0)
-        return int(quantity) if quantity else 0
+        return self.cart.get(str(product_id), [0])[0]
+
+    def get_products(self) -> dict[int, Product]:
+        """Load all products in cart with a single query.
+
+        The result is kept on the cart instance and reused by every
+        caller within the same request.
+        """
+        if self._products is None:
+            product_ids = [int(product_id) for product_id in self.cart]
+            self._products = (
+                Product.objects.select_related(
+                    'category__parent'
+                ).in_bulk(product_ids) if product_ids else {}
+            )
+        return self._products
+
+    def items_with_products(self) -> Iterator[dict[str, Any]]:
+        """Iterate over cart items with their loaded products attached."""
+        products = self.get_products()
+        for item in self:
+            product = products.get(int(item['product_id']))
+            if product is None:
+                continue
+            item['product'] = product
+            yield item
 
     def update_stock_info(self) -> None:
-        """Update stock information for all products in cart."""
-        for product_id, item in self.cart.items():
-            try:
-                product = Product.objects.get(id=product_id)
-                item['stock'] = product.stock
-                if int(item['quantity']) > product.stock:
-                    item['quantity'] = product.stock
-            except Product.DoesNotExist:
+        """Drop deleted products and cap quantities to available stock."""
+        summaries = self.get_summaries()
+        changed = False
+        for product_id in list(self.cart):
+            summary = summaries.get(int(product_id))
+            if summary is None:
                 del self.cart[product_id]
-        self.save()
+                changed = True
+            elif self.cart[product_id][0] > summary['available_stock']:
+                self.cart[product_id][0] = summary['available_stock']
+                changed = True
+        if changed:
+            self.save()
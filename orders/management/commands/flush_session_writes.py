@@ -0,0 +1,44 @@
+"""
+Django management command for writing cached session changes to the database.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Write session changes held back by write-behind to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SESSION_CLEANUP_BATCH_SIZE,
+            help='Number of sessions compared per query'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep flushing every interval instead of exiting'
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE != 'config.sessions':
+            raise CommandError(
+                f'{settings.SESSION_ENGINE} does not hold back session '
+                'writes'
+            )
+        total = 0
+        while True:
+            total += SessionStore.flush_pending(options['batch_size'])
+            if not options['loop']:
+                break
+            time.sleep(settings.SESSION_WRITE_BEHIND_INTERVAL or 60)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Flushed {total} sessions')
+        )
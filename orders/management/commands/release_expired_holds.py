@@ -0,0 +1,45 @@
+"""
+Django management command for releasing expired stock holds.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.reservations import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Return stock held by abandoned checkouts to sale'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.STOCK_HOLD_SWEEP_BATCH_SIZE,
+            help='Number of holds released per transaction'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep sweeping instead of exiting when nothing expired'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30.0,
+            help='Seconds to wait between sweeps in loop mode'
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            total += release_expired_holds(options['batch_size'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Released {total} expired stock holds'
+        ))
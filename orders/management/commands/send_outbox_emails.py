@@ -0,0 +1,57 @@
+"""
+Django management command for delivering queued outbox emails.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.outbox import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = 'Send pending emails from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Number of emails sent per connection'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='Attempts before an email is marked as failed'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting when empty'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls in loop mode'
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_outbox_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Sent {total_sent} emails, {total_failed} failed'
+        ))
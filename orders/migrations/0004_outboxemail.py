@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_alter_order_created_at_alter_order_shipping_address_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(help_text='Email subject', max_length=255)),
+                ('body', models.TextField(help_text='Plain text email body')),
+                ('from_email', models.CharField(help_text='Sender address', max_length=254)),
+                ('recipients', models.JSONField(default=list, help_text='List of recipient addresses')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', help_text='Delivery status', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of delivery attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time of the next delivery attempt')),
+                ('last_error', models.TextField(blank=True, help_text='Error of the last failed attempt')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the email was queued')),
+                ('sent_at', models.DateTimeField(blank=True, help_text='When the email was delivered', null=True)),
+                ('order', models.ForeignKey(blank=True, help_text='Order the email is about', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='orders.order')),
+            ],
+            options={
+                'verbose_name': 'Outbox Email',
+                'verbose_name_plural': 'Outbox Emails',
+                'ordering': ['next_attempt_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx')],
+            },
+        ),
+    ]
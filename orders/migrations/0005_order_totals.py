@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:11
+
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def populate_order_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    orders = []
+    for row in OrderItem.objects.values('order_id').annotate(
+            subtotal=Sum(F('price') * F('quantity')),
+            items_count=Sum('quantity')).order_by():
+        orders.append(Order(
+            id=row['order_id'],
+            subtotal=row['subtotal'],
+            items_count=row['items_count'],
+        ))
+    Order.objects.bulk_update(
+        orders, ['subtotal', 'items_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='items_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Total quantity of items in the order'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Sum of item prices times quantities', max_digits=12),
+        ),
+        migrations.RunPython(
+            populate_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_query_indexes'),
+        ('products', '0013_product_reserved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(help_text='Held quantity')),
+                ('expires_at', models.DateTimeField(help_text='When the hold is released unless confirmed')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the hold was placed')),
+                ('order', models.ForeignKey(help_text='Order the stock is held for', on_delete=django.db.models.deletion.CASCADE, related_name='stock_holds', to='orders.order')),
+                ('product', models.ForeignKey(help_text='Held product', on_delete=django.db.models.deletion.CASCADE, related_name='stock_holds', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Stock Hold',
+                'verbose_name_plural': 'Stock Holds',
+                'ordering': ['expires_at', 'id'],
+                'indexes': [models.Index(fields=['expires_at'], name='stockhold_expires_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def populate_review_eligibility(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    ReviewEligibility = apps.get_model('orders', 'ReviewEligibility')
+    rows = OrderItem.objects.filter(order__status='delivered').values(
+        'order__user_id', 'product_id').annotate(
+            delivered_at=Min('order__updated_at')).order_by()
+    ReviewEligibility.objects.bulk_create([
+        ReviewEligibility(
+            user_id=row['order__user_id'],
+            product_id=row['product_id'],
+            delivered_at=row['delivered_at'],
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_stock_holds'),
+        ('products', '0014_product_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewEligibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivered_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When the product was first delivered to the user')),
+                ('product', models.ForeignKey(help_text='Delivered product', on_delete=django.db.models.deletion.CASCADE, related_name='review_eligibilities', to='products.product')),
+                ('user', models.ForeignKey(help_text='User who received the product', on_delete=django.db.models.deletion.CASCADE, related_name='review_eligibilities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Review Eligibility',
+                'verbose_name_plural': 'Review Eligibilities',
+                'constraints': [models.UniqueConstraint(fields=('user', 'product'), name='revieweligibility_user_product_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            populate_review_eligibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_review_eligibility'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time of the next delivery attempt, or end of the lease while sending'),
+        ),
+        migrations.AlterField(
+            model_name='outboxemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', help_text='Delivery status', max_length=10),
+        ),
+    ]
@@ -1,11 +1,15 @@
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models, transaction
 from django.db.models import F, Sum
+from django.utils import timezone
 
 from products.models import Product
+from products.stock import raise_unavailable, return_stock, take_stock
 
 
 class Order(models.Model):
@@ -39,6 +43,20 @@ class Order(models.Model):
         auto_now=True,
         help_text="When the order was last updated"
     )
+    subtotal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text="Sum of item prices times quantities"
+    )
+    items_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Total quantity of items in the order"
+    )
+
+    TOTAL_FIELDS = ('subtotal', 'items_count')
 
     def __str__(self) -> str:
         return f'{self.user.username} Order №{self.id} - status:{self.status}'
@@ -47,47 +65,123 @@ class Order(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
+        indexes = [
+            models.Index(
+                fields=['user', '-created_at'],
+                name='order_user_created_idx'
+            ),
+            models.Index(fields=['status'], name='order_status_idx'),
+            models.Index(
+                fields=['user', 'status'],
+                name='order_user_status_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> 'Order':
+        """Remember the stored status to detect delivery changes."""
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs) -> None:
+        """Save order without overwriting totals maintained by items.
+
+        Review eligibility of the ordered products is granted when the
+        order becomes delivered and revoked when it stops being so.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.TOTAL_FIELDS
+            ]
+        previous = getattr(self, '_saved_status', None)
+        super().save(*args, **kwargs)
+        self._saved_status = self.status
+        if previous == self.status:
+            return
+        if self.status == settings.ORDER_STATUS_DELIVERED:
+            ReviewEligibility.grant(self.user_id, self.items.values_list(
+                'product_id', flat=True
+            ).distinct())
+        elif previous == settings.ORDER_STATUS_DELIVERED:
+            ReviewEligibility.revoke_stale(self.user_id)
 
     @property
-    def total_price(self) -> str:
-        """Return total order amount as formatted string."""
-        total = self.items.aggregate(total=Sum(
-            F('price') * F('quantity')))['total'] or 0
-        return f"${total:.2f}"
+    def total_price(self) -> Decimal:
+        """Return total order amount."""
+        return self.subtotal
+
+    @staticmethod
+    def apply_totals_delta(
+            order_id: int, amount_delta, count_delta: int
+    ) -> None:
+        """Adjust stored totals of an order with a single UPDATE."""
+        if not amount_delta and not count_delta:
+            return
+        Order.objects.filter(pk=order_id).update(
+            subtotal=F('subtotal') + amount_delta,
+            items_count=F('items_count') + count_delta,
+        )
+
+    def recalculate_totals(self) -> None:
+        """Recompute stored totals from order items."""
+        totals = self.items.aggregate(
+            subtotal=Sum(F('price') * F('quantity')),
+            items_count=Sum('quantity'),
+        )
+        self.subtotal = totals['subtotal'] or 0
+        self.items_count = totals['items_count'] or 0
+        super().save(update_fields=list(self.TOTAL_FIELDS))
+
+    def get_quantities(self) -> dict[int, int]:
+        """Return ordered quantity per product id."""
+        return dict(
+            self.items.values('product_id').annotate(
+                total=Sum('quantity')
+            ).values_list('product_id', 'total').order_by()
+        )
 
     def reduce_stock(self) -> None:
-        """Reduce product stock when order is confirmed."""
-        with transaction.atomic():
-            for item in self.items.select_for_update().all():
-                product = item.product
-                if item.quantity > product.stock:
-                    raise ValidationError(
-                        f"Not enough '{product.name}'. "
-                        f"Available: {product.stock}"
-                    )
-                product.stock -= item.quantity
-                product.save(update_fields=['stock'])
+        """Reduce product stock when order is confirmed.
+
+        All products are decremented by a single conditional UPDATE that
+        only touches rows with enough unreserved stock left. If any
+        product falls short, nothing is changed and ValidationError is
+        raised. Checkout goes through stock holds instead.
+        """
+        quantities = self.get_quantities()
+        if quantities:
+            short = take_stock(quantities)
+            if short:
+                raise_unavailable(short)
 
     def restore_stock(self) -> None:
-        """Restore stock when order is canceled."""
-        with transaction.atomic():
-            for item in self.items.all():
-                product = item.product
-                product.stock += item.quantity
-                product.save(update_fields=['stock'])
+        """Restore stock of all items with a single UPDATE."""
+        return_stock(self.get_quantities())
 
     def can_be_canceled(self) -> bool:
         """Check if order can be canceled."""
         return self.status in settings.CANCELLABLE_STATUSES
 
     def cancel_order(self) -> None:
-        """Cancel order and restore stock."""
+        """Cancel order, releasing its holds and restoring taken stock.
+
+        Pending orders only hold stock, so nothing is returned to
+        stock for them, even once their holds expired.
+        """
+        from orders.reservations import release_holds
+
         if not self.can_be_canceled():
             raise ValidationError("This order cannot be canceled")
 
+        previous = self.status
         self.status = settings.ORDER_STATUS_CANCELED
         self.save()
-        self.restore_stock()
+        release_holds(self)
+        if previous in settings.STOCK_TAKEN_STATUSES:
+            self.restore_stock()
 
 
 class OrderItem(models.Model):
@@ -126,16 +220,271 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = 'Order Item'
         verbose_name_plural = 'Order Items'
+        indexes = [
+            models.Index(
+                fields=['product', 'order'],
+                name='orderitem_product_order_idx'
+            ),
+        ]
 
     def save(self, *args, **kwargs) -> None:
-        """Save order item with automatic price setting."""
+        """Save order item with automatic price setting.
+
+        Stored order totals are adjusted by the difference to the
+        previously saved item.
+        """
         if not self.price and self.product:
             self.price = self.product.price
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = OrderItem.objects.filter(pk=self.pk).values(
+                    'order_id', 'order__user_id', 'product_id', 'price',
+                    'quantity'
+                ).first()
+            super().save(*args, **kwargs)
+            self._sync_review_eligibility(previous)
+
+            amount = self.price * self.quantity
+            if previous is None:
+                self._apply_order_delta(self.order_id, amount, self.quantity)
+                return
+            old_amount = previous['price'] * previous['quantity']
+            if previous['order_id'] == self.order_id:
+                self._apply_order_delta(
+                    self.order_id, amount - old_amount,
+                    self.quantity - previous['quantity']
+                )
+            else:
+                self._apply_order_delta(
+                    previous['order_id'], -old_amount, -previous['quantity']
+                )
+                self._apply_order_delta(self.order_id, amount, self.quantity)
+
+    def _sync_review_eligibility(self, previous: dict | None) -> None:
+        """Grant review of a product added to a delivered order.
+
+        An item moved to another order or product also revokes what its
+        previous order no longer justifies.
+        """
+        if self.order.status == settings.ORDER_STATUS_DELIVERED:
+            ReviewEligibility.grant(self.order.user_id, [self.product_id])
+        if previous is not None and (
+                previous['order_id'], previous['product_id']
+        ) != (self.order_id, self.product_id):
+            ReviewEligibility.revoke_stale(previous['order__user_id'])
+
+    def _apply_order_delta(
+            self, order_id: int, amount_delta, count_delta: int
+    ) -> None:
+        """Apply totals delta in DB and on the cached order instance."""
+        Order.apply_totals_delta(order_id, amount_delta, count_delta)
+        if OrderItem.order.is_cached(self) and self.order.pk == order_id:
+            self.order.subtotal += amount_delta
+            self.order.items_count += count_delta
 
     @property
-    def total(self) -> str:
-        """Return total item cost (price × quantity) as formatted string."""
+    def total(self) -> Decimal:
+        """Return total item cost (price × quantity)."""
         if self.price is None or self.quantity is None:
-            return "$0.00"
-        return f"${(self.price * self.quantity):.2f}"
+            return Decimal('0.00')
+        return self.price * self.quantity
+
+
+class StockHold(models.Model):
+    """Stock reserved for an order until it is paid or the hold expires.
+
+    Held quantities are also counted in ``Product.reserved``, so the
+    available stock is ``stock - reserved`` without aggregating holds.
+    """
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='stock_holds',
+        help_text="Order the stock is held for"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_holds',
+        help_text="Held product"
+    )
+    quantity = models.PositiveIntegerField(
+        help_text="Held quantity"
+    )
+    expires_at = models.DateTimeField(
+        help_text="When the hold is released unless confirmed"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the hold was placed"
+    )
+
+    def __str__(self) -> str:
+        return (f'{self.quantity} x {self.product_id} '
+                f'(Order №{self.order_id})')
+
+    class Meta:
+        ordering = ['expires_at', 'id']
+        verbose_name = 'Stock Hold'
+        verbose_name_plural = 'Stock Holds'
+        indexes = [
+            models.Index(fields=['expires_at'], name='stockhold_expires_idx'),
+        ]
+
+
+class ReviewEligibility(models.Model):
+    """Product a user may review because an order of it was delivered.
+
+    Maintained by ``Order`` and ``OrderItem`` as orders reach or leave
+    the delivered status, so checking or batch loading eligibility is
+    an indexed lookup instead of a join over orders and their items.
+    """
+
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name='review_eligibilities',
+        help_text="User who received the product"
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='review_eligibilities',
+        help_text="Delivered product"
+    )
+    delivered_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the product was first delivered to the user"
+    )
+
+    def __str__(self) -> str:
+        return f'{self.user_id} may review {self.product_id}'
+
+    class Meta:
+        verbose_name = 'Review Eligibility'
+        verbose_name_plural = 'Review Eligibilities'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'product'],
+                name='revieweligibility_user_product_uniq'
+            ),
+        ]
+
+    @staticmethod
+    def grant(user_id: int, product_ids) -> None:
+        """Record delivered products, keeping earlier delivery times."""
+        ReviewEligibility.objects.bulk_create([
+            ReviewEligibility(user_id=user_id, product_id=product_id)
+            for product_id in product_ids
+        ], ignore_conflicts=True)
+
+    @staticmethod
+    def revoke_stale(user_id: int) -> None:
+        """Drop products of a user no delivered order contains anymore."""
+        ReviewEligibility.objects.filter(user_id=user_id).exclude(
+            product_id__in=OrderItem.objects.filter(
+                order__user_id=user_id,
+                order__status=settings.ORDER_STATUS_DELIVERED
+            ).values('product_id')
+        ).delete()
+
+    @staticmethod
+    def product_ids(user, product_ids=None) -> set[int]:
+        """Return ids of products the user may review, in one query.
+
+        Limited to product_ids when given, e.g. the products of a page.
+        """
+        if not user or not user.is_authenticated:
+            return set()
+        queryset = ReviewEligibility.objects.filter(user=user)
+        if product_ids is not None:
+            queryset = queryset.filter(product_id__in=list(product_ids))
+        return set(queryset.values_list('product_id', flat=True))
+
+
+class OutboxEmail(models.Model):
+    """Email queued for delivery by the outbox worker.
+
+    Emails are written in the same transaction as the order change that
+    triggers them and sent later in batches by the
+    ``send_outbox_emails`` management command.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='emails',
+        help_text="Order the email is about"
+    )
+    subject = models.CharField(
+        max_length=255,
+        help_text="Email subject"
+    )
+    body = models.TextField(
+        help_text="Plain text email body"
+    )
+    from_email = models.CharField(
+        max_length=254,
+        help_text="Sender address"
+    )
+    recipients = models.JSONField(
+        default=list,
+        help_text="List of recipient addresses"
+    )
+    status = models.CharField(
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        max_length=10,
+        help_text="Delivery status"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of delivery attempts"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time of the next delivery attempt, or end "
+                  "of the lease while sending"
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error of the last failed attempt"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the email was queued"
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the email was delivered"
+    )
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {", ".join(self.recipients)}'
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_due_idx'
+            ),
+        ]
@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from orders.models import Order, OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(
+        subject: str,
+        body: str,
+        recipients: list[str],
+        order: Order | None = None,
+        from_email: str | None = None
+) -> OutboxEmail:
+    """Queue email for delivery by the outbox worker.
+
+    Call inside the transaction that changes the order so the email is
+    only persisted when the change itself is committed.
+    """
+    return OutboxEmail.objects.create(
+        order=order,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Return exponential backoff delay after given number of attempts."""
+    base = settings.EMAIL_OUTBOX_RETRY_BACKOFF
+    return timedelta(seconds=base * 2 ** max(attempts - 1, 0))
+
+
+def claim_outbox_batch(batch_size: int, now,
+                       max_attempts: int | None = None) -> list[OutboxEmail]:
+    """Lease due emails to this worker in a short transaction.
+
+    Claimed emails are marked as sending until the lease runs out, so
+    other workers skip them without waiting on row locks. Emails of a
+    worker that died while sending are claimed again once their lease
+    expires, unless that attempt was their last one; those are marked
+    as failed instead. The attempt is counted when claimed.
+    """
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    with transaction.atomic():
+        OutboxEmail.objects.filter(
+            status=OutboxEmail.STATUS_SENDING,
+            next_attempt_at__lte=now,
+            attempts__gte=max_attempts,
+        ).update(
+            status=OutboxEmail.STATUS_FAILED,
+            last_error='Lease expired before delivery was recorded',
+        )
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=(OutboxEmail.STATUS_PENDING,
+                            OutboxEmail.STATUS_SENDING),
+                next_attempt_at__lte=now,
+                attempts__lt=max_attempts,
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+            status=OutboxEmail.STATUS_SENDING,
+            attempts=F('attempts') + 1,
+            next_attempt_at=lease_until,
+        )
+    for email in emails:
+        email.status = OutboxEmail.STATUS_SENDING
+        email.attempts += 1
+        email.next_attempt_at = lease_until
+    return emails
+
+
+def send_outbox_batch(
+        batch_size: int | None = None,
+        max_attempts: int | None = None
+) -> tuple[int, int]:
+    """Deliver one batch of due emails over a single connection.
+
+    Returns number of sent and failed emails. Emails are claimed
+    first and sent outside of any transaction, so no row stays locked
+    during the SMTP session; the result of each is recorded as soon as
+    it is known. Failed emails are rescheduled with exponential backoff
+    until ``max_attempts`` is reached, after which they are marked as
+    failed.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    now = timezone.now()
+
+    emails = claim_outbox_batch(batch_size, now, max_attempts)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning('Email outbox connection failed: %s', e)
+        for email in emails:
+            _record_failure(email, e, now, max_attempts)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                logger.warning(
+                    'Email outbox delivery of #%s failed: %s', email.id, e
+                )
+                _record_failure(email, e, now, max_attempts)
+                failed += 1
+            else:
+                _record(
+                    email,
+                    status=OutboxEmail.STATUS_SENT,
+                    sent_at=timezone.now(),
+                    last_error='',
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def _record(email: OutboxEmail, **changes) -> None:
+    """Store the outcome of a claimed email while its lease is held.
+
+    Nothing is written once another worker took the email over.
+    """
+    OutboxEmail.objects.filter(
+        pk=email.pk,
+        status=OutboxEmail.STATUS_SENDING,
+        next_attempt_at=email.next_attempt_at,
+    ).update(**changes)
+
+
+def _record_failure(email: OutboxEmail, error: Exception, now,
+                    max_attempts: int) -> None:
+    """Record failed attempt and schedule retry or give up."""
+    if email.attempts >= max_attempts:
+        _record(email, status=OutboxEmail.STATUS_FAILED,
+                last_error=str(error))
+    else:
+        _record(
+            email,
+            status=OutboxEmail.STATUS_PENDING,
+            next_attempt_at=now + get_retry_delay(email.attempts),
+            last_error=str(error),
+        )
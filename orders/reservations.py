@@ -0,0 +1,136 @@
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Now
+from django.utils import timezone
+
+from orders.models import Order, StockHold
+from products.cache import invalidate_stock
+from products.models import Product
+from products.stock import (per_product, raise_unavailable,
+                            update_if_available)
+
+
+def place_holds(order: Order, ttl: int | None = None) -> list[StockHold]:
+    """Reserve stock for all order items until the holds expire.
+
+    All products are reserved by a single conditional UPDATE matching
+    only rows whose unreserved stock covers the quantity, so concurrent
+    checkouts of the same product never queue behind each other for
+    longer than that statement. If any product falls short nothing is
+    reserved and ValidationError is raised once the block is left, so
+    callers inside a transaction can still recover from it.
+    """
+    quantities = order.get_quantities()
+    if not quantities:
+        return []
+    ttl = settings.STOCK_HOLD_TTL if ttl is None else ttl
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    quantity = per_product(quantities)
+
+    with transaction.atomic(savepoint=False):
+        short = update_if_available(
+            quantities, F('reserved') + quantity,
+            reserved=F('reserved') + quantity
+        )
+        if not short:
+            invalidate_stock(quantities)
+            return StockHold.objects.bulk_create([
+                StockHold(
+                    order=order,
+                    product_id=product_id,
+                    quantity=quantity,
+                    expires_at=expires_at
+                )
+                for product_id, quantity in quantities.items()
+            ])
+    raise_unavailable(short)
+
+
+def _sum_holds(holds: Iterable[StockHold]) -> dict[int, int]:
+    """Return held quantity per product id."""
+    quantities = defaultdict(int)
+    for hold in holds:
+        quantities[hold.product_id] += hold.quantity
+    return dict(quantities)
+
+
+def _release(holds: list[StockHold]) -> None:
+    """Return held quantities to available stock and drop the holds."""
+    quantities = _sum_holds(holds)
+    if not quantities:
+        return
+    Product.objects.filter(pk__in=quantities).update(
+        reserved=Greatest(F('reserved') - per_product(quantities), 0)
+    )
+    StockHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+    invalidate_stock(quantities)
+
+
+def confirm_holds(order: Order) -> None:
+    """Turn the order's holds into a stock decrement once it is paid.
+
+    Stock is decremented and reservations are dropped by one UPDATE.
+    Items whose hold already expired are only taken if enough
+    unreserved stock is left; otherwise nothing changes and
+    ValidationError is raised.
+    """
+    quantities = order.get_quantities()
+    if not quantities:
+        return
+    quantity = per_product(quantities)
+
+    with transaction.atomic(savepoint=False):
+        holds = list(order.stock_holds.select_for_update())
+        held = per_product(_sum_holds(holds), default=0)
+        short = update_if_available(
+            quantities, F('reserved') - held + quantity,
+            stock=F('stock') - quantity,
+            reserved=Greatest(F('reserved') - held, 0),
+            updated_at=Now()
+        )
+        if not short:
+            StockHold.objects.filter(
+                pk__in=[hold.pk for hold in holds]
+            ).delete()
+            invalidate_stock(quantities)
+            return
+    raise_unavailable(short)
+
+
+def release_holds(order: Order) -> None:
+    """Release all stock held for an order."""
+    with transaction.atomic():
+        _release(list(order.stock_holds.select_for_update()))
+
+
+def release_expired_holds(batch_size: int | None = None) -> int:
+    """Release expired holds in batches and return how many were freed.
+
+    Holds locked by a checkout confirming them are skipped. Pending
+    orders left without holds belong to checkouts that never finished;
+    they are canceled, as they never took any stock either.
+    """
+    batch_size = batch_size or settings.STOCK_HOLD_SWEEP_BATCH_SIZE
+    now = timezone.now()
+    released = 0
+    while True:
+        with transaction.atomic():
+            holds = list(
+                StockHold.objects.select_for_update(skip_locked=True)
+                .filter(expires_at__lte=now)
+                .order_by('expires_at', 'id')[:batch_size]
+            )
+            if not holds:
+                return released
+            _release(holds)
+            Order.objects.filter(
+                pk__in={hold.order_id for hold in holds},
+                status=settings.ORDER_STATUS_PENDING,
+                stock_holds__isnull=True
+            ).update(status=settings.ORDER_STATUS_CANCELED, updated_at=Now())
+            released += len(holds)
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from orders.models import Order, OrderItem, ReviewEligibility
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance: OrderItem, origin=None,
+                       **kwargs) -> None:
+    """Remove deleted item from order totals and review eligibility."""
+    if isinstance(origin, Order) or (
+            isinstance(origin, QuerySet) and origin.model is Order):
+        return
+    Order.apply_totals_delta(
+        instance.order_id,
+        -(instance.price * instance.quantity),
+        -instance.quantity
+    )
+    user_id = Order.objects.filter(
+        pk=instance.order_id, status=settings.ORDER_STATUS_DELIVERED
+    ).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        ReviewEligibility.revoke_stale(user_id)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance: Order, **kwargs) -> None:
+    """Revoke review of products only a deleted delivery justified."""
+    if instance.status == settings.ORDER_STATUS_DELIVERED:
+        ReviewEligibility.revoke_stale(instance.user_id)
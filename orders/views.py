@@ -7,7 +7,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
@@ -15,7 +15,10 @@ from django.views.decorators.http import require_POST
 from orders.cart import Cart
 from orders.mixins import OrderPermissionMixin
 from orders.models import Order, OrderItem
+from orders.outbox import enqueue_email
+from orders.reservations import confirm_holds, place_holds, release_holds
 from products.models import Product
+from products.money import format_money, from_cents
 
 
 def get_cart_response(
@@ -62,23 +65,34 @@ def handle_cart_operation(
 
 
 def validate_quantity(quantity: int, product: Product) -> bool:
-    """Validate quantity against product stock."""
-    return 0 < quantity <= product.stock
+    """Validate quantity against stock not held by other checkouts."""
+    return 0 < quantity <= product.available_stock
 
 
 def create_order_items_from_cart(order: Order, cart: Cart) -> None:
-    """Create order items from cart contents."""
-    for item in cart:
-        product = Product.objects.get(id=item['product_id'])
-        price_str = item['price'].replace('$', '').strip()
-        price = Decimal(price_str)
-
-        OrderItem.objects.create(
+    """Create order items from cart contents with a single insert."""
+    items = []
+    for item in cart.items_with_products():
+        items.append(OrderItem(
             order=order,
-            product=product,
+            product=item['product'],
             quantity=item['quantity'],
-            price=price
-        )
+            price=from_cents(item['price_cents'])
+        ))
+    if not items:
+        raise ValidationError(settings.ORDER_MESSAGES['CART_EMPTY'])
+    OrderItem.objects.bulk_create(items)
+
+    order.subtotal = sum(item.price * item.quantity for item in items)
+    order.items_count = sum(item.quantity for item in items)
+    order.save(update_fields=['subtotal', 'items_count'])
+
+
+def abandon_checkout(order: Order) -> None:
+    """Release stock held by an unpaid order and discard the order."""
+    with transaction.atomic():
+        release_holds(order)
+        order.delete()
 
 
 def get_payment_display_name(payment_method: str) -> str:
@@ -158,7 +172,6 @@ def cart_update(
             raise ValueError('Invalid quantity')
         cart.add(product=product, quantity=quantity, override_quantity=True)
 
-    cart = Cart(request)
     response = handle_cart_operation(
         request,
         update_operation,
@@ -167,13 +180,10 @@ def cart_update(
     )
 
     if isinstance(response, JsonResponse):
-        total_price_str = cart.get_total_price()
-        total_price_decimal = (
-            Decimal(total_price_str.replace('$', ''))
-            if total_price_str else None
+        cart = Cart(request)
+        response_data = get_cart_response(
+            cart, total_price=cart.get_total_price()
         )
-        response_data = get_cart_response(cart,
-                                          total_price=total_price_decimal)
         return JsonResponse(response_data)
     return response
 
@@ -200,51 +210,56 @@ def checkout(request: HttpRequest) -> HttpResponse:
                 'user': request.user
             })
 
-        order = Order.objects.create(
-            user=request.user,
-            shipping_address=shipping_address
-        )
+        card_details = get_card_details(request, payment_method)
+        if payment_method == 'card' and card_details:
+            expiry_date = card_details.get('expiry_date', '').strip()
+            if expiry_date and not validate_card_expiry(expiry_date):
+                messages.error(
+                    request, settings.ORDER_MESSAGES['CARD_EXPIRED']
+                )
+                return render(request, 'orders/checkout.html', {
+                    'cart': cart,
+                    'user': request.user
+                })
 
         try:
-            create_order_items_from_cart(order, cart)
-
-            card_details = get_card_details(request, payment_method)
-
-            if payment_method == 'card' and card_details:
-                expiry_date = card_details.get('expiry_date', '').strip()
-                if expiry_date and not validate_card_expiry(expiry_date):
-                    order.delete()
-                    messages.error(
-                        request, settings.ORDER_MESSAGES['CARD_EXPIRED']
-                    )
-                    return render(request, 'orders/checkout.html', {
-                        'cart': cart,
-                        'user': request.user
-                    })
-            payment_success = process_payment(
-                payment_method, card_details
-            )
-            if payment_success:
-                order.status = (
-                    settings.ORDER_STATUS_PLACED
-                    if payment_method == 'cash_on_delivery'
-                    else settings.ORDER_STATUS_PAID
+            with transaction.atomic():
+                order = Order.objects.create(
+                    user=request.user,
+                    shipping_address=shipping_address
                 )
-                order.save()
+                create_order_items_from_cart(order, cart)
+                place_holds(order)
+
+            try:
+                payment_success = process_payment(
+                    payment_method, card_details
+                )
+                if payment_success:
+                    with transaction.atomic():
+                        confirm_holds(order)
+                        order.status = (
+                            settings.ORDER_STATUS_PLACED
+                            if payment_method == 'cash_on_delivery'
+                            else settings.ORDER_STATUS_PAID
+                        )
+                        order.save(update_fields=['status', 'updated_at'])
+                        send_order_notifications(order, payment_method)
+            except Exception:
+                abandon_checkout(order)
+                raise
+
+            if payment_success:
                 success_msg = get_checkout_success_message(payment_method)
                 messages.success(request, success_msg)
-                order.reduce_stock()
                 cart.clear()
-                send_order_notifications(order, payment_method)
 
                 return redirect('orders:order_detail', order_id=order.id)
-            else:
-                order.delete()
-                messages.error(
-                    request, settings.ORDER_MESSAGES['PAYMENT_FAILED']
-                )
+            abandon_checkout(order)
+            messages.error(
+                request, settings.ORDER_MESSAGES['PAYMENT_FAILED']
+            )
         except (ValidationError, ValueError, TypeError, AttributeError) as e:
-            order.delete()
             messages.error(
                 request,
                 settings.ORDER_MESSAGES['ORDER_ERROR'].format(error=e)
@@ -305,7 +320,9 @@ def order_detail(request: HttpRequest, order_id: int) -> HttpResponse:
 @login_required
 def order_list(request: HttpRequest) -> HttpResponse:
     """Display user order list."""
-    orders = Order.objects.filter(user=request.user).prefetch_related('items')
+    orders = Order.objects.filter(user=request.user).prefetch_related(
+        'items__product'
+    )
     return render(request, 'orders/order_list.html', {
         'orders': orders
     })
@@ -325,10 +342,12 @@ def update_order_status(request: HttpRequest, order_id: int) -> HttpResponse:
         new_status = request.POST.get('status')
         if new_status in dict(settings.ORDER_STATUS_CHOICES):
             old_status = order.status
-            order.status = new_status
-            order.save()
-
-            send_status_change_notification(order, old_status, new_status)
+            with transaction.atomic():
+                order.status = new_status
+                order.save()
+                send_status_change_notification(
+                    order, old_status, new_status
+                )
 
             status_display = order.get_status_display()
             success_msg = settings.ORDER_MESSAGES[
@@ -356,9 +375,10 @@ def cancel_order(request: HttpRequest, order_id: int) -> HttpResponse:
     if request.method == 'POST':
         try:
             old_status = order.status
-            order.cancel_order()
-            send_status_change_notification(
-                order, old_status, settings.ORDER_STATUS_CANCELED)
+            with transaction.atomic():
+                order.cancel_order()
+                send_status_change_notification(
+                    order, old_status, settings.ORDER_STATUS_CANCELED)
             messages.success(
                 request, settings.ORDER_MESSAGES['ORDER_CANCELED_SUCCESS']
             )
@@ -407,45 +427,48 @@ def process_payment(
 
 
 def send_order_notifications(order: Order, payment_method: str) -> None:
-    """Send order email notifications."""
+    """Queue order email notifications."""
     payment_display = get_payment_display_name(payment_method)
     user_name = order.user.get_full_name() or order.user.username
-    send_customer_order_notification(order, user_name, payment_display)
-    send_admin_order_notification(order, user_name, payment_display)
+    items_text = build_items_text(order)
+    send_customer_order_notification(
+        order, user_name, payment_display, items_text
+    )
+    send_admin_order_notification(
+        order, user_name, payment_display, items_text
+    )
 
 
 def send_customer_order_notification(
-        order: Order, user_name: str, payment_display: str
+        order: Order, user_name: str, payment_display: str,
+        items_text: str | None = None
 ) -> None:
-    """Send order confirmation email to customer."""
-    from django.conf import settings
-
+    """Queue order confirmation email to customer."""
     customer_subject = f'Order Confirmation #{order.id} - Hop & Barley'
     customer_text = build_customer_email_text(order, user_name,
-                                              payment_display)
-    send_mail(
+                                              payment_display, items_text)
+    enqueue_email(
         customer_subject,
         customer_text,
-        settings.DEFAULT_FROM_EMAIL,
         [order.user.email],
-        fail_silently=False
+        order=order
     )
 
 
 def send_admin_order_notification(
-        order: Order, user_name: str, payment_display: str
+        order: Order, user_name: str, payment_display: str,
+        items_text: str | None = None
 ) -> None:
-    """Send order notification to admin."""
-
+    """Queue order notification to admin."""
     admin_subject = f'New Order #{order.id} - {user_name}'
-    admin_message = build_admin_email_text(order, user_name, payment_display)
+    admin_message = build_admin_email_text(order, user_name, payment_display,
+                                           items_text)
     admin_email = getattr(settings, 'ADMIN_EMAIL', settings.DEFAULT_FROM_EMAIL)
-    send_mail(
+    enqueue_email(
         admin_subject,
         admin_message,
-        settings.DEFAULT_FROM_EMAIL,
         [admin_email],
-        fail_silently=False
+        order=order
     )
 
 
@@ -453,10 +476,16 @@ def build_email_text(
         order: Order,
         user_name: str,
         payment_display: str,
-        email_type: str = 'customer'
+        email_type: str = 'customer',
+        items_text: str | None = None
 ) -> str:
-    """Build email text content."""
-    items_text = build_items_text(order)
+    """Build email text content.
+
+    ``items_text`` lets emails about the same order share one load of
+    its items.
+    """
+    if items_text is None:
+        items_text = build_items_text(order)
     email_templates = settings.EMAIL_TEMPLATES
 
     if email_type == 'customer':
@@ -532,7 +561,9 @@ def _build_items_section(
     return f"""
 {email_templates['ITEMS_ORDERED_HEADER']}
 {items_text}
-{email_templates['TOTAL_HEADER'].format(total=order.total_price)}"""
+{email_templates['TOTAL_HEADER'].format(
+        total=format_money(order.total_price)
+    )}"""
 
 
 def _build_shipping_section(order: Order, email_templates: dict) -> str:
@@ -551,28 +582,32 @@ def _build_footer_section(email_templates: dict) -> str:
 
 
 def build_customer_email_text(
-        order: Order, user_name: str, payment_display: str
+        order: Order, user_name: str, payment_display: str,
+        items_text: str | None = None
 ) -> str:
     """Build customer email text content."""
-    return build_email_text(order, user_name, payment_display, 'customer')
+    return build_email_text(order, user_name, payment_display, 'customer',
+                            items_text)
 
 
 def build_admin_email_text(
-        order: Order, user_name: str, payment_display: str
+        order: Order, user_name: str, payment_display: str,
+        items_text: str | None = None
 ) -> str:
     """Build admin email text content."""
-    return build_email_text(order, user_name, payment_display, 'admin')
+    return build_email_text(order, user_name, payment_display, 'admin',
+                            items_text)
 
 
 def build_items_text(order: Order) -> str:
     """Build items text for email content."""
     items_text = ""
     item_format = settings.EMAIL_TEMPLATES['ITEM_FORMAT']
-    for item in order.items.all():
+    for item in order.items.select_related('product'):
         formatted_item = item_format.format(
             name=item.product.name,
             quantity=item.quantity,
-            total=item.total
+            total=format_money(item.total)
         )
         items_text += f"{formatted_item}\n"
     return items_text
@@ -581,20 +616,17 @@ def build_items_text(order: Order) -> str:
 def send_status_change_notification(
         order: Order, old_status: str, new_status: str
 ) -> None:
-    """Send order status change notification."""
-    from django.conf import settings
-
+    """Queue order status change notification."""
     user_name = order.user.get_full_name() or order.user.username
     customer_subject = settings.EMAIL_TEMPLATES[
         'STATUS_UPDATE_SUBJECT'
     ].format(order_id=order.id)
     customer_text = build_status_change_email_text(order, user_name)
-    send_mail(
+    enqueue_email(
         customer_subject,
         customer_text,
-        settings.DEFAULT_FROM_EMAIL,
         [order.user.email],
-        fail_silently=False
+        order=order
     )
 
 
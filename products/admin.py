@@ -7,7 +7,7 @@ from products.models import Category, Product, Review
 class ProductAdmin(admin.ModelAdmin):
     list_display = (
         'name', 'slug', 'category', 'price', 'image', 'is_active', 'stock',
-        'created_at', 'updated_at',)
+        'rating_avg', 'rating_count', 'created_at', 'updated_at',)
     list_filter = (
         'name', 'category', 'is_active', 'created_at', 'updated_at',)
 
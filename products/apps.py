@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self) -> None:
+        from products.signals import create_search_index
+        post_migrate.connect(create_search_index, sender=self)
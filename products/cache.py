@@ -0,0 +1,223 @@
+import hashlib
+import time
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import QueryDict
+
+from products.models import Product
+
+VERSION_KEY = 'catalog:version'
+STATS_KEY = 'catalog:stats:{namespace}:{outcome}'
+PRODUCT_SUMMARY_KEY = 'catalog:product:v{version}:{pk}'
+STOCK_STAMP_KEY = 'catalog:stock:{pk}'
+
+HIT = 'hit'
+MISS = 'miss'
+
+
+def get_cache():
+    """Return cache backend used for catalog reads."""
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_catalog_version() -> int:
+    """Return current catalog version, initialising it if missing."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """Invalidate all cached catalog entries by moving to a new version."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 2, timeout=None)
+
+
+def invalidate_catalog() -> None:
+    """Bump catalog version now and again once the transaction commits.
+
+    The second bump drops entries cached from data read between the
+    change and its commit.
+    """
+    bump_catalog_version()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump_catalog_version)
+
+
+def drop_product_summaries(product_ids: Iterable[int]) -> None:
+    """Delete cached display fields of products."""
+    version = get_catalog_version()
+    get_cache().delete_many([
+        PRODUCT_SUMMARY_KEY.format(version=version, pk=pk)
+        for pk in product_ids
+    ])
+
+
+def invalidate_products(product_ids: Iterable[int]) -> None:
+    """Drop cached summaries of products now and once committed."""
+    product_ids = list(product_ids)
+    drop_product_summaries(product_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: drop_product_summaries(product_ids))
+
+
+def get_stock_stamps(product_ids: Iterable[int]) -> dict[int, int | None]:
+    """Return the last stock change stamp of each product."""
+    keys = {STOCK_STAMP_KEY.format(pk=pk): pk for pk in product_ids}
+    stamps = get_cache().get_many(keys)
+    return {pk: stamps.get(key) for key, pk in keys.items()}
+
+
+def stamp_stock(product_ids: Iterable[int]) -> None:
+    """Mark stock of products as changed."""
+    stamp = time.time_ns()
+    get_cache().set_many(
+        {STOCK_STAMP_KEY.format(pk=pk): stamp for pk in product_ids},
+        timeout=None
+    )
+
+
+def invalidate_stock(product_ids: Iterable[int]) -> None:
+    """Expire cached entries showing stock or reservations of products.
+
+    Entries cached with ``get_or_build`` for these products are rebuilt
+    on their next read, along with the product summaries, while pages
+    of other products stay cached. Stamps move again once the
+    transaction commits, like the catalog version.
+    """
+    product_ids = list(product_ids)
+    stamp_stock(product_ids)
+    invalidate_products(product_ids)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: stamp_stock(product_ids))
+
+
+def make_key(namespace: str, params: dict | QueryDict | None = None) -> str:
+    """Build versioned cache key from namespace and query parameters."""
+    if isinstance(params, QueryDict):
+        items = sorted(
+            (key, value) for key in params for value in params.getlist(key)
+        )
+    else:
+        items = sorted((params or {}).items())
+    digest = hashlib.md5(
+        repr(items).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'catalog:{namespace}:v{get_catalog_version()}:{digest}'
+
+
+def get_or_build(namespace: str, params: dict | QueryDict | None,
+                 builder: Callable[[], Any],
+                 stocked: Callable[[Any], Iterable[int]] | None = None
+                 ) -> tuple[Any, bool]:
+    """Return cached value or build and store it.
+
+    Returns the value together with a flag telling whether it came
+    from the cache. Values showing stock pass ``stocked``, returning
+    the ids of the products they show; such values are stored with
+    the stock stamps of those products and rebuilt once one moves.
+    """
+    cache = get_cache()
+    key = make_key(namespace, params)
+    entry = cache.get(key)
+    if entry is not None and stocked is not None:
+        entry, stamps = entry
+        if stamps != get_stock_stamps(stamps):
+            entry = None
+    if entry is not None:
+        record(namespace, HIT)
+        return entry, True
+    record(namespace, MISS)
+    value = builder()
+    entry = value
+    if stocked is not None:
+        entry = (value, get_stock_stamps(stocked(value)))
+    cache.set(key, entry, settings.CATALOG_CACHE_TIMEOUT)
+    return value, False
+
+
+def summarize_product(product: Product) -> dict[str, Any]:
+    """Return display fields of a product."""
+    return {
+        'name': product.name,
+        'slug': product.slug,
+        'image': product.get_rendition_url('cart'),
+        'stock': product.stock,
+        'available_stock': product.available_stock,
+    }
+
+
+def get_product_summaries(
+        product_ids: Iterable[int],
+        products: dict[int, Product] | None = None
+) -> dict[int, dict[str, Any]]:
+    """Return display fields of products from the catalog cache.
+
+    Entries missing from the cache are built from ``products`` when
+    given, otherwise loaded with a single query. Unknown ids are left
+    out of the result.
+    """
+    cache = get_cache()
+    version = get_catalog_version()
+    keys = {
+        PRODUCT_SUMMARY_KEY.format(version=version, pk=pk): pk
+        for pk in product_ids
+    }
+    cached = cache.get_many(keys)
+    summaries = {keys[key]: value for key, value in cached.items()}
+    missing = [pk for pk in keys.values() if pk not in summaries]
+    if not missing:
+        return summaries
+
+    products = products or {}
+    loaded = {pk: products[pk] for pk in missing if pk in products}
+    to_query = [pk for pk in missing if pk not in loaded]
+    if to_query:
+        loaded.update(Product.objects.in_bulk(to_query))
+    built = {pk: summarize_product(product) for pk, product in loaded.items()}
+    cache.set_many(
+        {
+            PRODUCT_SUMMARY_KEY.format(version=version, pk=pk): summary
+            for pk, summary in built.items()
+        },
+        settings.CATALOG_CACHE_TIMEOUT
+    )
+    summaries.update(built)
+    return summaries
+
+
+def record(namespace: str, outcome: str) -> None:
+    """Increment hit or miss counter of namespace."""
+    cache = get_cache()
+    key = STATS_KEY.format(namespace=namespace, outcome=outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """Return hit and miss counters per cached namespace."""
+    cache = get_cache()
+    keys = {
+        STATS_KEY.format(namespace=namespace, outcome=outcome):
+            (namespace, outcome)
+        for namespace in settings.CATALOG_CACHE_NAMESPACES
+        for outcome in (HIT, MISS)
+    }
+    values = cache.get_many(keys)
+    stats = {}
+    for key, (namespace, outcome) in keys.items():
+        stats.setdefault(namespace, {HIT: 0, MISS: 0})
+        stats[namespace][outcome] = values.get(key, 0)
+    return stats
@@ -0,0 +1,154 @@
+import threading
+from uuid import uuid4
+
+from django.db import transaction
+
+from products.cache import get_cache
+from products.models import Category
+
+TREE_VERSION_KEY = 'catalog:category_tree:version'
+
+
+class CategoryTree:
+    """In-memory category hierarchy loaded with a single query.
+
+    Every category has its ``parent`` relation pointing at the loaded
+    parent instance, so walking up the tree never hits the database.
+    Instances are shared between requests and must be treated as
+    read-only.
+    """
+
+    def __init__(self, categories: list[Category]) -> None:
+        self._by_id = {category.pk: category for category in categories}
+        self._by_slug = {category.slug: category for category in categories}
+        self._children: dict[int | None, list[Category]] = {}
+        for category in categories:
+            parent = self._by_id.get(category.parent_id)
+            if category.parent_id is not None and parent is None:
+                continue
+            category.parent = parent
+            self._children.setdefault(category.parent_id, []).append(
+                category
+            )
+        self._ordered = sorted(categories, key=lambda c: (c.name, c.pk))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, pk: int) -> bool:
+        return pk in self._by_id
+
+    def all(self) -> list[Category]:
+        """Return all categories ordered by name."""
+        return list(self._ordered)
+
+    def roots(self) -> list[Category]:
+        """Return top-level categories."""
+        return list(self._children.get(None, []))
+
+    def get(self, pk: int) -> Category | None:
+        """Return category by primary key."""
+        return self._by_id.get(pk)
+
+    def get_by_slug(self, slug: str) -> Category | None:
+        """Return category by slug."""
+        return self._by_slug.get(slug)
+
+    def children(self, pk: int) -> list[Category]:
+        """Return direct subcategories of a category."""
+        return list(self._children.get(pk, []))
+
+    def ancestors(self, pk: int) -> list[Category]:
+        """Return parents of a category from the root down."""
+        ancestors = []
+        seen = {pk}
+        category = self._by_id.get(pk)
+        while category is not None and category.parent_id not in seen:
+            category = self._by_id.get(category.parent_id)
+            if category is None:
+                break
+            seen.add(category.pk)
+            ancestors.append(category)
+        return ancestors[::-1]
+
+    def descendants(self, pk: int) -> list[Category]:
+        """Return all subcategories of a category, depth first."""
+        descendants = []
+        seen = {pk}
+        stack = list(reversed(self._children.get(pk, [])))
+        while stack:
+            category = stack.pop()
+            if category.pk in seen:
+                continue
+            seen.add(category.pk)
+            descendants.append(category)
+            stack.extend(reversed(self._children.get(category.pk, [])))
+        return descendants
+
+    def descendant_ids(self, pk: int, include_self: bool = True) -> set[int]:
+        """Return ids of a category subtree."""
+        ids = {category.pk for category in self.descendants(pk)}
+        if include_self and pk in self._by_id:
+            ids.add(pk)
+        return ids
+
+
+_lock = threading.Lock()
+_tree: CategoryTree | None = None
+_tree_version: str | None = None
+
+
+def get_tree_version() -> str:
+    """Return shared version token of the category tree."""
+    cache = get_cache()
+    version = cache.get(TREE_VERSION_KEY)
+    if version is None:
+        cache.add(TREE_VERSION_KEY, uuid4().hex, timeout=None)
+        version = cache.get(TREE_VERSION_KEY)
+    return version
+
+
+def get_category_tree() -> CategoryTree:
+    """Return process-local category tree, reloading it when stale.
+
+    Staleness is checked against a version token in the shared cache,
+    so a change in one process reloads the tree in all of them.
+    """
+    global _tree, _tree_version
+    version = get_tree_version()
+    with _lock:
+        if _tree is None or _tree_version != version:
+            _tree = CategoryTree(list(Category.objects.all()))
+            _tree_version = version
+        return _tree
+
+
+def get_subtree_ids(category_ids) -> set[int]:
+    """Return ids of given categories and all their subcategories.
+
+    Ids that are not numbers or not known categories are ignored.
+    """
+    tree = get_category_tree()
+    ids = set()
+    for category_id in category_ids:
+        try:
+            ids |= tree.descendant_ids(int(category_id))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _replace_tree_version() -> None:
+    """Store a new category tree version token."""
+    get_cache().set(TREE_VERSION_KEY, uuid4().hex, timeout=None)
+
+
+def invalidate_category_tree() -> None:
+    """Force every process to reload the category tree.
+
+    The token is replaced again on commit so a tree loaded from data
+    read before the commit is not kept.
+    """
+    _replace_tree_version()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(_replace_tree_version)
@@ -0,0 +1,115 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Callable
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts: Any) -> str:
+    """Return weak ETag hashing the given parts."""
+    digest = hashlib.md5(
+        repr(parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def get_list_validators(queryset: QuerySet, related: tuple[str, ...] = ()
+                        ) -> tuple:
+    """Return row count and latest ``updated_at`` of a queryset.
+
+    ``related`` names relations shown with each row, whose latest
+    ``updated_at`` is included as well. Costs a single aggregate
+    query. The count changes when rows are deleted, which the latest
+    timestamp alone would miss.
+    """
+    aggregates = {'rows': Count('pk'), 'latest': Max('updated_at')}
+    for name in related:
+        aggregates[f'{name}_latest'] = Max(f'{name}__updated_at')
+    values = queryset.order_by().aggregate(**aggregates)
+    return tuple(values[alias] for alias in aggregates)
+
+
+def get_object_validators(obj: Any, related: tuple[str, ...] = ()
+                          ) -> list[datetime]:
+    """Return ``updated_at`` of an object and of its loaded relations."""
+    validators = [obj.updated_at]
+    for name in related:
+        instance = obj
+        for attr in name.split('__'):
+            instance = getattr(instance, attr) if instance else None
+        validators.append(instance.updated_at if instance else None)
+    return validators
+
+
+def get_visitor_parts(request: HttpRequest) -> tuple:
+    """Return request state pages render besides catalog data.
+
+    Covers the signed in user, the cart shown in the header, the CSRF
+    cookie forms are bound to, the query string and partial renders.
+    The CSRF cookie is issued up front, so the first page rendered
+    for a visitor already carries the validator of later ones.
+    """
+    get_token(request)
+    return (
+        request.user.pk, request.user.is_staff,
+        request.META.get('CSRF_COOKIE'),
+        request.session.get(settings.CART_SESSION_ID),
+        request.get_full_path(),
+        request.headers.get('X-Requested-With'),
+    )
+
+
+def respond_conditionally(request: HttpRequest, etag: str,
+                          render: Callable[[], HttpResponse],
+                          last_modified: datetime | None = None
+                          ) -> HttpResponse:
+    """Return 304 if the client copy is current, else the rendered one.
+
+    ``render`` is only called when the client copy is stale, so
+    unchanged pages skip templates and serializers altogether.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer GET requests for unchanged pages with 304 Not Modified.
+
+    Views return the values their page is built from in
+    ``get_etag_parts``; by default it returns None and the page is
+    always rendered. Pages showing flash messages are rendered without
+    an ETag, so the message is not replayed from the client copy later.
+    """
+
+    def get_etag_parts(self) -> tuple | None:
+        """Return values identifying the page contents."""
+        return None
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs
+                 ) -> HttpResponse:
+        """Check validators of GET requests before rendering."""
+        render = super().dispatch
+        if request.method not in ('GET', 'HEAD'):
+            return render(request, *args, **kwargs)
+        parts = self.get_etag_parts()
+        if parts is None or len(get_messages(request)):
+            return render(request, *args, **kwargs)
+        return respond_conditionally(
+            request, make_etag(*parts, *get_visitor_parts(request)),
+            lambda: render(request, *args, **kwargs)
+        )
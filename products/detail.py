@@ -0,0 +1,122 @@
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, QuerySet, Subquery
+
+from orders.models import ReviewEligibility
+from products.models import Product, Review
+from products.pagination import KeysetPage, KeysetPaginator
+
+REVIEW_FIELDS = (
+    'id', 'product_id', 'rating', 'title', 'comment', 'created_at',
+    'user__id', 'user__username', 'user__image', 'user__image_renditions',
+)
+
+
+def prepare_review(review: Review) -> Review:
+    """Attach star icons and author avatar the template shows."""
+    review.star_icons = (['fa-solid'] * review.rating
+                         + ['fa-regular'] * (5 - review.rating))
+    review.avatar = review.user.get_avatar('small')
+    return review
+
+
+def get_reviews(product: Product) -> QuerySet:
+    """Return reviews of a product, newest first, with their authors.
+
+    Only displayed columns of authors are loaded, so cached pages hold
+    no personal data besides the username and avatar.
+    """
+    return Review.objects.filter(product=product).select_related(
+        'user'
+    ).only(*REVIEW_FIELDS).order_by('-created_at', '-id')
+
+
+def get_review_page(product: Product, cursor: str | None = None,
+                    per_page: int | None = None) -> KeysetPage:
+    """Return the page of reviews following cursor, or the first one."""
+    page = KeysetPaginator(
+        get_reviews(product), per_page or settings.REVIEWS_PER_PAGE
+    ).page(cursor)
+    for review in page:
+        prepare_review(review)
+    return page
+
+
+def build_public_detail(product: Product, cursor: str | None = None
+                        ) -> dict[str, Any]:
+    """Return detail page context shared by all visitors.
+
+    Costs a single query for the page of reviews, since the rating
+    histogram is stored on the product, and is meant to be stored in
+    the catalog cache.
+    """
+    page = get_review_page(product, cursor)
+    return {
+        'product': product,
+        'reviews': page.object_list,
+        'next_review_cursor': page.next_cursor,
+    }
+
+
+def get_user_state_annotations(user) -> dict[str, Any]:
+    """Return expressions loading review state of a user per product."""
+    return {
+        'eligible': Exists(ReviewEligibility.objects.filter(
+            user=user, product=OuterRef('pk')
+        )),
+        'user_review_id': Subquery(Review.objects.filter(
+            user=user, product=OuterRef('pk')
+        ).values('pk')[:1]),
+    }
+
+
+def make_user_state(user, eligible: bool = False,
+                    user_review_id: int | None = None) -> dict[str, Any]:
+    """Return review state of a user from loaded annotations."""
+    return {
+        'can_review': eligible or user.is_staff,
+        'has_reviewed': user_review_id is not None,
+        'user_review_id': user_review_id,
+    }
+
+
+def get_user_state(product: Product, user) -> dict[str, Any]:
+    """Return review eligibility and own review of a user in one query."""
+    if not user.is_authenticated:
+        return make_user_state(user)
+    row = Product.objects.filter(pk=product.pk).values(
+        **get_user_state_annotations(user)
+    ).get()
+    return make_user_state(user, **row)
+
+
+def get_page_state(queryset: QuerySet, slug: str, user
+                   ) -> dict[str, Any] | None:
+    """Return validators of a product page and user state in one query.
+
+    The page changes with the product, its category and its reviews:
+    edits move the latest review ``updated_at``, while added or removed
+    reviews change the stored ``rating_count``. Holds change
+    ``reserved`` and with it the available stock shown. Returns None
+    for products not in queryset.
+    """
+    annotations = {
+        'reviews_updated_at': Subquery(Review.objects.filter(
+            product=OuterRef('pk')
+        ).order_by('-updated_at').values('updated_at')[:1]),
+    }
+    if user.is_authenticated:
+        annotations.update(get_user_state_annotations(user))
+    row = queryset.filter(slug=slug).values(
+        'updated_at', 'category__updated_at', 'rating_count', 'reserved',
+        **annotations
+    ).first()
+    if row is None:
+        return None
+    validators = tuple(row.pop(name) for name in (
+        'updated_at', 'category__updated_at', 'rating_count', 'reserved',
+        'reviews_updated_at'
+    ))
+    return {'validators': validators,
+            'user_state': make_user_state(user, **row)}
@@ -43,10 +43,7 @@ class ReviewForm(forms.ModelForm):
         user = getattr(self, 'request_user', None) or self.user
         if not user or not self.product:
             return cleaned_data
-        print(f"User: {user}, is_staff: {user.is_staff}, "
-              f"can_review: {self.product.user_can_review(user)}")
-
-        if not user.is_staff and not self.product.user_can_review(user):
+        if not self.product.user_can_review(user):
             raise forms.ValidationError(settings.REVIEW_DELIVERY_REQUIRED)
 
         return cleaned_data
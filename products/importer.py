@@ -0,0 +1,339 @@
+import json
+import re
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from products.cache import invalidate_catalog
+from products.categories import invalidate_category_tree
+from products.media import hash_file, process_product_images
+from products.models import Category, Product
+from products.search import index_products
+from products.slugs import SlugAllocator
+
+JSON_CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 500
+DEFAULT_STOCK = 100
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+PRODUCT_UPDATE_FIELDS = ('description', 'category', 'price', 'updated_at')
+
+WHITESPACE = re.compile(r'\s*')
+DECODER = json.JSONDecoder(parse_float=Decimal)
+
+
+class JsonStream:
+    """Incremental reader of JSON values from a text file.
+
+    Only the value being decoded and one chunk of input are kept in
+    memory, so arrays of any length can be iterated item by item.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = JSON_CHUNK_SIZE
+                 ) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the unread part of the buffer."""
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return next character, '' at the end."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Consume the given structural character."""
+        if self.peek() != char:
+            raise ValueError(f'Expected {char!r} in JSON catalog')
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending the buffer may continue in the next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield items of the array starting at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if self.peek() != ',':
+                self.expect(']')
+                return
+            self.pos += 1
+
+
+def iter_catalog(fp: TextIO) -> Iterator[tuple[str, Any]]:
+    """Yield ``(section, item)`` pairs of a JSON catalog.
+
+    The catalog is an object whose ``categories`` and ``products``
+    arrays are streamed in file order, or a bare array of products.
+    """
+    stream = JsonStream(fp)
+    if stream.peek() == '[':
+        for item in stream.iter_array():
+            yield 'products', item
+        return
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        key = stream.decode()
+        stream.expect(':')
+        if stream.peek() == '[':
+            for item in stream.iter_array():
+                yield key, item
+        else:
+            stream.decode()
+        if stream.peek() != ',':
+            stream.expect('}')
+            return
+        stream.pos += 1
+
+
+def iter_jsonl(fp: TextIO) -> Iterator[tuple[str, Any]]:
+    """Yield products of a catalog with one JSON object per line."""
+    for line in fp:
+        if line.strip():
+            yield 'products', json.loads(line, parse_float=Decimal)
+
+
+def read_catalog(path: str | Path) -> Iterator[tuple[str, Any]]:
+    """Stream a JSON or JSON Lines catalog file."""
+    path = Path(path)
+    reader = iter_jsonl if path.suffix in JSONL_SUFFIXES else iter_catalog
+    with open(path, encoding='utf-8') as fp:
+        yield from reader(fp)
+
+
+class ImportStats:
+    """Counters collected while importing a catalog."""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.updated = 0
+        self.categories = 0
+        self.errors: list[str] = []
+        self.missing_images: list[str] = []
+        self.elapsed = 0.0
+
+    @property
+    def rows(self) -> int:
+        """Return number of imported product rows."""
+        return self.created + self.updated
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return import throughput."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class CatalogImporter:
+    """Bulk upsert of catalog records keyed by product name.
+
+    Existing categories are fetched once; every batch of products then
+    costs one lookup of existing rows, one of slugs sharing their base,
+    one ``bulk_create`` and one ``bulk_update``. The whole import runs in a
+    single transaction.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE,
+                 image_dir: str | Path | None = None,
+                 default_stock: int = DEFAULT_STOCK,
+                 workers: int | None = None) -> None:
+        self.batch_size = batch_size
+        self.workers = workers
+        self.image_dir = Path(
+            image_dir or Path(settings.MEDIA_ROOT) / 'product_images'
+        )
+        self.default_stock = default_stock
+        self.stats = ImportStats()
+        self.categories: dict[str, Category] = {}
+        self.category_slugs = SlugAllocator(Category)
+        self.product_slugs = SlugAllocator(Product)
+        self.image_names: dict[str, str] = {}
+
+    def run(self, records: Iterable[tuple[str, Any]]) -> ImportStats:
+        """Import all records and return the collected stats."""
+        started = time.monotonic()
+        with transaction.atomic():
+            self.prefetch()
+            batch = []
+            for section, record in records:
+                if section == 'categories':
+                    self.get_categories([str(record)])
+                elif section == 'products':
+                    batch.append(record)
+                    if len(batch) >= self.batch_size:
+                        self.import_products(batch)
+                        batch = []
+            if batch:
+                self.import_products(batch)
+            invalidate_catalog()
+            if self.stats.categories:
+                invalidate_category_tree()
+        self.stats.elapsed = time.monotonic() - started
+        return self.stats
+
+    def prefetch(self) -> None:
+        """Load existing categories."""
+        for category in Category.objects.all():
+            self.categories.setdefault(category.name, category)
+
+    def get_categories(self, names: Iterable[str]) -> dict[str, Category]:
+        """Return categories by name, creating missing ones in bulk."""
+        names = [
+            name for name in dict.fromkeys(names)
+            if name not in self.categories
+        ]
+        self.category_slugs.prefetch(names)
+        missing = [
+            Category(name=name, slug=self.category_slugs.allocate(name))
+            for name in names
+        ]
+        if missing:
+            for category in Category.objects.bulk_create(missing):
+                self.categories[category.name] = category
+            self.stats.categories += len(missing)
+        return self.categories
+
+    def parse(self, record: Any) -> dict[str, Any] | None:
+        """Return model field values of a product record, or None."""
+        try:
+            name = str(record['name']).strip()
+            fields = {
+                'name': name,
+                'description': str(record.get('description', '')),
+                'category': str(record['category']),
+                'price': Decimal(str(record['price'])),
+            }
+            if 'stock' in record:
+                fields['stock'] = int(record['stock'])
+            if 'is_active' in record:
+                fields['is_active'] = bool(record['is_active'])
+        except (KeyError, TypeError, ValueError, AttributeError,
+                InvalidOperation):
+            self.stats.errors.append(f'Invalid product record: {record!r}')
+            return None
+        if not name or len(name) > 100 or fields['price'] < 0:
+            self.stats.errors.append(f'Invalid product record: {record!r}')
+            return None
+        image_name = record.get('image_name') or record.get('image')
+        if image_name:
+            fields['image'] = self.resolve_image(str(image_name))
+        return fields
+
+    def resolve_image(self, image_name: str) -> str | None:
+        """Return storage name of an image, copying it in if needed.
+
+        Images already inside ``MEDIA_ROOT`` are referenced in place
+        instead of being copied again, and other files are only copied
+        if no stored image has the same content.
+        """
+        path = self.image_dir / image_name
+        if not path.is_file():
+            self.stats.missing_images.append(image_name)
+            return None
+        media_root = Path(settings.MEDIA_ROOT).resolve()
+        path = path.resolve()
+        if path.is_relative_to(media_root):
+            return path.relative_to(media_root).as_posix()
+        with open(path, 'rb') as fp:
+            content_hash = hash_file(File(fp))
+            name = self.image_names.get(content_hash) or (
+                Product.objects.filter(image_hash=content_hash)
+                .exclude(image='').values_list('image', flat=True).first()
+            )
+            if not name or not default_storage.exists(name):
+                name = default_storage.save(
+                    f'product_images/{image_name}', File(fp)
+                )
+        self.image_names[content_hash] = name
+        return name
+
+    def import_products(self, records: list[Any]) -> None:
+        """Upsert one batch of product records."""
+        rows = {}
+        for record in records:
+            fields = self.parse(record)
+            if fields is not None:
+                rows[fields['name']] = fields
+        if not rows:
+            return
+        categories = self.get_categories(
+            fields['category'] for fields in rows.values()
+        )
+        existing = {}
+        for product in Product.objects.filter(
+                name__in=rows).order_by('-pk'):
+            existing[product.name] = product
+
+        self.product_slugs.prefetch(rows.keys() - existing.keys())
+        now = timezone.now()
+        created, updated, changed_images = [], [], []
+        update_fields = set(PRODUCT_UPDATE_FIELDS)
+        for name, fields in rows.items():
+            fields['category'] = categories[fields['category']]
+            product = existing.get(name)
+            if product is None:
+                fields.setdefault('stock', self.default_stock)
+                fields['slug'] = self.product_slugs.allocate(name)
+                created.append(Product(**fields))
+                continue
+            if fields.get('image') is None:
+                fields.pop('image', None)
+            elif fields['image'] != product.image.name:
+                fields.update(image_hash='', image_width=None,
+                              image_height=None, image_renditions={})
+                changed_images.append(product)
+            update_fields.update(fields.keys() - {'name'})
+            for field, value in fields.items():
+                setattr(product, field, value)
+            product.updated_at = now
+            updated.append(product)
+
+        Product.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            Product.objects.bulk_update(
+                updated, sorted(update_fields), batch_size=self.batch_size
+            )
+        index_products([product.pk for product in created + updated])
+        process_product_images(
+            [product for product in created if product.image]
+            + changed_images, self.workers
+        )
+        self.stats.created += len(created)
+        self.stats.updated += len(updated)
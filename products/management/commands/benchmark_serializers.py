@@ -0,0 +1,108 @@
+"""
+Django management command comparing API list serialization paths.
+"""
+
+import time
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from api.serializers import ProductSerializer, ProductValuesSerializer
+from products.models import Category, Product
+
+PAGE_SIZES = (20, 100, 500)
+
+
+def best_time(run: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of repeated runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = ('Time product list serialization from model instances and '
+            'from values rows')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=PAGE_SIZES,
+            help='Page sizes to measure'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per measurement, the fastest is reported'
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Host of the simulated request, used for image URLs'
+        )
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory(HTTP_HOST=options['host']).get(
+            '/api/products/'
+        ))
+        context = {'request': request}
+        with transaction.atomic():
+            parent = Category.objects.create(name='Serializer benchmark')
+            category = Category.objects.create(
+                name='Serializer benchmark child', parent=parent
+            )
+            Product.objects.bulk_create(
+                Product(
+                    name=f'Serializer benchmark {n}',
+                    slug=f'serializer-benchmark-{n}',
+                    description='Serializer benchmark', category=category,
+                    price=n % 100 + 0.99, stock=n,
+                    image=f'product_images/benchmark/{n}.jpg',
+                    image_renditions={
+                        name: {
+                            'jpeg': f'product_images/renditions/{n}/'
+                                    f'{name}.jpg',
+                            'webp': f'product_images/renditions/{n}/'
+                                    f'{name}.webp',
+                            'width': width, 'height': width,
+                        }
+                        for name, width in (('card', 400), ('thumb', 80))
+                    },
+                )
+                for n in range(max(options['sizes']))
+            )
+            queryset = Product.objects.filter(
+                category=category
+            ).select_related('category__parent').order_by('-id')
+
+            self.stdout.write(f'{"rows":>6} {"model ms":>10} '
+                              f'{"values ms":>10} {"speedup":>8}')
+            for size in options['sizes']:
+                def serialize_models():
+                    return ProductSerializer(
+                        queryset[:size], many=True, context=context
+                    ).data
+
+                def serialize_values():
+                    serializer = ProductValuesSerializer(context)
+                    return serializer.serialize(
+                        serializer.values(queryset)[:size]
+                    )
+
+                model_ms = best_time(serialize_models, options['repeat'])
+                values_ms = best_time(serialize_values, options['repeat'])
+                self.stdout.write(
+                    f'{size:>6} {model_ms:>10.2f} {values_ms:>10.2f} '
+                    f'{model_ms / values_ms:>7.1f}x'
+                )
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark data rolled back'))
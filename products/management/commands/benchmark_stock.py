@@ -0,0 +1,157 @@
+"""
+Django management command for stress testing concurrent stock updates.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from orders.models import Order, OrderItem, StockHold
+from orders.reservations import confirm_holds, place_holds
+from products.models import Category, Product
+
+MAX_RETRIES = 50
+RETRY_DELAY = 0.01
+
+
+def retry(step: Callable[[], Any]) -> tuple[Any, int]:
+    """Run a step atomically and return (result, retries).
+
+    Backends that fail fast on lock contention instead of waiting,
+    such as SQLite, are retried with a growing delay; each attempt is
+    atomic so a failed one leaves no trace.
+    """
+    for retries in range(MAX_RETRIES):
+        try:
+            with transaction.atomic():
+                return step(), retries
+        except OperationalError:
+            time.sleep(RETRY_DELAY * (retries + 1))
+    raise CommandError('Gave up on a checkout after repeated locks')
+
+
+def checkout(user_id: int, product_id: int, quantity: int
+             ) -> tuple[bool, int]:
+    """Hold and confirm stock like a checkout does, return (sold, retries).
+
+    The order is created and its stock held in one transaction, then
+    the holds are confirmed and the order placed in another, as the
+    checkout view does around the payment.
+    """
+    def hold() -> Order:
+        order = Order.objects.create(
+            user_id=user_id, shipping_address='Stock benchmark'
+        )
+        OrderItem.objects.create(
+            order=order, product_id=product_id, quantity=quantity, price=1
+        )
+        place_holds(order)
+        return order
+
+    def confirm() -> None:
+        confirm_holds(order)
+        order.status = settings.ORDER_STATUS_PLACED
+        order.save(update_fields=['status', 'updated_at'])
+
+    try:
+        try:
+            order, held_retries = retry(hold)
+        except ValidationError:
+            return False, 0
+        _, confirm_retries = retry(confirm)
+        return True, held_retries + confirm_retries
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Fire parallel checkouts at one product and verify its stock '
+            'and reservations')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stock',
+            type=int,
+            default=50,
+            help='Initial stock of the benchmark product'
+        )
+        parser.add_argument(
+            '--checkouts',
+            type=int,
+            default=200,
+            help='Number of checkouts to attempt'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Number of concurrent workers'
+        )
+        parser.add_argument(
+            '--quantity',
+            type=int,
+            default=1,
+            help='Quantity bought by every checkout'
+        )
+
+    def handle(self, *args, **options):
+        stock = options['stock']
+        quantity = options['quantity']
+        user = get_user_model().objects.create_user(
+            username='stock-benchmark', email='stock-benchmark@example.com'
+        )
+        category = Category.objects.create(name='Stock benchmark')
+        product = Product.objects.create(
+            name='Stock benchmark', description='Stock benchmark',
+            category=category, price=1, stock=stock
+        )
+        try:
+            started = time.monotonic()
+            with ThreadPoolExecutor(options['workers']) as executor:
+                results = list(executor.map(
+                    checkout,
+                    [user.pk] * options['checkouts'],
+                    [product.pk] * options['checkouts'],
+                    [quantity] * options['checkouts'],
+                ))
+            elapsed = time.monotonic() - started
+            product.refresh_from_db()
+            holds = StockHold.objects.filter(product=product).count()
+            orders = user.orders.filter(
+                status=settings.ORDER_STATUS_PLACED
+            ).count()
+        finally:
+            user.delete()
+            category.delete()
+
+        sold = sum(1 for success, _ in results if success)
+        expected = min(options['checkouts'], stock // quantity)
+        self.stdout.write(
+            f'{len(results)} checkouts in {elapsed:.2f}s '
+            f'({len(results) / elapsed:.0f}/s), '
+            f'{sum(retries for _, retries in results)} lock retries'
+        )
+        if product.stock != stock - sold * quantity:
+            raise CommandError(
+                f'Lost updates: {sold} sold from {stock}, '
+                f'{product.stock} left'
+            )
+        if product.reserved or holds:
+            raise CommandError(
+                f'Stale reservations: {product.reserved} reserved, '
+                f'{holds} holds left'
+            )
+        if orders != sold:
+            raise CommandError(f'Placed {orders} orders for {sold} sales')
+        if sold != expected:
+            raise CommandError(f'Sold {sold} checkouts, expected {expected}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Sold {sold}, {product.stock} left, no holds or '
+            f'overselling'
+        ))
@@ -0,0 +1,93 @@
+"""
+Django management command for checking index usage of hot queries.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import QuerySet
+
+from orders.models import Order, ReviewEligibility
+from products.models import Product, Review
+from products.pagination import PRODUCT_ORDERINGS
+
+SAMPLE_ID = 1
+PAGE_SIZE = 12
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!.*\bUSING\b)(?!CONSTANT ROW)'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+}
+
+
+def get_canonical_queries() -> dict[str, QuerySet]:
+    """Return querysets shaped like the storefront's hot queries."""
+    active = Product.objects.filter(is_active=True)
+    return {
+        'product_list_newest': active.order_by(
+            *PRODUCT_ORDERINGS['newest']
+        )[:PAGE_SIZE],
+        'product_list_category': active.filter(
+            category_id__in=[SAMPLE_ID]
+        ).order_by(*PRODUCT_ORDERINGS['newest'])[:PAGE_SIZE],
+        'product_list_price': active.order_by(
+            *PRODUCT_ORDERINGS['price_asc']
+        )[:PAGE_SIZE],
+        'product_list_popularity': active.order_by(
+            *PRODUCT_ORDERINGS['popularity']
+        )[:PAGE_SIZE],
+        'order_history': Order.objects.filter(
+            user_id=SAMPLE_ID
+        ).order_by('-created_at')[:PAGE_SIZE],
+        'orders_by_status': Order.objects.filter(status='pending'),
+        'product_reviews': Review.objects.filter(
+            product_id=SAMPLE_ID
+        ).order_by('-created_at')[:PAGE_SIZE],
+        'user_can_review': ReviewEligibility.objects.filter(
+            user_id=SAMPLE_ID,
+            product_id=SAMPLE_ID
+        ).values('pk')[:1],
+    }
+
+
+def uses_full_scan(plan: str, vendor: str | None = None) -> bool:
+    """Return whether a query plan reads a whole table."""
+    pattern = FULL_SCAN_PATTERNS.get(vendor or connection.vendor)
+    if pattern is None:
+        return False
+    return bool(pattern.search(plan))
+
+
+class Command(BaseCommand):
+    help = 'Explain canonical storefront queries and report index usage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error if any query scans a whole table'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(
+                f'Unsupported database backend: {connection.vendor}'
+            )
+        scans = []
+        for name, queryset in get_canonical_queries().items():
+            plan = queryset.explain()
+            if uses_full_scan(plan):
+                scans.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name}: full scan'))
+            else:
+                self.stdout.write(
+                    self.style.SUCCESS(f'✓ {name}: index scan')
+                )
+            if options['verbosity'] > 1:
+                self.stdout.write(plan)
+
+        if scans and options['fail_on_scan']:
+            raise CommandError(
+                f'Queries without index: {", ".join(scans)}'
+            )
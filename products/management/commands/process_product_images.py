@@ -0,0 +1,62 @@
+"""
+Django management command for generating product image renditions.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from products.media import process_product_images
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Generate resized renditions of product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.MEDIA_PIPELINE_WORKERS,
+            help='Number of processes resizing images'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of products processed per batch'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Render again images that already have renditions'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(image_width__isnull=True)
+
+        started = time.monotonic()
+        updated = rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            counts = process_product_images(
+                batch, options['workers'], options['force']
+            )
+            updated += counts[0]
+            rendered += counts[1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Updated {updated} products, rendered {rendered} images '
+            f'in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,68 @@
+"""
+Django management command for rebuilding product rating aggregates.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from products.models import RATING_STARS, Product, Review
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized product rating aggregates from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of products updated per query'
+        )
+
+    def handle(self, *args, **options):
+        updated = self.rebuild_ratings(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'✓ Rebuilt ratings for {updated} products')
+        )
+
+    def rebuild_ratings(self, batch_size: int) -> int:
+        """Recalculate rating aggregates for all products in bulk."""
+        star_fields = [f'rating_{stars}_count' for stars in RATING_STARS]
+        totals = {
+            row.pop('product_id'): row
+            for row in Review.objects.values('product_id').annotate(
+                rating_sum=Sum('rating'),
+                rating_count=Count('id'),
+                **{
+                    f'rating_{stars}_count': Count(
+                        'id', filter=Q(rating=stars)
+                    )
+                    for stars in RATING_STARS
+                }
+            ).order_by()
+        }
+
+        now = timezone.now()
+        with transaction.atomic():
+            products = []
+            for product in Product.objects.only('id').iterator(
+                    chunk_size=batch_size):
+                row = totals.get(product.id, {})
+                product.rating_sum = row.get('rating_sum', 0)
+                product.rating_count = row.get('rating_count', 0)
+                product.rating_avg = (
+                    product.rating_sum / product.rating_count
+                    if product.rating_count else 0
+                )
+                for field in star_fields:
+                    setattr(product, field, row.get(field, 0))
+                product.updated_at = now
+                products.append(product)
+            Product.objects.bulk_update(
+                products,
+                [*Product.RATING_FIELDS, 'updated_at'],
+                batch_size=batch_size,
+            )
+        return len(products)
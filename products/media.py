@@ -0,0 +1,267 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import repeat
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils import timezone
+from django.utils.encoding import filepath_to_uri
+from PIL import Image, ImageOps
+
+from products.cache import invalidate_catalog
+from products.models import Product
+
+RENDITION_DIR = 'product_images/renditions'
+FORMAT_EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+IMAGE_FIELDS = ('image_hash', 'image_width', 'image_height',
+                'image_renditions')
+
+
+def hash_file(file: File) -> str:
+    """Return SHA-256 hex digest of a file read in chunks.
+
+    Files opened from storage are closed afterwards; anything else is
+    rewound so it can still be saved.
+    """
+    digest = hashlib.sha256()
+    file.open('rb')
+    try:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    finally:
+        if getattr(file, '_committed', False):
+            file.close()
+        else:
+            file.seek(0)
+    return digest.hexdigest()
+
+
+def get_url_builder(storage=default_storage) -> Callable[[str], str]:
+    """Return function giving the same URLs as ``storage.url``.
+
+    File system storage joins the quoted name to its base URL, which
+    plain concatenation does without parsing both URLs per file. Names
+    ``urljoin`` would normalize, and other storages, use ``url()``.
+    """
+    base_url = getattr(storage, 'base_url', None)
+    if (not isinstance(storage, FileSystemStorage) or not base_url
+            or not base_url.endswith('/')):
+        return storage.url
+
+    def url(name: str) -> str:
+        if '//' in name or '/.' in f'/{name}':
+            return storage.url(name)
+        return base_url + filepath_to_uri(name).lstrip('/')
+    return url
+
+
+def render_image(source: str | bytes, sizes: dict[str, tuple[int, int]],
+                 formats: tuple[str, ...], quality: int
+                 ) -> dict[str, Any] | None:
+    """Resize an image file or its bytes into every rendition.
+
+    Each rendition is the smallest downscale still covering its box,
+    matching the ``object-fit: cover`` boxes images are shown in.
+
+    Runs in worker processes, so it only uses Pillow and returns the
+    encoded files instead of touching Django storage. Returns None for
+    content Pillow cannot read.
+    """
+    try:
+        with Image.open(BytesIO(source) if isinstance(source, bytes)
+                        else source) as original:
+            image = ImageOps.exif_transpose(original)
+            result = {'width': image.width, 'height': image.height,
+                      'renditions': {}}
+            for name, box in sizes.items():
+                scale = max(box[0] / image.width, box[1] / image.height)
+                resized = image
+                if scale < 1:
+                    resized = image.resize(
+                        (max(round(image.width * scale), 1),
+                         max(round(image.height * scale), 1)),
+                        Image.Resampling.LANCZOS
+                    )
+                files = {}
+                for image_format in formats:
+                    mode = 'RGB'
+                    if image_format != 'jpeg' and 'A' in resized.getbands():
+                        mode = 'RGBA'
+                    buffer = BytesIO()
+                    resized.convert(mode).save(
+                        buffer, image_format.upper(), quality=quality,
+                        optimize=True
+                    )
+                    files[image_format] = buffer.getvalue()
+                result['renditions'][name] = {
+                    'width': resized.width,
+                    'height': resized.height,
+                    'files': files,
+                }
+            return result
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return None
+
+
+def map_in_pool(render: Callable[..., Any], sources: dict[str, Any],
+                options: tuple, workers: int | None = None
+                ) -> dict[str, Any]:
+    """Call render on each source and options in a process pool."""
+    workers = settings.MEDIA_PIPELINE_WORKERS if workers is None else workers
+    if workers <= 1 or len(sources) <= 1:
+        return {key: render(source, *options)
+                for key, source in sources.items()}
+    with ProcessPoolExecutor(min(workers, len(sources))) as executor:
+        results = executor.map(
+            render, sources.values(), *map(repeat, options)
+        )
+        return dict(zip(sources, results))
+
+
+def render_all(sources: dict[str, str | bytes], workers: int | None = None
+               ) -> dict[str, dict[str, Any] | None]:
+    """Render images keyed by content hash in a process pool."""
+    options = (settings.PRODUCT_IMAGE_RENDITIONS,
+               tuple(settings.PRODUCT_IMAGE_FORMATS),
+               settings.PRODUCT_IMAGE_QUALITY)
+    return map_in_pool(render_image, sources, options, workers)
+
+
+def store_renditions(content_hash: str, result: dict[str, Any]
+                     ) -> dict[str, dict[str, Any]]:
+    """Save rendered files under their content hash and map them.
+
+    Paths depend on the content only, so files already written for an
+    identical image are reused.
+    """
+    renditions = {}
+    for name, rendition in result['renditions'].items():
+        entry = {'width': rendition['width'], 'height': rendition['height']}
+        for image_format, data in rendition['files'].items():
+            path = (f'{RENDITION_DIR}/{content_hash[:2]}/{content_hash}/'
+                    f'{name}.{FORMAT_EXTENSIONS[image_format]}')
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(data))
+            entry[image_format] = path
+        renditions[name] = entry
+    return renditions
+
+
+def get_source(name: str) -> str | bytes:
+    """Return local path of a stored file, or its content."""
+    try:
+        return default_storage.path(name)
+    except NotImplementedError:
+        with default_storage.open(name, 'rb') as file:
+            return file.read()
+
+
+def find_processed(hashes: Iterable[str]) -> dict[str, Product]:
+    """Return one processed product per known image hash."""
+    processed = {}
+    for product in Product.objects.filter(
+            image_hash__in=list(hashes), image_width__isnull=False
+    ).only('image', *IMAGE_FIELDS).order_by('pk'):
+        processed.setdefault(product.image_hash, product)
+    return processed
+
+
+def copy_image(product: Product, source: Product) -> None:
+    """Point product at the stored image and renditions of source."""
+    product.image.name = source.image.name
+    product.image_hash = source.image_hash
+    product.image_width = source.image_width
+    product.image_height = source.image_height
+    product.image_renditions = source.image_renditions
+
+
+def process_product_images(products: Iterable[Product],
+                           workers: int | None = None,
+                           force: bool = False) -> tuple[int, int]:
+    """Hash, deduplicate and render images of products.
+
+    Products sharing content are pointed at one stored original and
+    its renditions, and each distinct image is rendered once. Returns
+    the number of updated products and of rendered images.
+    """
+    by_hash: dict[str, list[Product]] = {}
+    for product in products:
+        if not product.image:
+            continue
+        if not product.image_hash or force:
+            try:
+                product.image_hash = hash_file(product.image)
+            except OSError:
+                continue
+        by_hash.setdefault(product.image_hash, []).append(product)
+    if not by_hash:
+        return 0, 0
+
+    known = {} if force else find_processed(by_hash)
+    sources = {
+        content_hash: get_source(group[0].image.name)
+        for content_hash, group in by_hash.items()
+        if content_hash not in known
+    }
+    rendered = render_all(sources, workers)
+    for content_hash, result in rendered.items():
+        original = by_hash[content_hash][0]
+        if result is None:
+            original.image_width = original.image_height = None
+            original.image_renditions = {}
+            continue
+        original.image_width = result['width']
+        original.image_height = result['height']
+        original.image_renditions = store_renditions(content_hash, result)
+        known[content_hash] = original
+
+    updated = []
+    now = timezone.now()
+    for content_hash, group in by_hash.items():
+        source = known.get(content_hash)
+        for product in group:
+            if source is not None and product is not source:
+                copy_image(product, source)
+            product.updated_at = now
+            updated.append(product)
+    Product.objects.bulk_update(
+        updated, ['image', *IMAGE_FIELDS, 'updated_at']
+    )
+    invalidate_catalog()
+    return len(updated), sum(1 for result in rendered.values() if result)
+
+
+def prepare_upload(product: Product) -> None:
+    """Hash a fresh upload and reuse an identical stored image.
+
+    Called before the product is saved, so a duplicate upload is never
+    written to storage. New content is flagged to be rendered once the
+    row is saved.
+    """
+    image = product.image
+    if not image:
+        product.image_hash = ''
+        product.image_width = product.image_height = None
+        product.image_renditions = {}
+        return
+    if image._committed:
+        return
+    product.image_hash = hash_file(image)
+    source = find_processed([product.image_hash]).get(product.image_hash)
+    if source is not None and default_storage.exists(source.image.name):
+        copy_image(product, source)
+        image._committed = True
+        return
+    product.image_width = product.image_height = None
+    product.image_renditions = {}
+    product._render_image = True
+
+
+def render_upload(product: Product) -> None:
+    """Render renditions of an upload flagged by prepare_upload."""
+    if product.__dict__.pop('_render_image', False):
+        process_product_images([product], workers=1)
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-16 22:47
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('products', 'Review')
+    products = []
+    for row in Review.objects.values('product_id').annotate(
+            rating_sum=Sum('rating'), rating_count=Count('id')).order_by():
+        products.append(Product(
+            id=row['product_id'],
+            rating_sum=row['rating_sum'],
+            rating_count=row['rating_count'],
+            rating_avg=row['rating_sum'] / row['rating_count'],
+        ))
+    Product.objects.bulk_update(
+        products, ['rating_sum', 'rating_count', 'rating_avg'],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_alter_product_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False, help_text='Average review rating'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of all review ratings'),
+        ),
+        migrations.RunPython(
+            populate_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:17
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def populate_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    config = settings.PRODUCT_SEARCH_CONFIG
+    Product.objects.update(search_vector=(
+        SearchVector('name', weight='A', config=config) +
+        SearchVector('description', weight='B', config=config)
+    ))
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS products_product_search_gin '
+        'ON products_product USING gin (search_vector)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'DROP INDEX IF EXISTS products_product_search_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text search document (PostgreSQL only)', null=True),
+        ),
+        migrations.RunPython(populate_search_vectors, drop_search_index),
+    ]
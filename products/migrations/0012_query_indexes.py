@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at', '-id'], name='product_active_cat_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='product_active_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price', 'id'], name='product_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-rating_avg', '-created_at', '-id'], name='product_active_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at'], name='review_product_created_idx'),
+        ),
+    ]
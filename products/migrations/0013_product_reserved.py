@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Quantity held by checkouts awaiting payment'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_product_reserved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='SHA-256 of the image content', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_height',
+            field=models.PositiveIntegerField(editable=False, help_text='Height of the original image in pixels', null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, help_text='Resized image files and sizes by rendition name'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_width',
+            field=models.PositiveIntegerField(editable=False, help_text='Width of the original image in pixels', null=True),
+        ),
+    ]
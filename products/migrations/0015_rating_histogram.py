@@ -0,0 +1,56 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:52
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_rating_histogram(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('products', 'Review')
+    products = {}
+    for row in Review.objects.values('product_id', 'rating').annotate(
+            count=Count('id')).order_by():
+        product = products.setdefault(
+            row['product_id'], Product(id=row['product_id']))
+        setattr(product, f'rating_{row["rating"]}_count', row['count'])
+    Product.objects.bulk_update(
+        products.values(),
+        [f'rating_{stars}_count' for stars in range(1, 6)],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_product_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 1 star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 2 star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 3 star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 4 star reviews'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of 5 star reviews'),
+        ),
+        migrations.RunPython(
+            populate_rating_histogram, migrations.RunPython.noop),
+    ]
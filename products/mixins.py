@@ -1,4 +1,10 @@
-from django.utils.text import slugify
+from typing import Any, Callable
+
+from django.db import IntegrityError, transaction
+
+from products.slugs import allocate_slug
+
+SLUG_SAVE_ATTEMPTS = 3
 
 
 class SlugMixin:
@@ -8,14 +14,29 @@ class SlugMixin:
                              text_field: str = 'name') -> None:
         """Generate unique slug for model."""
         if not getattr(self, slug_field):
-            slug = slugify(getattr(self, text_field))
-            original_slug = slug
-            counter = 1
-            obj_id = getattr(self, 'id', None)
+            setattr(self, slug_field, allocate_slug(
+                model_class, getattr(self, text_field), slug_field,
+                exclude_pk=getattr(self, 'id', None)
+            ))
 
-            while model_class.objects.filter(**{slug_field: slug}).exclude(
-                    id=obj_id).exists() and counter < 100:
-                slug = f"{original_slug}_{counter}"
-                counter += 1
+    def save_with_unique_slug(self, model_class, save: Callable,
+                              *args, **kwargs) -> Any:
+        """Run save, picking another slug if a concurrent insert took it.
 
-            setattr(self, slug_field, slug)
+        Only slugs generated here are retried; a conflicting slug set
+        by the caller is reported as is.
+        """
+        if self.slug:
+            return save(*args, **kwargs)
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            self.generate_unique_slug(model_class)
+            try:
+                with transaction.atomic():
+                    return save(*args, **kwargs)
+            except IntegrityError:
+                taken = model_class.objects.filter(
+                    slug=self.slug
+                ).exclude(pk=self.pk).exists()
+                if not taken or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
+                self.slug = ''
@@ -1,9 +1,36 @@
+from typing import Callable
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files.storage import default_storage
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Now
 
 from products.mixins import SlugMixin
 
+RATING_STARS = (5, 4, 3, 2, 1)
+DEFAULT_PRODUCT_IMAGE_URL = '/media/product_images/default.png'
+
+
+def describe_rendition(rendition: dict | None,
+                       url: Callable[[str], str] | None = None
+                       ) -> dict | None:
+    """Return URLs and size of a stored rendition entry.
+
+    ``url`` builds file URLs, ``default_storage.url`` by default.
+    """
+    if not rendition:
+        return None
+    url = url or default_storage.url
+    return {
+        'url': url(rendition['jpeg']),
+        'webp_url': url(rendition['webp']) if rendition.get('webp') else None,
+        'width': rendition['width'],
+        'height': rendition['height'],
+    }
+
 
 class JournalizedModel(models.Model):
     """Base model with created_at and updated_at fields.
@@ -59,8 +86,7 @@ class Category(JournalizedModel, SlugMixin):
 
     def save(self, *args, **kwargs) -> None:
         """Save category with unique slug."""
-        self.generate_unique_slug(Category)
-        super().save(*args, **kwargs)
+        self.save_with_unique_slug(Category, super().save, *args, **kwargs)
 
     def get_specifications(self) -> dict:
         """Get category-specific specifications."""
@@ -107,6 +133,28 @@ class Product(JournalizedModel, SlugMixin):
         null=True,
         help_text="Product image"
     )
+    image_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="SHA-256 of the image content"
+    )
+    image_width = models.PositiveIntegerField(
+        null=True,
+        editable=False,
+        help_text="Width of the original image in pixels"
+    )
+    image_height = models.PositiveIntegerField(
+        null=True,
+        editable=False,
+        help_text="Height of the original image in pixels"
+    )
+    image_renditions = models.JSONField(
+        default=dict,
+        editable=False,
+        help_text="Resized image files and sizes by rendition name"
+    )
     is_active = models.BooleanField(
         default=True,
         help_text="Whether the product is available for purchase"
@@ -114,26 +162,180 @@ class Product(JournalizedModel, SlugMixin):
     stock = models.PositiveIntegerField(
         help_text="Available stock quantity"
     )
+    reserved = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Quantity held by checkouts awaiting payment"
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Sum of all review ratings"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of reviews"
+    )
+    rating_avg = models.FloatField(
+        default=0,
+        editable=False,
+        help_text="Average review rating"
+    )
+    rating_1_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of 1 star reviews"
+    )
+    rating_2_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of 2 star reviews"
+    )
+    rating_3_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of 3 star reviews"
+    )
+    rating_4_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of 4 star reviews"
+    )
+    rating_5_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of 5 star reviews"
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text search document (PostgreSQL only)"
+    )
+
+    RESERVATION_FIELDS = ('reserved',)
+    RATING_FIELDS = (
+        'rating_sum', 'rating_count', 'rating_avg',
+        *(f'rating_{stars}_count' for stars in RATING_STARS),
+    )
 
     class Meta:
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='product_active_cat_new_idx'
+            ),
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='product_active_new_idx'
+            ),
+            models.Index(
+                fields=['price', 'id'],
+                condition=models.Q(is_active=True),
+                name='product_active_price_idx'
+            ),
+            models.Index(
+                fields=['-rating_avg', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='product_active_rating_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
     def save(self, *args, **kwargs) -> None:
-        """Save product with unique slug."""
-        self.generate_unique_slug(Product)
-        super().save(*args, **kwargs)
+        """Save product with unique slug.
+
+        Reserved stock and rating aggregates are maintained by atomic
+        updates of stock holds and reviews, and are left out of full-row
+        updates so a stale copy cannot undo them.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RESERVATION_FIELDS
+                and field.name not in self.RATING_FIELDS
+            ]
+        self.save_with_unique_slug(Product, super().save, *args, **kwargs)
 
     @property
     def get_image_url(self) -> str:
         """Return image URL or default image."""
         if self.image and hasattr(self.image, 'url'):
             return self.image.url
-        return '/media/product_images/default.png'
+        return DEFAULT_PRODUCT_IMAGE_URL
+
+    def get_rendition(self, name: str) -> dict | None:
+        """Return URLs and size of a resized image, if generated."""
+        return describe_rendition((self.image_renditions or {}).get(name))
+
+    def get_rendition_url(self, name: str) -> str:
+        """Return URL of a resized image, falling back to the original."""
+        rendition = self.get_rendition(name)
+        return rendition['url'] if rendition else self.get_image_url
+
+    @property
+    def available_stock(self) -> int:
+        """Return stock not held by pending checkouts."""
+        return max(self.stock - self.reserved, 0)
+
+    @property
+    def rating_rounded(self) -> int:
+        """Return average rating rounded to whole stars."""
+        return round(self.rating_avg or 0)
+
+    @property
+    def rating_histogram(self) -> list[dict[str, int]]:
+        """Return review count and share of each star rating, 5 to 1."""
+        rows = []
+        for stars in RATING_STARS:
+            count = getattr(self, f'rating_{stars}_count')
+            rows.append({
+                'stars': stars,
+                'count': count,
+                'percent': (round(100 * count / self.rating_count)
+                            if self.rating_count else 0),
+            })
+        return rows
+
+    @staticmethod
+    def apply_rating_delta(product_id: int, rating_delta: int,
+                           count_delta: int,
+                           star_deltas: dict[int, int] | None = None
+                           ) -> None:
+        """Shift rating aggregates of a product by the given deltas.
+
+        star_deltas maps star ratings to changes of their review counts.
+        ``updated_at`` moves too, as the rating is part of the product
+        page and its validators.
+        """
+        with transaction.atomic():
+            Product.objects.filter(pk=product_id).update(
+                rating_sum=F('rating_sum') + rating_delta,
+                rating_count=F('rating_count') + count_delta,
+                updated_at=Now(),
+                **{
+                    f'rating_{stars}_count':
+                        F(f'rating_{stars}_count') + delta
+                    for stars, delta in (star_deltas or {}).items()
+                    if delta
+                }
+            )
+            Product.objects.filter(pk=product_id).update(
+                rating_avg=Case(
+                    When(rating_count=0, then=Value(0.0)),
+                    default=(Cast('rating_sum', FloatField()) /
+                             F('rating_count')),
+                    output_field=FloatField(),
+                )
+            )
 
     def user_can_review(self, user) -> bool:
         """Check if user can review this product."""
@@ -141,11 +343,9 @@ class Product(JournalizedModel, SlugMixin):
             return False
         if user.is_staff:
             return True
-        from orders.models import OrderItem
-        return OrderItem.objects.filter(
-            order__user=user,
-            order__status='delivered',
-            product=self
+        from orders.models import ReviewEligibility
+        return ReviewEligibility.objects.filter(
+            user=user, product=self
         ).exists()
 
 
@@ -189,10 +389,35 @@ class Review(JournalizedModel):
         verbose_name_plural = 'Reviews'
         ordering = ('-created_at',)
         unique_together = ('user', 'product')
+        indexes = [
+            models.Index(
+                fields=['product', '-created_at'],
+                name='review_product_created_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return f'{self.user.username}: {self.rating} - {self.comment}'
 
     def save(self, *args, **kwargs) -> None:
-        """Save review."""
-        super().save(*args, **kwargs)
+        """Save review and keep product rating aggregates current."""
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values('product_id', 'rating').first()
+            super().save(*args, **kwargs)
+            if previous is None:
+                Product.apply_rating_delta(
+                    self.product_id, self.rating, 1, {self.rating: 1})
+            elif previous['product_id'] != self.product_id:
+                Product.apply_rating_delta(
+                    previous['product_id'], -previous['rating'], -1,
+                    {previous['rating']: -1})
+                Product.apply_rating_delta(
+                    self.product_id, self.rating, 1, {self.rating: 1})
+            elif previous['rating'] != self.rating:
+                Product.apply_rating_delta(
+                    self.product_id, self.rating - previous['rating'], 0,
+                    {previous['rating']: -1, self.rating: 1})
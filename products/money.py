@@ -0,0 +1,27 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any
+
+CENT = Decimal('0.01')
+
+
+def to_cents(amount: Any) -> int:
+    """Convert an amount, possibly a "$12.50" string, to integer cents."""
+    try:
+        value = Decimal(str(amount).replace('$', '').strip())
+    except InvalidOperation:
+        return 0
+    if not value.is_finite():
+        return 0
+    return int((value * 100).quantize(Decimal('1'), ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents to a Decimal amount."""
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def format_money(amount: Decimal | int | float | None) -> str:
+    """Format an amount as a dollar price for display."""
+    if amount is None or amount == '':
+        return ''
+    return f"${Decimal(str(amount)).quantize(CENT, ROUND_HALF_UP)}"
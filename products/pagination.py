@@ -0,0 +1,212 @@
+import base64
+import datetime
+import hashlib
+import json
+from typing import Any, Iterator
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import Col
+from django.utils.functional import cached_property
+
+from products.cache import get_cache, get_catalog_version
+
+PRODUCT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'price_asc': ('price', 'id'),
+    'price_desc': ('-price', '-id'),
+    'popularity': ('-rating_avg', '-created_at', '-id'),
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping full datetime precision.
+
+    ``DjangoJSONEncoder`` drops microseconds below milliseconds, which
+    would make rows created within one millisecond unreachable.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def get_keyset_ordering(queryset: QuerySet) -> tuple[str, ...]:
+    """Return queryset ordering ending with the primary key.
+
+    The primary key makes every position unique, so rows sharing the
+    other sort values are neither skipped nor repeated.
+    """
+    ordering = tuple(
+        queryset.query.order_by or queryset.model._meta.ordering or ()
+    )
+    if not all(isinstance(field, str) for field in ordering):
+        raise InvalidCursor('Ordering does not support cursors')
+    names = {field.lstrip('-') for field in ordering}
+    if not names & {'pk', 'id'}:
+        descending = bool(ordering) and ordering[0].startswith('-')
+        ordering += ('-id' if descending else 'id',)
+    return ordering
+
+
+def _get_output_field(queryset: QuerySet, name: str):
+    """Return model or annotation field used for ordering by name."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    try:
+        return queryset.model._meta.get_field(
+            'id' if name == 'pk' else name
+        )
+    except FieldDoesNotExist:
+        raise InvalidCursor(f'Cannot paginate by {name!r}') from None
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encode position values as an URL-safe cursor."""
+    raw = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, queryset: QuerySet,
+                  ordering: tuple[str, ...]) -> list[Any]:
+    """Decode cursor into typed position values for ordering."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor('Invalid cursor')
+    try:
+        return [
+            _get_output_field(queryset, field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values)
+        ]
+    except ValidationError as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def build_keyset_filter(ordering: tuple[str, ...],
+                        values: list[Any]) -> Q:
+    """Build condition selecting rows after the given position."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class KeysetPage:
+    """Page of objects following a cursor position."""
+
+    def __init__(self, object_list: list, next_cursor: str | None) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self) -> Iterator:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        """Return whether more objects follow this page."""
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """Paginate a queryset by position instead of offset.
+
+    Each page is fetched with a single ``LIMIT`` query filtered to rows
+    after the cursor, so deep pages cost the same as the first one and
+    no ``COUNT(*)`` is needed.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int) -> None:
+        self.ordering = get_keyset_ordering(queryset)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = per_page
+
+    def page(self, cursor: str | None = None) -> KeysetPage:
+        """Return page of objects after cursor, or the first page."""
+        queryset = self.queryset
+        if cursor:
+            values = decode_cursor(cursor, queryset, self.ordering)
+            queryset = queryset.filter(
+                build_keyset_filter(self.ordering, values)
+            )
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.cursor_for(object_list[-1])
+        return KeysetPage(object_list, next_cursor)
+
+    def cursor_for(self, obj: Any) -> str:
+        """Return cursor pointing right after the given object.
+
+        Rows of ``.values()`` querysets must include the ordering
+        fields under their own names.
+        """
+        if isinstance(obj, dict):
+            return encode_cursor([
+                obj[field.lstrip('-')] for field in self.ordering
+            ])
+        return encode_cursor([
+            getattr(obj, self._get_attname(field.lstrip('-')))
+            for field in self.ordering
+        ])
+
+    def _get_attname(self, name: str) -> str:
+        """Return attribute holding value of an ordering field.
+
+        Aliases are not loaded on instances, so an alias of a plain
+        field reads that field instead.
+        """
+        query = self.queryset.query
+        expression = query.annotations.get(name)
+        if name in query.annotation_select or expression is None:
+            return name
+        if isinstance(expression, Col):
+            return expression.target.attname
+        raise InvalidCursor(f'Cannot paginate by {name!r}')
+
+
+def get_cached_count(queryset: QuerySet) -> int:
+    """Return queryset count cached until the catalog changes.
+
+    Only use for catalog models whose writes bump the catalog version.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(
+        repr((sql, params)).encode(), usedforsecurity=False
+    ).hexdigest()
+    key = f'catalog:count:v{get_catalog_version()}:{digest}'
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.CATALOG_CACHE_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator reading the total from the catalog count cache."""
+
+    @cached_property
+    def count(self) -> int:
+        """Return total number of objects."""
+        if isinstance(self.object_list, QuerySet):
+            return get_cached_count(self.object_list)
+        return super().count
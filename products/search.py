@@ -0,0 +1,169 @@
+import re
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection as default_connection
+from django.db.models import F, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+from products.models import Product
+
+FTS_TABLE = 'products_product_fts'
+GIN_INDEX = 'products_product_search_gin'
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_backend(connection=default_connection) -> str:
+    """Return search backend name for database connection."""
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and _has_fts5(connection):
+        return 'sqlite'
+    return 'fallback'
+
+
+def _has_fts5(connection) -> bool:
+    """Check whether SQLite was compiled with the FTS5 extension."""
+    cached = getattr(connection, '_products_has_fts5', None)
+    if cached is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+            )
+            cached = bool(cursor.fetchone()[0])
+        connection._products_has_fts5 = cached
+    return cached
+
+
+def parse_terms(query: str) -> list[str]:
+    """Split user input into lowercase search terms."""
+    return [term.lower() for term in _TERM.findall(query or '')]
+
+
+def get_search_vector() -> SearchVector:
+    """Return weighted PostgreSQL document for products."""
+    config = settings.PRODUCT_SEARCH_CONFIG
+    return (
+        SearchVector('name', weight='A', config=config) +
+        SearchVector('description', weight='B', config=config)
+    )
+
+
+def search_products(queryset: QuerySet, query: str) -> QuerySet:
+    """Filter products matching query and annotate ``search_rank``.
+
+    PostgreSQL matches the GIN indexed ``search_vector`` column, SQLite
+    an FTS5 table keyed by product id, other backends fall back to
+    ``icontains``. Every term must match as a word prefix so results
+    follow the user while typing. Higher ``search_rank`` is better.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        ).none()
+
+    backend = get_search_backend()
+    if backend == 'postgresql':
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=settings.PRODUCT_SEARCH_CONFIG,
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        )
+
+    if backend == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = Product._meta.db_table
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            (*settings.PRODUCT_SEARCH_WEIGHTS, match),
+            output_field=FloatField(),
+        )
+        matches = RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        )
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def order_by_rank(queryset: QuerySet) -> QuerySet:
+    """Order searched queryset by relevance, then existing ordering."""
+    ordering = queryset.query.order_by or Product._meta.ordering
+    return queryset.order_by('-search_rank', *ordering)
+
+
+def ensure_search_index(connection=default_connection) -> None:
+    """Create search index structures missing from the database."""
+    backend = get_search_backend(connection)
+    if backend == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON '
+                f'{Product._meta.db_table} USING gin (search_vector)'
+            )
+    elif backend == 'sqlite':
+        if FTS_TABLE in connection.introspection.table_names():
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+                f"name, description, tokenize='unicode61 remove_diacritics 2')"
+            )
+        index_products(connection=connection)
+
+
+def index_products(product_ids: Iterable[int] | None = None,
+                   connection=default_connection) -> None:
+    """Refresh search documents of given products, or all products."""
+    backend = get_search_backend(connection)
+    queryset = Product.objects.all()
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        queryset = queryset.filter(pk__in=product_ids)
+
+    if backend == 'postgresql':
+        queryset.update(search_vector=get_search_vector())
+    elif backend == 'sqlite':
+        remove_products(product_ids, connection=connection)
+        sql, params = queryset.values_list(
+            'id', 'name', 'description'
+        ).order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) {sql}',
+                params,
+            )
+
+
+def remove_products(product_ids: Iterable[int] | None = None,
+                    connection=default_connection) -> None:
+    """Drop products from the SQLite search table."""
+    if get_search_backend(connection) != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if product_ids is None:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            return
+        product_ids = list(product_ids)
+        if product_ids:
+            placeholders = ', '.join(['%s'] * len(product_ids))
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                product_ids,
+            )
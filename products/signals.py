@@ -0,0 +1,70 @@
+from django.db import connections
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products.cache import invalidate_catalog
+from products.categories import invalidate_category_tree
+from products.media import prepare_upload, render_upload
+from products.models import Category, Product, Review
+from products.search import (ensure_search_index, index_products,
+                             remove_products)
+
+SEARCH_FIELDS = {'name', 'description'}
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance: Review, **kwargs) -> None:
+    """Remove deleted review rating from product aggregates."""
+    Product.apply_rating_delta(
+        instance.product_id, -instance.rating, -1, {instance.rating: -1}
+    )
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance: Product, update_fields=None,
+                  **kwargs) -> None:
+    """Refresh search document when searchable fields change."""
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    index_products([instance.pk])
+
+
+@receiver(pre_save, sender=Product)
+def product_image_changing(sender, instance: Product, **kwargs) -> None:
+    """Hash new uploads and reuse identical stored images."""
+    prepare_upload(instance)
+
+
+@receiver(post_save, sender=Product)
+def product_image_saved(sender, instance: Product, **kwargs) -> None:
+    """Generate resized renditions of a new upload."""
+    render_upload(instance)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance: Product, **kwargs) -> None:
+    """Remove deleted product from search index."""
+    remove_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def catalog_changed(sender, **kwargs) -> None:
+    """Invalidate cached catalog pages."""
+    invalidate_catalog()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs) -> None:
+    """Reload category tree in every process."""
+    invalidate_category_tree()
+
+
+def create_search_index(sender, using: str, **kwargs) -> None:
+    """Create search index structures after migrations."""
+    ensure_search_index(connections[using])
@@ -0,0 +1,90 @@
+import re
+from typing import Iterable
+
+from django.db.models import Model, Q
+from django.utils.text import slugify
+
+SUFFIX_RESERVE = 6
+
+
+def get_slug_base(text: str, max_length: int) -> str:
+    """Return slugified text leaving room for a numeric suffix."""
+    return slugify(text)[:max_length - SUFFIX_RESERVE].strip('-_')
+
+
+def pick_free_slug(base: str, taken: Iterable[str]) -> str:
+    """Return base or ``base_<n>`` with the lowest n not yet taken."""
+    pattern = re.compile(rf'{re.escape(base)}(?:_(\d+))?')
+    used = set()
+    for slug in taken:
+        match = pattern.fullmatch(slug)
+        if match:
+            used.add(int(match.group(1) or 0))
+    counter = 0
+    while counter in used:
+        counter += 1
+    return f'{base}_{counter}' if counter else base
+
+
+def candidates_filter(slug_field: str, bases: Iterable[str]) -> Q:
+    """Build filter matching every slug derived from the given bases."""
+    query = Q()
+    for base in bases:
+        query |= Q(**{slug_field: base})
+        query |= Q(**{f'{slug_field}__startswith': f'{base}_'})
+    return query
+
+
+def allocate_slug(model_class: type[Model], text: str,
+                  slug_field: str = 'slug', exclude_pk=None) -> str:
+    """Return a free slug for text using a single prefix query."""
+    max_length = model_class._meta.get_field(slug_field).max_length
+    base = get_slug_base(text, max_length)
+    taken = model_class.objects.filter(
+        candidates_filter(slug_field, [base])
+    )
+    if exclude_pk is not None:
+        taken = taken.exclude(pk=exclude_pk)
+    return pick_free_slug(
+        base, taken.values_list(slug_field, flat=True)
+    )
+
+
+class SlugAllocator:
+    """Bulk slug allocation for many new rows of one model.
+
+    Slugs sharing a base with the requested texts are loaded by one
+    query per :meth:`prefetch` call, and every allocated slug is
+    remembered so rows created together never collide.
+    """
+
+    def __init__(self, model_class: type[Model],
+                 slug_field: str = 'slug') -> None:
+        self.model_class = model_class
+        self.slug_field = slug_field
+        self.max_length = model_class._meta.get_field(slug_field).max_length
+        self.taken: dict[str, set[str]] = {}
+
+    def prefetch(self, texts: Iterable[str]) -> None:
+        """Load existing slugs for all texts not seen before."""
+        bases = {
+            get_slug_base(text, self.max_length) for text in texts
+        } - self.taken.keys()
+        if not bases:
+            return
+        for base in bases:
+            self.taken[base] = set()
+        for slug in self.model_class.objects.filter(
+                candidates_filter(self.slug_field, bases)
+        ).values_list(self.slug_field, flat=True):
+            for base in (slug, slug.rpartition('_')[0]):
+                if base in bases:
+                    self.taken[base].add(slug)
+
+    def allocate(self, text: str) -> str:
+        """Return the next free slug for text and mark it as taken."""
+        self.prefetch([text])
+        base = get_slug_base(text, self.max_length)
+        slug = pick_free_slug(base, self.taken[base])
+        self.taken[base].add(slug)
+        return slug
@@ -0,0 +1,85 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (Case, Expression, F, PositiveIntegerField,
+                              Value, When)
+from django.db.models.functions import Now
+
+from products.cache import invalidate_stock
+from products.models import Product
+
+
+def per_product(quantities: dict[int, int], default: int | None = None
+                ) -> Case:
+    """Build expression selecting each product's quantity by its id."""
+    return Case(
+        *[When(pk=product_id, then=Value(quantity))
+          for product_id, quantity in quantities.items()],
+        default=None if default is None else Value(default),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def find_short(quantities: dict[int, int], required: Expression
+               ) -> list[int]:
+    """Return ids of products whose stock does not cover ``required``."""
+    covered = set(
+        Product.objects.filter(
+            pk__in=quantities, stock__gte=required
+        ).values_list('pk', flat=True)
+    )
+    return sorted(pk for pk in quantities if pk not in covered)
+
+
+def update_if_available(quantities: dict[int, int], required: Expression,
+                        **changes) -> list[int]:
+    """Apply changes to all products only if each has enough stock.
+
+    A single UPDATE matches rows whose stock covers ``required``; the
+    database re-checks that guard against the latest row version, so
+    concurrent writers can neither oversell nor lose each other's
+    updates. If any product falls short the statement is rolled back
+    and the ids of short products are returned.
+    """
+    with transaction.atomic(savepoint=False):
+        savepoint = transaction.savepoint()
+        updated = Product.objects.filter(
+            pk__in=quantities, stock__gte=required
+        ).update(**changes)
+        if updated == len(quantities):
+            transaction.savepoint_commit(savepoint)
+            return []
+        transaction.savepoint_rollback(savepoint)
+    return find_short(quantities, required)
+
+
+def take_stock(quantities: dict[int, int]) -> list[int]:
+    """Decrement unreserved stock, returning ids of short products."""
+    quantity = per_product(quantities)
+    short = update_if_available(
+        quantities, F('reserved') + quantity, stock=F('stock') - quantity,
+        updated_at=Now()
+    )
+    if not short:
+        invalidate_stock(quantities)
+    return short
+
+
+def return_stock(quantities: dict[int, int]) -> None:
+    """Increment stock of all products with a single UPDATE."""
+    if not quantities:
+        return
+    Product.objects.filter(pk__in=quantities).update(
+        stock=F('stock') + per_product(quantities), updated_at=Now()
+    )
+    invalidate_stock(quantities)
+
+
+def raise_unavailable(short: list[int]) -> None:
+    """Raise ValidationError naming the first product short of stock."""
+    product = Product.objects.filter(pk__in=short).order_by('pk').first()
+    if product is None:
+        raise ValidationError("Some products are no longer available")
+    raise ValidationError(
+        f"Not enough '{product.name}'. "
+        f"Available: {product.available_stock}"
+    )
@@ -4,6 +4,10 @@ from urllib.parse import urlencode
 from django import template
 from django.db.models import Avg, QuerySet
 
+from products.models import Product
+from products.money import format_money
+from users.models import User
+
 register = template.Library()
 
 
@@ -13,6 +17,36 @@ def template_range(value: int, start: int = 0) -> range:
     return range(start, value)
 
 
+@register.filter
+def money(amount: Any) -> str:
+    """Format a Decimal amount as a dollar price."""
+    return format_money(amount)
+
+
+@register.inclusion_tag('products/includes/picture.html')
+def product_picture(product: Product, rendition: str, css_class: str = '',
+                    lazy: bool = True) -> dict[str, Any]:
+    """Render a product image using its resized rendition if available."""
+    return {
+        'product': product,
+        'rendition': product.get_rendition(rendition),
+        'css_class': css_class,
+        'lazy': lazy,
+    }
+
+
+@register.inclusion_tag('users/includes/avatar.html')
+def user_avatar(user: User, rendition: str, css_class: str = '',
+                alt: str = 'User avatar') -> dict[str, Any]:
+    """Render a profile image using its square avatar if available."""
+    return {
+        'user': user,
+        'avatar': user.get_avatar(rendition),
+        'css_class': css_class,
+        'alt': alt,
+    }
+
+
 @register.filter
 def avg_rating(reviews: QuerySet) -> int:
     """Calculate average rating from reviews queryset."""
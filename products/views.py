@@ -3,22 +3,34 @@ from typing import Any
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Avg, F, Q, QuerySet
-from django.http import HttpResponseRedirect
+from django.core.paginator import Page
+from django.db.models import QuerySet
+from django.http import (Http404, HttpRequest, HttpResponse,
+                         HttpResponseRedirect)
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 
 from orders.cart import Cart
+from products.cache import get_or_build
+from products.categories import (get_category_tree, get_subtree_ids,
+                                 get_tree_version)
+from products.conditional import ConditionalGetMixin, get_list_validators
+from products.detail import (build_public_detail, get_page_state,
+                             get_user_state)
 from products.forms import ReviewForm
-from products.models import Category, Product, Review
+from products.models import Product, Review
+from products.pagination import (PRODUCT_ORDERINGS, InvalidCursor,
+                                 KeysetPage, KeysetPaginator)
+from products.search import order_by_rank, search_products
 
 
-class ProductListView(ListView):
+class ProductListView(ConditionalGetMixin, ListView):
     """View for displaying product list with filtering and sorting."""
     template_name = 'products/product-list.html'
     context_object_name = 'products'
     paginate_by = settings.PRODUCTS_PER_PAGE
+    cursor_kwarg = 'cursor'
 
     def get_queryset(self) -> QuerySet:
         """Get filtered and sorted product queryset."""
@@ -27,60 +39,186 @@ class ProductListView(ListView):
 
         category_ids = self.request.GET.getlist('category')
         if category_ids:
-            queryset = queryset.filter(category_id__in=category_ids)
+            queryset = queryset.filter(
+                category_id__in=get_subtree_ids(category_ids)
+            )
 
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(name__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
-        queryset = queryset.annotate(avg_rating=Avg('reviews__rating'))
+            queryset = search_products(queryset, search_query)
+            if 'sort' not in self.request.GET:
+                return order_by_rank(queryset)
         sort_by = self.request.GET.get('sort', 'newest')
-        if sort_by == 'price_asc':
-            queryset = queryset.order_by('price')
-        elif sort_by == 'price_desc':
-            queryset = queryset.order_by('-price')
-        elif sort_by == 'popularity':
-            queryset = queryset.order_by(
-                F('avg_rating').desc(nulls_last=True),
-                '-created_at'
+        ordering = PRODUCT_ORDERINGS.get(sort_by, PRODUCT_ORDERINGS['newest'])
+        return queryset.order_by(*ordering)
+
+    def get_etag_parts(self) -> tuple:
+        """Return count and latest change of listed products.
+
+        Validators only depend on filters, so they are cached once for
+        all sort orders and pages. The category tree version stands for
+        the category sidebar.
+        """
+        validators, _ = get_or_build(
+            'product_list_etag',
+            {'category': sorted(self.request.GET.getlist('category')),
+             'search': self.request.GET.get('search', '')},
+            lambda: get_list_validators(self.get_queryset(), ('category',))
+        )
+        return validators, get_tree_version()
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> tuple:
+        """Paginate products, reusing cached pages of the catalog.
+
+        Requests with a ``cursor`` parameter get the keyset page used by
+        the "load more" button, which needs neither OFFSET nor COUNT.
+        Numbered pages also expose the cursor following their last item.
+        """
+        paginate = super().paginate_queryset
+        cursor = self.request.GET.get(self.cursor_kwarg)
+
+        def build_page() -> tuple[list[Product], int, int, str | None]:
+            paginator, page, object_list, _ = paginate(queryset, page_size)
+            object_list = list(object_list)
+            next_cursor = None
+            if page.has_next():
+                next_cursor = KeysetPaginator(
+                    queryset, page_size
+                ).cursor_for(object_list[-1])
+            return object_list, paginator.count, page.number, next_cursor
+
+        def build_keyset_page() -> tuple[list[Product], str | None]:
+            try:
+                page = KeysetPaginator(queryset, page_size).page(cursor)
+            except InvalidCursor as e:
+                raise Http404(str(e)) from e
+            return page.object_list, page.next_cursor
+
+        params = {
+            'category': sorted(self.request.GET.getlist('category')),
+            'search': self.request.GET.get('search', ''),
+            'sort': self.request.GET.get('sort', ''),
+            'page': self.request.GET.get(self.page_kwarg, ''),
+            'cursor': cursor,
+        }
+        if cursor is not None:
+            (object_list, self.next_cursor), self.cache_hit = get_or_build(
+                'product_list', params, build_keyset_page
             )
-        elif sort_by == 'newest':
-            queryset = queryset.order_by('-created_at')
-        else:
-            queryset = queryset.order_by('-created_at')
-        return queryset
+            page = KeysetPage(object_list, self.next_cursor)
+            return None, page, object_list, False
+
+        (object_list, count, number, self.next_cursor), self.cache_hit = (
+            get_or_build('product_list', params, build_page)
+        )
+        paginator = self.get_paginator(
+            queryset, page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty()
+        )
+        paginator.count = count
+        page = Page(object_list, number, paginator)
+        return paginator, page, object_list, page.has_other_pages()
+
+    def get_template_names(self) -> list[str]:
+        """Render only product cards for "load more" requests."""
+        if (self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+                and self.cursor_kwarg in self.request.GET):
+            return ['products/includes/product-cards.html']
+        return super().get_template_names()
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """Render product list and report catalog cache outcome."""
+        response = super().get(request, *args, **kwargs)
+        response['X-Cache'] = 'HIT' if self.cache_hit else 'MISS'
+        return response
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         """Get context data for product list page."""
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        context['categories'] = get_category_tree().all()
         context['selected_categories'] = self.request.GET.getlist('category',
                                                                   [])
         context['search_query'] = self.request.GET.get('search', '')
         context['sort_by'] = self.request.GET.get('sort', 'newest')
+        context['next_cursor'] = self.next_cursor
         return context
 
 
-class ProductDetailView(DetailView):
+class ProductDetailView(ConditionalGetMixin, DetailView):
     """View for displaying product details with reviews and cart info."""
     model = Product
     template_name = 'products/product-detail.html'
     slug_field = 'slug'
     context_object_name = 'product'
+    cursor_kwarg = 'reviews_cursor'
+    user_state = None
 
     def get_queryset(self) -> QuerySet:
         """Get active product queryset."""
         return Product.objects.filter(is_active=True).select_related(
             'category')
 
+    def get_etag_parts(self) -> tuple | None:
+        """Return validators of the product and review state of the user.
+
+        Both come from one query; the review state is reused when the
+        page is rendered.
+        """
+        state = get_page_state(
+            self.get_queryset(), self.kwargs[self.slug_url_kwarg],
+            self.request.user
+        )
+        if state is None:
+            return None
+        self.user_state = state['user_state']
+        return state['validators'], self.user_state
+
+    def get_object(self, queryset: QuerySet | None = None) -> Product:
+        """Get product, ratings and a page of reviews from the cache.
+
+        A ``reviews_cursor`` parameter selects the page of reviews
+        following it instead of the newest ones.
+        """
+        get_product = super().get_object
+        cursor = self.request.GET.get(self.cursor_kwarg)
+
+        def build_detail() -> dict[str, Any]:
+            try:
+                return build_public_detail(get_product(queryset), cursor)
+            except InvalidCursor as e:
+                raise Http404(str(e)) from e
+
+        self.detail, self.cache_hit = get_or_build(
+            'product_detail',
+            {'slug': self.kwargs[self.slug_url_kwarg], 'cursor': cursor},
+            build_detail, stocked=lambda detail: [detail['product'].pk]
+        )
+        return self.detail['product']
+
+    def get_template_names(self) -> list[str]:
+        """Render only review cards for "load more" requests."""
+        if (self.request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+                and self.cursor_kwarg in self.request.GET):
+            return ['products/includes/review-cards.html']
+        return super().get_template_names()
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """Render product page and report catalog cache outcome."""
+        response = super().get(request, *args, **kwargs)
+        response['X-Cache'] = 'HIT' if self.cache_hit else 'MISS'
+        return response
+
     def get_context_data(self, **kwargs) -> dict[str, Any]:
-        """Get context data for product detail page."""
+        """Get context data for product detail page.
 
+        Product, its rating histogram and the page of reviews come from
+        the catalog cache; cart quantity and review state of the user
+        are added per request.
+        """
         context = super().get_context_data(**kwargs)
-        context['reviews'] = Review.objects.filter(
-            product=self.object).select_related('user')
+        context.update(self.detail)
+        context.update(self.user_state
+                       or get_user_state(self.object, self.request.user))
 
         context['REVIEW_ALREADY_REVIEWED'] = settings.REVIEW_ALREADY_REVIEWED
         context['REVIEW_AFTER_DELIVERY'] = settings.REVIEW_AFTER_DELIVERY
@@ -88,22 +226,6 @@ class ProductDetailView(DetailView):
 
         cart = Cart(self.request)
         context['cart_quantity'] = cart.get_product_quantity(self.object.id)
-
-        if self.request.user.is_authenticated:
-            context['can_review'] = self.object.user_can_review(
-                self.request.user
-            )
-            user_review = Review.objects.filter(
-                product=self.object,
-                user=self.request.user
-            ).first()
-            context['has_reviewed'] = user_review is not None
-            context['user_review'] = user_review
-        else:
-            context['can_review'] = False
-            context['has_reviewed'] = False
-            context['user_review'] = None
-
         return context
 
 
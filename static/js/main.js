@@ -714,4 +714,46 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
  
- });
\ No newline at end of file
+    // --- "Load more" on Product List and Product Detail Pages ---
+    document.querySelectorAll('.load-more-button').forEach(loadMoreButton => {
+        const grid = document.querySelector(
+            loadMoreButton.dataset.target || '.product-grid'
+        );
+        if (!grid) {
+            return;
+        }
+        loadMoreButton.addEventListener('click', function(e) {
+            e.preventDefault();
+            loadMoreButton.classList.add('disabled');
+
+            fetch(loadMoreButton.href, {
+                headers: {'X-Requested-With': 'XMLHttpRequest'}
+            })
+                .then(response => response.text())
+                .then(html => {
+                    const fragment = document.createElement('div');
+                    fragment.innerHTML = html;
+                    const marker = fragment.querySelector('.load-more');
+                    if (marker) {
+                        marker.remove();
+                    }
+                    grid.querySelectorAll('.load-more').forEach(
+                        el => el.remove()
+                    );
+                    while (fragment.firstElementChild) {
+                        grid.appendChild(fragment.firstElementChild);
+                    }
+
+                    if (marker) {
+                        loadMoreButton.href = marker.dataset.url;
+                        loadMoreButton.classList.remove('disabled');
+                    } else {
+                        loadMoreButton.parentElement.remove();
+                    }
+                })
+                .catch(() => {
+                    window.location.href = loadMoreButton.href;
+                });
+        });
+    });
+});
\ No newline at end of file
@@ -1,8 +1,18 @@
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-from products.models import Product
-from tests.factories import (CategoryFactory, ProductFactory)
+from api.serializers import (CategorySerializer, CategoryValuesSerializer,
+                             ProductSerializer, ProductValuesSerializer,
+                             ReviewSerializer, ReviewValuesSerializer)
+from products.models import Category, Product, Review
+from tests.factories import (CategoryFactory, ProductFactory,
+                             ReviewFactory)
 
 
 @pytest.mark.django_db
@@ -110,3 +120,224 @@ class TestProductAPI:
         response = api_client.get('/api/products/?search=Test')
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data['results']) == 2
+
+
+@pytest.mark.django_db
+class TestProductReviewsAPI:
+    """Test cases for per-product review and rating endpoints."""
+
+    @pytest.mark.api
+    def test_reviews_paginated_by_cursor(self, api_client):
+        """Test reviews of one product are returned page by page."""
+        product = ProductFactory()
+        reviews = ReviewFactory.create_batch(3, product=product)
+        ReviewFactory()
+
+        first = api_client.get(
+            f'/api/products/{product.id}/reviews/', {'page_size': 2}
+        )
+        second = api_client.get(first.data['next'])
+
+        assert first.status_code == status.HTTP_200_OK
+        assert [r['id'] for r in first.data['results']] == [
+            reviews[2].id, reviews[1].id
+        ]
+        assert [r['id'] for r in second.data['results']] == [reviews[0].id]
+        assert second.data['next'] is None
+
+    @pytest.mark.api
+    def test_reviews_query_count(self, api_client,
+                                 django_assert_num_queries):
+        """Test a page of reviews costs one query besides the product."""
+        product = ProductFactory()
+        ReviewFactory.create_batch(5, product=product)
+
+        with django_assert_num_queries(2):
+            api_client.get(f'/api/products/{product.id}/reviews/')
+
+    @pytest.mark.api
+    def test_rating_summary(self, api_client, django_assert_num_queries):
+        """Test the rating summary is read from the product row."""
+        product = ProductFactory()
+        for rating in (5, 4, 4, 1):
+            ReviewFactory(product=product, rating=rating)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(f'/api/products/{product.id}/rating/')
+
+        assert response.data['rating_count'] == 4
+        assert response.data['histogram'][1] == {
+            'stars': 4, 'count': 2, 'percent': 50
+        }
+
+
+@pytest.mark.django_db
+class TestConditionalAPI:
+    """Test cases for conditional GET of catalog API endpoints."""
+
+    @pytest.mark.api
+    def test_unchanged_list_skips_serializer(self, api_client, monkeypatch,
+                                             django_assert_num_queries):
+        """Test a current product list is answered from cached validators."""
+        ProductFactory.create_batch(3)
+        response = api_client.get('/api/products/')
+        monkeypatch.setattr(
+            ProductSerializer, 'to_representation',
+            lambda *args: pytest.fail('serializer ran')
+        )
+
+        with django_assert_num_queries(0):
+            again = api_client.get(
+                '/api/products/', headers={'If-None-Match': response['ETag']}
+            )
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert again['ETag'] == response['ETag']
+
+    @pytest.mark.api
+    def test_list_follows_changes_and_deletions(self, api_client):
+        """Test updates and deletions produce a new product list."""
+        products = ProductFactory.create_batch(3)
+        etags = [api_client.get('/api/products/')['ETag']]
+
+        products[0].price = '1.50'
+        products[0].save()
+        etags.append(api_client.get('/api/products/')['ETag'])
+        Product.objects.filter(pk=products[1].pk).delete()
+        etags.append(api_client.get('/api/products/')['ETag'])
+
+        assert len(set(etags)) == 3
+
+    @pytest.mark.api
+    def test_retrieve_last_modified(self, api_client):
+        """Test product details are validated by their last change."""
+        product = ProductFactory()
+        url = f'/api/products/{product.id}/'
+        response = api_client.get(url)
+
+        again = api_client.get(
+            url, headers={'If-Modified-Since': response['Last-Modified']}
+        )
+        product.category.name = 'Renamed'
+        product.category.save()
+        renamed = api_client.get(
+            url, headers={'If-None-Match': response['ETag']}
+        )
+
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+        assert renamed.status_code == status.HTTP_200_OK
+        assert renamed.data['category']['name'] == 'Renamed'
+
+    @pytest.mark.api
+    def test_categories_and_reviews(self, authenticated_api_client):
+        """Test category and review lists answer current copies with 304."""
+        CategoryFactory()
+        ReviewFactory()
+        for url in ('/api/categories/', '/api/reviews/'):
+            response = authenticated_api_client.get(url)
+
+            again = authenticated_api_client.get(
+                url, headers={'If-None-Match': response['ETag']}
+            )
+
+            assert again.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.api
+    def test_category_deletion(self, api_client):
+        """Test deleting a category produces a new category list."""
+        first, second = CategoryFactory(), CategoryFactory()
+        response = api_client.get('/api/categories/')
+
+        second.delete()
+        again = api_client.get(
+            '/api/categories/', headers={'If-None-Match': response['ETag']}
+        )
+
+        assert again.status_code == status.HTTP_200_OK
+        assert [c['id'] for c in again.data['results']] == [first.id]
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+    """Test cases for list serialization from ``.values()`` rows."""
+
+    @pytest.fixture
+    def context(self):
+        """Return serializer context of an API request."""
+        request = APIRequestFactory().get('/api/products/')
+        return {'request': Request(request)}
+
+    @staticmethod
+    def render(data) -> bytes:
+        """Return JSON bytes of serialized data."""
+        return JSONRenderer().render(data)
+
+    @pytest.mark.unit
+    def test_products_match_model_serializer(self, context):
+        """Test product rows serialize exactly like model instances."""
+        parent = CategoryFactory()
+        with_image = ProductFactory(category=CategoryFactory(parent=parent))
+        ProductFactory(price='7.50')
+        Product.objects.filter(pk=with_image.pk).update(
+            image='product_images/ab/abc.jpg',
+            image_renditions={
+                'card': {'jpeg': 'product_images/renditions/card.jpg',
+                         'webp': 'product_images/renditions/card.webp',
+                         'width': 400, 'height': 300},
+                'thumb': {'jpeg': 'product_images/renditions/thumb.jpg',
+                          'width': 80, 'height': 60},
+            }
+        )
+        queryset = Product.objects.select_related('category__parent')
+
+        expected = ProductSerializer(queryset, many=True, context=context)
+        serializer = ProductValuesSerializer(context)
+
+        assert self.render(serializer.serialize(
+            serializer.values(queryset)
+        )) == self.render(expected.data)
+
+    @pytest.mark.unit
+    def test_categories_and_reviews_match(self, context):
+        """Test category and review rows keep the regular shape."""
+        CategoryFactory(parent=CategoryFactory())
+        ReviewFactory.create_batch(2)
+        for values_class, serializer_class, queryset in (
+                (CategoryValuesSerializer, CategorySerializer,
+                 Category.objects.all()),
+                (ReviewValuesSerializer, ReviewSerializer,
+                 Review.objects.all())):
+            serializer = values_class(context)
+
+            assert self.render(serializer.serialize(
+                serializer.values(queryset)
+            )) == self.render(
+                serializer_class(queryset, many=True, context=context).data
+            )
+
+    @pytest.mark.api
+    def test_search_pages_by_cursor(self, api_client):
+        """Test keyset pages of ranked rows follow their cursor."""
+        for name in ('Pale Malt', 'Malt Mill', 'Malt Scoop'):
+            ProductFactory(name=name)
+        params = {'search': 'malt', 'cursor': '', 'page_size': 2}
+
+        first = api_client.get('/api/products/', params)
+        second = api_client.get(first.data['next'])
+
+        ids = [p['id'] for p in first.data['results']]
+        ids += [p['id'] for p in second.data['results']]
+        assert len(set(ids)) == 3
+        assert second.data['next'] is None
+
+    @pytest.mark.integration
+    def test_benchmark_command(self):
+        """Test the benchmark reports every page size and cleans up."""
+        out = StringIO()
+
+        call_command('benchmark_serializers', '--sizes', '2', '5',
+                     '--repeat', '1', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert [line.split()[0] for line in lines[1:3]] == ['2', '5']
+        assert not Product.objects.exists()
@@ -0,0 +1,291 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from config.query_budget import (QueryBudgetExceeded, assert_query_budget,
+                                 normalize_sql)
+from products.models import Product
+from tests.factories import (CategoryFactory, DeliveredOrderFactory,
+                             OrderItemFactory, PendingOrderFactory,
+                             ProductFactory, ReviewFactory, UserFactory)
+
+
+@pytest.fixture
+def catalog():
+    """Create a catalog large enough to expose per-row queries."""
+    parent = CategoryFactory()
+    categories = CategoryFactory.create_batch(3, parent=parent)
+    products = []
+    for category in categories:
+        products += ProductFactory.create_batch(
+            4, category=category, stock=500
+        )
+    reviewers = UserFactory.create_batch(2)
+    for product in products[:9]:
+        for reviewer in reviewers:
+            ReviewFactory(product=product, user=reviewer)
+    return products
+
+
+@pytest.fixture
+def shopper(client, user, catalog):
+    """Logged in user with order history and a filled cart."""
+    delivered = DeliveredOrderFactory(user=user)
+    for product in catalog[:4]:
+        OrderItemFactory(order=delivered, product=product, quantity=1)
+    pending = PendingOrderFactory(user=user)
+    for product in catalog[4:8]:
+        OrderItemFactory(order=pending, product=product, quantity=1)
+    ReviewFactory(user=user, product=catalog[0])
+
+    client.force_login(user)
+    for product in catalog[:4]:
+        client.post(
+            reverse('orders:cart_add', args=[product.id]), {'quantity': 1}
+        )
+    return client
+
+
+class TestQueryShapeDetection:
+    """Test cases for query shape normalization and N+1 detection."""
+
+    def test_normalize_sql_strips_literals(self):
+        """Test literals and placeholders collapse to the same shape."""
+        first = normalize_sql(
+            'SELECT * FROM "products_product" WHERE "id" = 1 LIMIT 21'
+        )
+        second = normalize_sql(
+            "SELECT * FROM \"products_product\"  WHERE \"id\" = 42 LIMIT 21"
+        )
+        assert first == second
+
+    def test_normalize_sql_collapses_in_lists(self):
+        """Test IN lists of different lengths share a shape."""
+        assert normalize_sql('WHERE id IN (%s, %s)') == normalize_sql(
+            'WHERE id IN (%s, %s, %s, %s)'
+        )
+
+    def test_repeated_queries_flagged(self, catalog):
+        """Test repeated identical query shapes are reported as N+1."""
+        with pytest.raises(QueryBudgetExceeded, match='suspected N\\+1'):
+            with assert_query_budget(budget=100):
+                for product in catalog[:3]:
+                    Product.objects.get(id=product.id)
+
+    def test_budget_exceeded(self, catalog):
+        """Test exceeding the query budget raises."""
+        with pytest.raises(QueryBudgetExceeded, match='exceed budget'):
+            with assert_query_budget(budget=1):
+                list(Product.objects.all())
+                list(Product.objects.filter(is_active=True))
+
+    def test_within_budget(self, catalog):
+        """Test batched access stays within budget."""
+        with assert_query_budget(budget=1) as recorder:
+            list(Product.objects.filter(id__in=[p.id for p in catalog]))
+        assert recorder.count == 1
+
+    def test_middleware_reports_headers(self, client, query_budget, catalog):
+        """Test middleware exposes query count and DB time headers."""
+        response = client.get(reverse('products:product-list'))
+        assert int(response['X-DB-Query-Count']) > 0
+        assert float(response['X-DB-Time-Ms']) >= 0
+
+
+@pytest.mark.django_db
+class TestHtmlQueryBudgets:
+    """Query budgets for storefront HTML views."""
+
+    @pytest.mark.integration
+    def test_product_list_budget(self, shopper, query_budget):
+        """Test product list stays within budget."""
+        response = shopper.get(reverse('products:product-list'))
+        assert response.status_code == 200
+
+        response = shopper.get(
+            reverse('products:product-list'),
+            {'sort': 'popularity', 'search': 'Product'}
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.integration
+    def test_product_detail_budget(self, shopper, query_budget, catalog):
+        """Test product detail stays within budget."""
+        response = shopper.get(
+            reverse('products:product-detail', args=[catalog[0].slug])
+        )
+        assert response.status_code == 200
+
+    @pytest.mark.integration
+    def test_cart_detail_budget(self, shopper, query_budget):
+        """Test cart page stays within budget."""
+        response = shopper.get(reverse('orders:cart_detail'))
+        assert response.status_code == 200
+        assert len(response.context['cart']) == 4
+
+    @pytest.mark.integration
+    def test_checkout_page_budget(self, shopper, query_budget):
+        """Test checkout page stays within budget."""
+        response = shopper.get(reverse('orders:checkout'))
+        assert response.status_code == 200
+
+    @pytest.mark.integration
+    def test_checkout_submit_budget(self, shopper, query_budget):
+        """Test placing an order stays within budget."""
+        response = shopper.post(reverse('orders:checkout'), {
+            'shipping_address': '123 Test St',
+            'payment_method': 'cash_on_delivery',
+        })
+        assert response.status_code == 302
+
+    @pytest.mark.integration
+    def test_order_list_budget(self, shopper, query_budget):
+        """Test order list stays within budget."""
+        response = shopper.get(reverse('orders:order_list'))
+        assert response.status_code == 200
+
+    @pytest.mark.integration
+    def test_account_budget(self, shopper, query_budget):
+        """Test account page stays within budget."""
+        response = shopper.get(reverse('users:account'))
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestApiQueryBudgets:
+    """Query budgets for API viewset actions."""
+
+    @pytest.mark.integration
+    def test_category_list_budget(self, shopper, query_budget):
+        """Test category list stays within budget."""
+        response = shopper.get('/api/categories/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 4
+
+        response = shopper.get('/api/categories/', {'search': 'a'})
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_category_retrieve_budget(self, shopper, query_budget, catalog):
+        """Test category detail stays within budget."""
+        response = shopper.get(f'/api/categories/{catalog[0].category_id}/')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_product_list_budget(self, shopper, query_budget, catalog):
+        """Test product list stays within budget."""
+        response = shopper.get('/api/products/')
+        assert response.status_code == status.HTTP_200_OK
+
+        parent = catalog[0].category.parent
+        response = shopper.get('/api/products/', {'category': parent.slug})
+        assert response.data['count'] == len(catalog)
+
+    @pytest.mark.integration
+    def test_product_retrieve_budget(self, shopper, query_budget, catalog):
+        """Test product detail stays within budget."""
+        response = shopper.get(f'/api/products/{catalog[0].id}/')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_review_list_and_retrieve_budget(
+            self, shopper, query_budget, catalog):
+        """Test review endpoints stay within budget."""
+        response = shopper.get('/api/reviews/')
+        assert response.status_code == status.HTTP_200_OK
+
+        review = catalog[0].reviews.first()
+        response = shopper.get(f'/api/reviews/{review.id}/')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_order_list_budget(self, shopper, query_budget, user):
+        """Test order list stays within budget and sorts by total."""
+        response = shopper.get('/api/orders/', {'ordering': '-total_price'})
+        assert response.status_code == status.HTTP_200_OK
+        expected = [
+            str(order.total_price)
+            for order in user.orders.order_by('-subtotal')
+        ]
+        assert [o['total_price'] for o in response.data['results']] == (
+            expected
+        )
+
+    @pytest.mark.integration
+    def test_order_cancel_budget(self, shopper, query_budget, user):
+        """Test order cancellation stays within budget."""
+        order = user.orders.get(status='pending')
+        response = shopper.post(f'/api/orders/{order.id}/cancel/')
+        assert response.status_code == status.HTTP_200_OK
+
+        order.refresh_from_db()
+        assert order.status == 'canceled'
+
+    @pytest.mark.integration
+    def test_user_endpoints_budget(self, shopper, query_budget, user):
+        """Test user endpoints stay within budget."""
+        assert shopper.get('/api/users/').status_code == 200
+        assert shopper.get(f'/api/users/{user.id}/').status_code == 200
+        assert shopper.get('/api/users/me/').status_code == 200
+        response = shopper.patch(
+            '/api/users/update_me/', {'city': 'Brewtown'},
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_cart_list_budget(self, shopper, query_budget):
+        """Test cart contents stay within budget."""
+        response = shopper.get('/api/cart/')
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['items']) == 4
+
+    @pytest.mark.integration
+    def test_cart_write_budgets(self, shopper, query_budget, catalog):
+        """Test cart mutations stay within budget."""
+        product = catalog[6]
+        response = shopper.post(
+            '/api/cart/', {'product_id': product.id, 'quantity': 1},
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = shopper.put(
+            f'/api/cart/{product.id}/', {'quantity': 2},
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = shopper.delete(f'/api/cart/{product.id}/')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_cart_clear_budget(self, shopper, query_budget):
+        """Test clearing the cart stays within budget."""
+        response = shopper.post('/api/cart/clear/')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.integration
+    def test_admin_write_budgets(self, client, admin_user, query_budget,
+                                 catalog):
+        """Test admin write actions stay within budget."""
+        client.force_login(admin_user)
+        category = catalog[0].category
+
+        response = client.post('/api/products/', {
+            'name': 'New Product', 'description': 'Fresh',
+            'category_id': category.id, 'price': '9.99', 'stock': 5,
+        }, content_type='application/json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = client.patch(
+            f'/api/products/{catalog[1].id}/', {'price': '19.99'},
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        response = client.post(
+            '/api/categories/', {'name': 'Yeast'},
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
@@ -78,7 +78,7 @@ class TestCompleteUserJourney:
             ),
             'payment_method': 'card',
             'card_number': '4111111111111111',
-            'expiry_date': '12/25',
+            'expiry_date': '12/35',
             'cvv': '123',
             'card_holder': 'New User'
         }
@@ -260,7 +260,7 @@ class TestOrderManagementWorkflow:
 
         client.force_login(user)
 
-        order = OrderFactory(user=user, status='pending')
+        order = OrderFactory(user=user, status='placed')
         OrderItemFactory(
             order=order, product=product, quantity=3, price=product.price
         )
@@ -1,6 +1,11 @@
+from decimal import Decimal
+
 from django.http import HttpRequest, HttpResponse
 
 from orders.cart import Cart
+from orders.reservations import place_holds
+from products.money import to_cents
+from tests.factories import OrderItemFactory, PendingOrderFactory
 
 
 def _mock_get_response(request: HttpRequest) -> HttpResponse:
@@ -26,7 +31,7 @@ class TestCartFunctionality:
         request = create_mock_request()
         cart = Cart(request)
         assert len(cart) == 0
-        assert cart.get_total_price() == "$0.00"
+        assert cart.get_total_price() == Decimal('0.00')
 
     def test_cart_add_item(self, product):
         """Test adding item to cart."""
@@ -35,8 +40,8 @@ class TestCartFunctionality:
         quantity = 2
         cart.add(product, quantity)
         assert len(cart) == quantity
-        assert cart.cart[str(product.id)]['quantity'] == quantity
-        assert cart.cart[str(product.id)]['price'] == float(product.price)
+        assert cart.get_product_quantity(product.id) == quantity
+        assert cart.cart[str(product.id)][1] == to_cents(product.price)
 
     def test_cart_add_existing_item(self, product):
         """Test adding existing item to cart updates quantity."""
@@ -45,7 +50,7 @@ class TestCartFunctionality:
         cart.add(product, 2)
         cart.add(product, 3)
         assert len(cart) == 5
-        assert cart.cart[str(product.id)]['quantity'] == 5
+        assert cart.get_product_quantity(product.id) == 5
 
     def test_cart_remove_item(self, product):
         """Test removing item from cart."""
@@ -71,8 +76,7 @@ class TestCartFunctionality:
         request = create_mock_request()
         cart = Cart(request)
         cart.add(product, 2)
-        expected_total = 2 * float(product.price)
-        assert cart.get_total_price() == f"${expected_total:.2f}"
+        assert cart.get_total_price() == Decimal(str(product.price)) * 2
 
     def test_cart_iteration(self, product):
         """Test cart iteration."""
@@ -89,7 +93,7 @@ class TestCartFunctionality:
         cart = Cart(request)
         cart.add(product, 2)
         cart.add(product, 1, override_quantity=True)
-        assert cart.cart[str(product.id)]['quantity'] == 1
+        assert cart.get_product_quantity(product.id) == 1
 
     def test_cart_add_with_override_false(self, product):
         """Test adding item with override=False (default behavior)."""
@@ -97,7 +101,7 @@ class TestCartFunctionality:
         cart = Cart(request)
         cart.add(product, 2)
         cart.add(product, 3, override_quantity=False)
-        assert cart.cart[str(product.id)]['quantity'] == 5
+        assert cart.get_product_quantity(product.id) == 5
 
     def test_cart_add_with_override_true(self, product):
         """Test adding item with override=True."""
@@ -105,7 +109,7 @@ class TestCartFunctionality:
         cart = Cart(request)
         cart.add(product, 2)
         cart.add(product, 3, override_quantity=True)
-        assert cart.cart[str(product.id)]['quantity'] == 3
+        assert cart.get_product_quantity(product.id) == 3
 
     def test_cart_empty_after_clear(self, product):
         """Test cart is empty after clearing."""
@@ -115,7 +119,7 @@ class TestCartFunctionality:
         assert len(cart) == 2
         cart.clear()
         assert len(cart) == 0
-        assert cart.get_total_price() == "$0.00"
+        assert cart.get_total_price() == Decimal('0.00')
 
     def test_cart_remove_nonexistent_item(self, product):
         """Test removing non-existent item from cart."""
@@ -144,3 +148,177 @@ class TestCartFunctionality:
         cart.add(product, -1)
         assert len(cart) == 0
         assert str(product.id) not in cart.cart
+
+    def test_cart_get_products_single_query(
+            self, multiple_products, django_assert_num_queries):
+        """Test all cart products are loaded with one query."""
+        request = create_mock_request()
+        cart = Cart(request)
+        for product in multiple_products:
+            cart.add(product, 1)
+        cart._products = None
+
+        with django_assert_num_queries(1):
+            products = cart.get_products()
+            cart.update_stock_info()
+            items = list(cart.items_with_products())
+
+        assert set(products) == {p.id for p in multiple_products}
+        assert all(item['product'].id == int(item['product_id'])
+                   for item in items)
+
+    def test_cart_update_stock_info_removes_missing_products(
+            self, multiple_products):
+        """Test stock refresh drops deleted products and caps quantity."""
+        request = create_mock_request()
+        cart = Cart(request)
+        removed, limited = multiple_products[:2]
+        cart.add(removed, 1)
+        cart.add(limited, 5)
+        removed.delete()
+        limited.stock = 3
+        limited.save()
+
+        Cart(request).update_stock_info()
+
+        cart = Cart(request)
+        assert str(removed.id) not in cart.cart
+        assert cart.get_product_quantity(limited.id) == 3
+        assert next(iter(cart))['stock'] == 3
+
+    def test_cart_update_stock_info_caps_to_available_stock(
+            self, product, user):
+        """Test quantities held by other checkouts cannot stay in cart."""
+        product.stock = 5
+        product.save()
+        request = create_mock_request()
+        Cart(request).add(product, 4)
+        order = PendingOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=3)
+        place_holds(order)
+
+        Cart(request).update_stock_info()
+
+        cart = Cart(request)
+        assert cart.get_product_quantity(product.id) == 2
+        assert next(iter(cart))['available_stock'] == 2
+
+    def test_empty_cart_not_written_to_session(self):
+        """Test browsing without adding products leaves session alone."""
+        request = create_mock_request()
+        request.session.modified = False
+
+        cart = Cart(request)
+        cart.get_product_quantity(1)
+        cart.update_stock_info()
+
+        assert 'cart' not in request.session
+        assert not request.session.modified
+
+    def test_unchanged_stock_does_not_modify_session(self, product):
+        """Test refreshing up-to-date stock skips the session write."""
+        request = create_mock_request()
+        Cart(request).add(product, 1)
+        request.session.save()
+        request.session.modified = False
+
+        Cart(request).update_stock_info()
+
+        assert not request.session.modified
+
+    def test_clear_removes_cart_from_session(self, product):
+        """Test clearing a cart drops it from the session."""
+        request = create_mock_request()
+        cart = Cart(request)
+        cart.add(product, 1)
+
+        cart.clear()
+
+        assert 'cart' not in request.session
+
+
+class TestCompactCart:
+    """Test cases for the compact versioned cart payload."""
+
+    def test_session_stores_ids_quantities_and_cents(self, product):
+        """Test session holds only quantity and price snapshot."""
+        product.price = Decimal('12.34')
+        product.save()
+        request = create_mock_request()
+
+        Cart(request).add(product, 2)
+
+        assert request.session['cart'] == {
+            'v': 2, 'items': {str(product.id): [2, 1234]}
+        }
+
+    def test_legacy_cart_migrated_on_read(self, product):
+        """Test carts stored in the old format are converted."""
+        request = create_mock_request()
+        request.session['cart'] = {
+            str(product.id): {
+                'quantity': 3, 'price': 9.99, 'name': 'Old',
+                'image': None, 'stock': 5
+            },
+            'broken': {'quantity': 'x', 'price': 1},
+        }
+
+        cart = Cart(request)
+
+        assert request.session['cart'] == {
+            'v': 2, 'items': {str(product.id): [3, 999]}
+        }
+        assert cart.get_total_price() == Decimal('29.97')
+
+    def test_display_fields_from_shared_cache(
+            self, product, django_assert_num_queries):
+        """Test names and stock are hydrated without per-request queries."""
+        request = create_mock_request()
+        Cart(request).add(product, 1)
+        list(Cart(request))
+
+        with django_assert_num_queries(0):
+            items = list(Cart(request))
+
+        assert items[0]['name'] == product.name
+        assert items[0]['stock'] == product.stock
+
+    def test_display_fields_follow_product_changes(self, product):
+        """Test renaming a product refreshes cached cart display fields."""
+        request = create_mock_request()
+        Cart(request).add(product, 1)
+        list(Cart(request))
+
+        product.name = 'Renamed'
+        product.save()
+
+        assert next(iter(Cart(request)))['name'] == 'Renamed'
+
+    def test_price_snapshot_kept(self, product):
+        """Test later price changes do not alter the cart line."""
+        product.price = Decimal('5.00')
+        product.stock = 10
+        product.save()
+        request = create_mock_request()
+        Cart(request).add(product, 1)
+
+        product.price = Decimal('7.00')
+        product.save()
+        Cart(request).add(product, 1)
+
+        assert Cart(request).get_total_price() == Decimal('10.00')
+
+    def test_amounts_are_decimals(self, product):
+        """Test cart lines and totals carry Decimal amounts, not strings."""
+        product.price = Decimal('0.10')
+        product.stock = 10
+        product.save()
+        request = create_mock_request()
+        cart = Cart(request)
+        cart.add(product, 3)
+
+        item = next(iter(cart))
+
+        assert item['price'] == Decimal('0.10')
+        assert item['total_price'] == Decimal('0.30')
+        assert cart.get_total_cents() == 30
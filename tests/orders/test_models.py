@@ -37,7 +37,7 @@ class TestOrderModel:
     def test_order_total_price_empty(self):
         """Test order total price with no items."""
         order = OrderFactory()
-        assert order.total_price == '$0.00'
+        assert order.total_price == Decimal('0.00')
 
     @pytest.mark.model
     def test_order_total_price_with_items(self):
@@ -51,7 +51,7 @@ class TestOrderModel:
         OrderItemFactory(order=order, product=product2, quantity=1,
                          price=Decimal('20.00'))
 
-        assert order.total_price == '$40.00'
+        assert order.total_price == Decimal('40.00')
 
     @pytest.mark.model
     def test_order_can_be_canceled_pending(self):
@@ -121,6 +121,99 @@ class TestOrderModel:
         assert product.stock == 5
 
 
+@pytest.mark.django_db
+class TestOrderTotals:
+    """Test cases for stored order totals."""
+
+    def create_order(self):
+        order = OrderFactory()
+        OrderItemFactory(order=order, quantity=2, price=Decimal('10.00'))
+        OrderItemFactory(order=order, quantity=1, price=Decimal('5.50'))
+        return order
+
+    @pytest.mark.model
+    def test_totals_stored_on_item_create(self):
+        """Test adding items updates stored subtotal and count."""
+        order = self.create_order()
+        order.refresh_from_db()
+
+        assert order.subtotal == Decimal('25.50')
+        assert order.items_count == 3
+
+    @pytest.mark.model
+    def test_totals_follow_item_update(self):
+        """Test changing an item adjusts stored totals by the difference."""
+        order = self.create_order()
+        item = order.items.get(price=Decimal('10.00'))
+        item.quantity = 4
+        item.save()
+        order.refresh_from_db()
+
+        assert order.subtotal == Decimal('45.50')
+        assert order.items_count == 5
+
+    @pytest.mark.model
+    def test_totals_follow_item_move(self):
+        """Test moving an item between orders updates both totals."""
+        order = self.create_order()
+        other = OrderFactory()
+        item = order.items.get(price=Decimal('5.50'))
+        item.order = other
+        item.save()
+        order.refresh_from_db()
+        other.refresh_from_db()
+
+        assert order.total_price == Decimal('20.00')
+        assert other.total_price == Decimal('5.50')
+        assert other.items_count == 1
+
+    @pytest.mark.model
+    def test_totals_follow_item_delete(self):
+        """Test deleting an item removes it from stored totals."""
+        order = self.create_order()
+        order.items.get(price=Decimal('10.00')).delete()
+        order.refresh_from_db()
+
+        assert order.total_price == Decimal('5.50')
+        assert order.items_count == 1
+
+    @pytest.mark.model
+    def test_stale_order_save_keeps_totals(self):
+        """Test saving a stale order instance does not reset totals."""
+        order = OrderFactory()
+        stale = type(order).objects.get(pk=order.pk)
+        OrderItemFactory(order=order, quantity=1, price=Decimal('7.00'))
+
+        stale.status = 'shipped'
+        stale.save()
+        stale.refresh_from_db()
+
+        assert stale.status == 'shipped'
+        assert stale.subtotal == Decimal('7.00')
+
+    @pytest.mark.model
+    def test_recalculate_totals(self):
+        """Test totals can be rebuilt from items."""
+        order = self.create_order()
+        type(order).objects.filter(pk=order.pk).update(
+            subtotal=0, items_count=0
+        )
+        order.recalculate_totals()
+        order.refresh_from_db()
+
+        assert order.subtotal == Decimal('25.50')
+        assert order.items_count == 3
+
+    @pytest.mark.model
+    def test_total_price_needs_no_query(self, django_assert_num_queries):
+        """Test total price is read without querying items."""
+        order = self.create_order()
+        order.refresh_from_db()
+
+        with django_assert_num_queries(0):
+            assert order.total_price == Decimal('25.50')
+
+
 @pytest.mark.django_db
 class TestOrderItemModel:
     """Test cases for OrderItem model."""
@@ -164,7 +257,7 @@ class TestOrderItemModel:
             price=Decimal('15.50')
         )
 
-        assert order_item.total == '$46.50'
+        assert order_item.total == Decimal('46.50')
 
     @pytest.mark.model
     def test_order_item_total_with_zero_values(self):
@@ -174,7 +267,7 @@ class TestOrderItemModel:
             price=Decimal('0.00')
         )
 
-        assert order_item.total == '$0.00'
+        assert order_item.total == Decimal('0.00')
 
     @pytest.mark.model
     def test_order_item_auto_price_setting(self):
@@ -0,0 +1,234 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import OutboxEmail
+from orders.outbox import (claim_outbox_batch, enqueue_email,
+                           send_outbox_batch)
+from tests.factories import PendingOrderFactory, ProductFactory
+
+
+class FlakyBackend(EmailBackend):
+    """Locmem backend failing for recipients on the fail domain.
+
+    Records the stored status of every email it is handed.
+    """
+
+    opened = 0
+    statuses = []
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        FlakyBackend.statuses.extend(
+            OutboxEmail.objects.filter(
+                subject__in=[m.subject for m in messages]
+            ).values_list('status', flat=True)
+        )
+        if any(to.endswith('@fail.test') for m in messages for to in m.to):
+            raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def flaky_backend(settings):
+    """Use the flaky locmem backend and reset its counters."""
+    settings.EMAIL_BACKEND = 'tests.orders.test_outbox.FlakyBackend'
+    FlakyBackend.opened = 0
+    FlakyBackend.statuses = []
+    return FlakyBackend
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    """Test cases for the email outbox and its worker."""
+
+    @pytest.mark.model
+    def test_enqueue_does_not_send(self):
+        """Test enqueueing only stores the email."""
+        email = enqueue_email('Hi', 'Body', ['a@example.com'])
+
+        assert email.status == OutboxEmail.STATUS_PENDING
+        assert email.from_email == 'noreply@hopandbarley.com'
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.model
+    def test_batch_sends_over_one_connection(self, flaky_backend):
+        """Test a batch is delivered through a single connection."""
+        for i in range(3):
+            enqueue_email(f'Mail {i}', 'Body', [f'user{i}@example.com'])
+
+        sent, failed = send_outbox_batch(batch_size=10)
+
+        assert (sent, failed) == (3, 0)
+        assert flaky_backend.opened == 1
+        assert [m.subject for m in mail.outbox] == [
+            'Mail 0', 'Mail 1', 'Mail 2'
+        ]
+        assert not OutboxEmail.objects.exclude(
+            status=OutboxEmail.STATUS_SENT
+        ).exists()
+
+    @pytest.mark.model
+    def test_emails_claimed_before_sending(self, flaky_backend):
+        """Test emails are leased to the worker before SMTP starts."""
+        enqueue_email('Hi', 'Body', ['user@example.com'])
+
+        send_outbox_batch()
+
+        assert flaky_backend.statuses == [OutboxEmail.STATUS_SENDING]
+        assert OutboxEmail.objects.get().status == OutboxEmail.STATUS_SENT
+
+    @pytest.mark.model
+    def test_expired_lease_is_claimed_again(self):
+        """Test emails of a worker that died while sending are retried."""
+        email = enqueue_email('Hi', 'Body', ['user@example.com'])
+        claim_outbox_batch(10, timezone.now())
+
+        assert send_outbox_batch() == (0, 0)
+
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        assert send_outbox_batch() == (1, 0)
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutboxEmail.STATUS_SENT, 2)
+
+    @pytest.mark.model
+    def test_expired_lease_at_max_attempts_fails(self):
+        """Test an email whose last attempt died is not claimed again."""
+        email = enqueue_email('Hi', 'Body', ['user@example.com'])
+        claim_outbox_batch(10, timezone.now(), max_attempts=1)
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now()
+        )
+
+        assert send_outbox_batch(max_attempts=1) == (0, 0)
+
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (
+            OutboxEmail.STATUS_FAILED, 1
+        )
+        assert 'Lease expired' in email.last_error
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.model
+    def test_batch_size_limits_delivery(self):
+        """Test only batch size emails are sent per batch."""
+        for i in range(3):
+            enqueue_email(f'Mail {i}', 'Body', ['user@example.com'])
+
+        assert send_outbox_batch(batch_size=2) == (2, 0)
+        assert send_outbox_batch(batch_size=2) == (1, 0)
+        assert send_outbox_batch(batch_size=2) == (0, 0)
+
+    @pytest.mark.model
+    def test_failure_is_retried_with_backoff(self, flaky_backend, settings):
+        """Test failed emails are rescheduled with growing delays."""
+        settings.EMAIL_OUTBOX_RETRY_BACKOFF = 60
+        email = enqueue_email('Hi', 'Body', ['user@fail.test'])
+        enqueue_email('Ok', 'Body', ['user@example.com'])
+
+        before = timezone.now()
+        assert send_outbox_batch() == (1, 1)
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.STATUS_PENDING
+        assert email.attempts == 1
+        assert 'mailbox unavailable' in email.last_error
+        assert email.next_attempt_at >= before + timedelta(seconds=60)
+
+        assert send_outbox_batch() == (0, 0)
+
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        before = timezone.now()
+        assert send_outbox_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at >= before + timedelta(seconds=120)
+
+    @pytest.mark.model
+    def test_failure_gives_up_after_max_attempts(self, flaky_backend):
+        """Test emails are marked failed once attempts are exhausted."""
+        email = enqueue_email('Hi', 'Body', ['user@fail.test'])
+
+        send_outbox_batch(max_attempts=1)
+
+        email.refresh_from_db()
+        assert email.status == OutboxEmail.STATUS_FAILED
+        assert send_outbox_batch() == (0, 0)
+
+    @pytest.mark.model
+    def test_command_drains_outbox(self):
+        """Test management command sends all due emails."""
+        for i in range(5):
+            enqueue_email(f'Mail {i}', 'Body', ['user@example.com'])
+        out = StringIO()
+
+        call_command('send_outbox_emails', '--batch-size=2', stdout=out)
+
+        assert len(mail.outbox) == 5
+        assert 'Sent 5 emails, 0 failed' in out.getvalue()
+
+    @pytest.mark.model
+    def test_command_with_file_backend(self, settings, tmp_path):
+        """Test worker delivers through the file based backend."""
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend'
+        )
+        settings.EMAIL_FILE_PATH = tmp_path
+        enqueue_email('Hi', 'Body', ['user@example.com'])
+        enqueue_email('Hi again', 'Body', ['user@example.com'])
+
+        call_command('send_outbox_emails', stdout=StringIO())
+
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert 'Hi again' in files[0].read_text()
+
+
+@pytest.mark.django_db
+class TestOrderEmailsQueued:
+    """Test order views queue emails instead of sending them."""
+
+    @pytest.mark.integration
+    def test_checkout_queues_notifications(self, client, user):
+        """Test checkout stores customer and admin emails."""
+        client.force_login(user)
+        product = ProductFactory(stock=5)
+        client.post(reverse('orders:cart_add', args=[product.id]),
+                    {'quantity': 1})
+
+        response = client.post(reverse('orders:checkout'), {
+            'shipping_address': '123 Test St',
+            'payment_method': 'cash_on_delivery',
+        })
+
+        assert response.status_code == 302
+        order = user.orders.get()
+        recipients = sorted(
+            email.recipients[0] for email in order.emails.all()
+        )
+        assert recipients == sorted([user.email, 'admin@hopandbarley.com'])
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.integration
+    def test_cancel_queues_status_email(self, client, user):
+        """Test canceling an order queues a status change email."""
+        client.force_login(user)
+        order = PendingOrderFactory(user=user)
+
+        client.post(reverse('orders:cancel_order', args=[order.id]))
+
+        email = order.emails.get()
+        assert email.recipients == [user.email]
+        assert len(mail.outbox) == 0
@@ -0,0 +1,273 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order, StockHold
+from orders.reservations import (confirm_holds, place_holds,
+                                 release_expired_holds, release_holds)
+from products.models import Product
+from tests.factories import OrderItemFactory, PendingOrderFactory
+
+
+@pytest.fixture
+def order_for(user):
+    """Build a pending order for the given product quantities."""
+    def build(*lines):
+        order = PendingOrderFactory(user=user)
+        for product, quantity in lines:
+            OrderItemFactory(order=order, product=product, quantity=quantity)
+        return order
+    return build
+
+
+def expire(order: Order) -> None:
+    """Move all holds of an order into the past."""
+    order.stock_holds.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+
+@pytest.mark.django_db
+class TestStockHolds:
+    """Test cases for stock reservations placed by checkout."""
+
+    @pytest.mark.model
+    def test_hold_reserves_without_taking_stock(self, product, order_for):
+        """Test a hold lowers available stock but keeps stock intact."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 3))
+
+        place_holds(order)
+        product.refresh_from_db()
+
+        assert (product.stock, product.reserved) == (5, 3)
+        assert product.available_stock == 2
+        assert order.stock_holds.get().quantity == 3
+
+    @pytest.mark.model
+    def test_competing_hold_fails_without_side_effects(
+            self, multiple_products, order_for):
+        """Test a hold exceeding available stock reserves nothing."""
+        scarce, plenty = multiple_products[:2]
+        Product.objects.filter(pk__in=[scarce.pk, plenty.pk]).update(stock=4)
+        place_holds(order_for((scarce, 3)))
+        order = order_for((plenty, 1), (scarce, 2))
+
+        with pytest.raises(ValidationError, match='Available: 1'):
+            place_holds(order)
+
+        plenty.refresh_from_db()
+        assert plenty.reserved == 0
+        assert not order.stock_holds.exists()
+
+    @pytest.mark.model
+    def test_confirm_takes_stock(self, product, order_for):
+        """Test confirming turns the reservation into a decrement."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 2))
+        place_holds(order)
+
+        confirm_holds(order)
+        product.refresh_from_db()
+
+        assert (product.stock, product.reserved) == (3, 0)
+        assert not StockHold.objects.exists()
+
+    @pytest.mark.model
+    def test_confirm_after_release_uses_free_stock(self, product, order_for):
+        """Test an expired and released hold is confirmed if stock allows."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 2))
+        place_holds(order)
+        expire(order)
+        release_expired_holds()
+
+        confirm_holds(order)
+        product.refresh_from_db()
+
+        assert (product.stock, product.reserved) == (3, 0)
+
+    @pytest.mark.model
+    def test_confirm_after_release_fails_when_sold(self, product, order_for):
+        """Test released stock taken by another checkout is not oversold."""
+        product.stock = 2
+        product.save()
+        late = order_for((product, 2))
+        place_holds(late)
+        expire(late)
+        release_expired_holds()
+        place_holds(order_for((product, 2)))
+
+        with pytest.raises(ValidationError):
+            confirm_holds(late)
+
+        product.refresh_from_db()
+        assert (product.stock, product.reserved) == (2, 2)
+
+    @pytest.mark.model
+    def test_sweeper_releases_only_expired(self, multiple_products,
+                                           order_for):
+        """Test the sweeper frees expired holds in batches."""
+        first, second, third = multiple_products[:3]
+        Product.objects.update(stock=10)
+        expired = order_for((first, 1), (second, 2))
+        active = order_for((third, 3))
+        place_holds(expired)
+        place_holds(active)
+        expire(expired)
+        out = StringIO()
+
+        call_command('release_expired_holds', '--batch-size', '1',
+                     stdout=out)
+
+        assert 'Released 2 expired stock holds' in out.getvalue()
+        assert list(StockHold.objects.values_list('order', flat=True)) == [
+            active.pk
+        ]
+        assert dict(Product.objects.filter(
+            pk__in=[first.pk, second.pk, third.pk]
+        ).values_list('pk', 'reserved')) == {
+            first.pk: 0, second.pk: 0, third.pk: 3
+        }
+
+    @pytest.mark.model
+    def test_cancel_releases_holds(self, product, order_for):
+        """Test canceling an unpaid order frees its holds, not stock."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 2))
+        place_holds(order)
+
+        order.cancel_order()
+        product.refresh_from_db()
+
+        assert (product.stock, product.reserved) == (5, 0)
+
+    @pytest.mark.model
+    def test_sweeper_cancels_abandoned_order(self, product, order_for):
+        """Test a swept checkout is canceled without restoring stock."""
+        product.stock = 10
+        product.save()
+        order = order_for((product, 3))
+        place_holds(order)
+        expire(order)
+        stale = Order.objects.get(pk=order.pk)
+
+        release_expired_holds()
+        stale.cancel_order()
+        order.refresh_from_db()
+        product.refresh_from_db()
+
+        assert order.status == settings.ORDER_STATUS_CANCELED
+        assert (product.stock, product.reserved) == (10, 0)
+
+    @pytest.mark.model
+    def test_cancel_placed_order_restores_stock(self, product, order_for):
+        """Test canceling an order that took stock gives it back."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 2))
+        place_holds(order)
+        confirm_holds(order)
+        order.status = settings.ORDER_STATUS_PLACED
+        order.save()
+
+        order.cancel_order()
+        product.refresh_from_db()
+
+        assert (product.stock, product.reserved) == (5, 0)
+
+    @pytest.mark.model
+    def test_full_save_keeps_reservation(self, product, order_for):
+        """Test saving a stale product copy does not drop reservations."""
+        product.stock = 5
+        product.save()
+        stale = Product.objects.get(pk=product.pk)
+        place_holds(order_for((product, 2)))
+
+        stale.stock = 8
+        stale.save()
+        stale.refresh_from_db()
+
+        assert (stale.stock, stale.reserved) == (8, 2)
+
+    @pytest.mark.model
+    def test_release_holds_of_order(self, product, order_for):
+        """Test releasing holds returns stock to sale."""
+        product.stock = 5
+        product.save()
+        order = order_for((product, 4))
+        place_holds(order)
+
+        release_holds(order)
+        product.refresh_from_db()
+
+        assert product.reserved == 0
+        assert not order.stock_holds.exists()
+
+
+@pytest.mark.django_db
+class TestCheckoutReservations:
+    """Test cases for checkout placing and confirming stock holds."""
+
+    @pytest.fixture
+    def cart_client(self, client, user, product):
+        """Logged-in client with two units of a product in the cart."""
+        product.stock = 5
+        product.save()
+        client.force_login(user)
+        client.post(reverse('orders:cart_add', args=[product.id]),
+                    {'quantity': 2})
+        return client
+
+    @pytest.mark.view
+    def test_paid_checkout_takes_stock(self, cart_client, product):
+        """Test a successful checkout leaves no holds behind."""
+        response = cart_client.post(reverse('orders:checkout'), {
+            'shipping_address': '1 Test St',
+            'payment_method': 'cash_on_delivery',
+        })
+        product.refresh_from_db()
+
+        assert response.status_code == 302
+        assert (product.stock, product.reserved) == (3, 0)
+        assert not StockHold.objects.exists()
+
+    @pytest.mark.view
+    def test_failed_payment_releases_stock(self, cart_client, product,
+                                           monkeypatch):
+        """Test a failed payment discards the order and its holds."""
+        monkeypatch.setattr(
+            'orders.views.process_payment', lambda *args, **kwargs: False
+        )
+
+        cart_client.post(reverse('orders:checkout'), {
+            'shipping_address': '1 Test St',
+            'payment_method': 'cash_on_delivery',
+        })
+        product.refresh_from_db()
+
+        assert not Order.objects.exists()
+        assert (product.stock, product.reserved) == (5, 0)
+
+    @pytest.mark.view
+    def test_held_stock_not_sold_twice(self, cart_client, product,
+                                       order_for):
+        """Test checkout fails early when others hold the stock."""
+        place_holds(order_for((product, 4)))
+
+        cart_client.post(reverse('orders:checkout'), {
+            'shipping_address': '1 Test St',
+            'payment_method': 'cash_on_delivery',
+        })
+
+        assert Order.objects.count() == 1
+        product.refresh_from_db()
+        assert (product.stock, product.reserved) == (5, 4)
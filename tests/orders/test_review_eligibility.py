@@ -0,0 +1,107 @@
+import pytest
+from django.urls import reverse
+
+from orders.models import Order, ReviewEligibility
+from tests.factories import (DeliveredOrderFactory, OrderItemFactory,
+                             PendingOrderFactory, ProductFactory)
+
+
+def eligible(user) -> set[int]:
+    """Return ids of products the user may review."""
+    return set(ReviewEligibility.objects.filter(user=user).values_list(
+        'product_id', flat=True
+    ))
+
+
+@pytest.mark.django_db
+class TestReviewEligibility:
+    """Test cases for the maintained review eligibility index."""
+
+    @pytest.mark.model
+    def test_granted_on_delivery(self, user, product):
+        """Test delivering an order makes its products reviewable."""
+        order = PendingOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+        assert eligible(user) == set()
+
+        order.status = 'delivered'
+        order.save()
+
+        assert eligible(user) == {product.id}
+
+    @pytest.mark.model
+    def test_granted_for_items_of_delivered_order(self, user, product):
+        """Test items added to a delivered order are reviewable."""
+        order = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+
+        assert eligible(user) == {product.id}
+
+    @pytest.mark.model
+    def test_revoked_when_delivery_undone(self, user):
+        """Test products only a reverted delivery justified are revoked."""
+        kept, dropped = ProductFactory(), ProductFactory()
+        first = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=first, product=kept, quantity=1)
+        OrderItemFactory(order=first, product=dropped, quantity=1)
+        second = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=second, product=kept, quantity=1)
+
+        first = Order.objects.get(pk=first.pk)
+        first.status = 'canceled'
+        first.save()
+
+        assert eligible(user) == {kept.id}
+
+    @pytest.mark.model
+    def test_revoked_when_order_deleted(self, user, product):
+        """Test deleting a delivered order revokes its products."""
+        order = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+
+        order.delete()
+
+        assert eligible(user) == set()
+
+    @pytest.mark.model
+    def test_earliest_delivery_kept(self, user, product):
+        """Test a repeat delivery keeps the first delivery time."""
+        order = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+        delivered_at = ReviewEligibility.objects.get(user=user).delivered_at
+
+        OrderItemFactory(
+            order=DeliveredOrderFactory(user=user), product=product,
+            quantity=1
+        )
+
+        assert ReviewEligibility.objects.get(user=user).delivered_at == (
+            delivered_at
+        )
+
+    @pytest.mark.model
+    def test_lookups_single_query(self, user, django_assert_num_queries):
+        """Test checking one product or a whole page costs one query."""
+        products = ProductFactory.create_batch(3)
+        order = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=order, product=products[0], quantity=1)
+
+        with django_assert_num_queries(1):
+            assert products[0].user_can_review(user)
+        with django_assert_num_queries(1):
+            assert ReviewEligibility.product_ids(
+                user, [p.id for p in products]
+            ) == {products[0].id}
+
+    @pytest.mark.view
+    def test_status_update_view_grants(self, admin_client, user, product):
+        """Test marking an order delivered in the shop grants review."""
+        order = PendingOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+
+        admin_client.post(
+            reverse('orders:update_order_status', args=[order.id]),
+            {'status': 'delivered'}
+        )
+
+        assert product.user_can_review(user)
@@ -0,0 +1,172 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from config.sessions import SessionStore
+
+
+@pytest.fixture
+def write_behind(settings):
+    """Enable session write-behind for a short interval."""
+    settings.SESSION_WRITE_BEHIND_INTERVAL = 60
+    return settings
+
+
+@pytest.mark.django_db
+class TestWriteBehindSessions:
+    """Test cases for the cache-backed session engine."""
+
+    @pytest.mark.model
+    def test_changes_within_interval_stay_in_cache(
+            self, write_behind, django_assert_num_queries):
+        """Test repeated cart writes do not touch the session table."""
+        session = SessionStore()
+        session['cart'] = {'1': {'quantity': 1}}
+        session.save()
+
+        session['cart']['1']['quantity'] = 2
+        with django_assert_num_queries(0):
+            session.save()
+
+        stored = Session.objects.get(pk=session.session_key)
+        assert stored.get_decoded()['cart']['1']['quantity'] == 1
+        assert SessionStore(session.session_key)['cart'] == {
+            '1': {'quantity': 2}
+        }
+
+    @pytest.mark.model
+    def test_database_refreshed_after_interval(self, write_behind):
+        """Test the database copy is updated once the interval passed."""
+        session = SessionStore()
+        session['cart'] = {}
+        session.save()
+        session._cache.delete(session.sync_key)
+
+        session['cart'] = {'2': {'quantity': 3}}
+        session.save()
+
+        stored = Session.objects.get(pk=session.session_key)
+        assert stored.get_decoded()['cart'] == {'2': {'quantity': 3}}
+
+    @pytest.mark.model
+    def test_idle_session_evicted_before_flush(self, write_behind):
+        """Test an evicted session falls back to its last database copy."""
+        session = SessionStore()
+        session['cart'] = {'1': {'quantity': 1}}
+        session.save()
+        session['cart'] = {'1': {'quantity': 2}}
+        session.save()
+
+        session._cache.delete(session.cache_key)
+
+        assert SessionStore(session.session_key)['cart'] == {
+            '1': {'quantity': 1}
+        }
+
+    @pytest.mark.model
+    def test_flush_writes_pending_changes(self, write_behind):
+        """Test flushed changes survive eviction of an idle session."""
+        session = SessionStore()
+        session['cart'] = {'1': {'quantity': 1}}
+        session.save()
+        session['cart'] = {'1': {'quantity': 2}}
+        session.save()
+        unchanged = SessionStore()
+        unchanged['cart'] = {}
+        unchanged.save()
+        write_behind.SESSION_ENGINE = 'config.sessions'
+        out = StringIO()
+
+        call_command('flush_session_writes', '--batch-size', '1',
+                     stdout=out)
+        session._cache.delete(session.cache_key)
+
+        assert SessionStore(session.session_key)['cart'] == {
+            '1': {'quantity': 2}
+        }
+        assert 'Flushed 1 sessions' in out.getvalue()
+
+    @pytest.mark.model
+    def test_write_through_when_disabled(self, settings):
+        """Test every save reaches the database with no interval."""
+        settings.SESSION_WRITE_BEHIND_INTERVAL = 0
+        session = SessionStore()
+        session['cart'] = {}
+        session.save()
+
+        session['cart'] = {'3': {'quantity': 1}}
+        session.save()
+
+        stored = Session.objects.get(pk=session.session_key)
+        assert stored.get_decoded()['cart'] == {'3': {'quantity': 1}}
+
+    @pytest.mark.model
+    def test_delete_removes_both_copies(self, write_behind):
+        """Test deleted sessions are gone from cache and database."""
+        session = SessionStore()
+        session['cart'] = {}
+        session.save()
+        key = session.session_key
+
+        session.delete()
+
+        assert not Session.objects.filter(pk=key).exists()
+        assert not SessionStore().exists(key)
+
+    @pytest.mark.view
+    def test_cart_views_with_engine(self, client, product, settings):
+        """Test the storefront cart works on the write-behind engine."""
+        settings.SESSION_ENGINE = 'config.sessions'
+        product.stock = 10
+        product.save()
+
+        url = reverse('orders:cart_add', args=[product.id])
+        client.post(url, {'quantity': 2})
+        client.post(url, {'quantity': 1})
+        response = client.get(reverse('orders:cart_detail'))
+
+        assert len(response.context['cart']) == 3
+
+
+@pytest.mark.django_db
+class TestClearExpiredSessions:
+    """Test cases for the batched session cleanup command."""
+
+    @pytest.mark.model
+    def test_deletes_only_expired(self):
+        """Test expired sessions are removed across several batches."""
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(session_key=f'expired{i}', session_data='',
+                    expire_date=now - timedelta(days=1))
+            for i in range(5)
+        ] + [
+            Session(session_key='active', session_data='',
+                    expire_date=now + timedelta(days=1))
+        ])
+        out = StringIO()
+
+        call_command('clear_expired_sessions', '--batch-size', '2',
+                     stdout=out)
+
+        assert list(Session.objects.values_list('pk', flat=True)) == [
+            'active'
+        ]
+        assert 'Deleted 5 expired sessions' in out.getvalue()
+
+    @pytest.mark.model
+    def test_rejects_engine_without_database(self, settings):
+        """Test cookie sessions cannot be cleaned up."""
+        from django.core.management.base import CommandError
+
+        settings.SESSION_ENGINE = (
+            'django.contrib.sessions.backends.signed_cookies'
+        )
+
+        with pytest.raises(CommandError):
+            call_command('clear_expired_sessions', stdout=StringIO())
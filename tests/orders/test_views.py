@@ -1,8 +1,13 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from orders.models import OutboxEmail
+from products.models import Product
 from tests.factories import (DeliveredOrderFactory, OrderFactory,
-                             OrderItemFactory, PendingOrderFactory,
+                             OrderItemFactory, PaidOrderFactory,
+                             PendingOrderFactory, ProductFactory,
                              UserFactory)
 
 
@@ -75,7 +80,7 @@ class TestOrderViews:
             'shipping_address': '123 Test St, Test City, TC 12345',
             'payment_method': 'card',
             'card_number': '4111111111111111',
-            'expiry_date': '12/25',
+            'expiry_date': '12/35',
             'cvv': '123',
             'card_holder': 'Test User'
         }
@@ -171,7 +176,7 @@ class TestOrderIntegration:
             'shipping_address': '123 Test St, Test City, TC 12345',
             'payment_method': 'card',
             'card_number': '4111111111111111',
-            'expiry_date': '12/25',
+            'expiry_date': '12/35',
             'cvv': '123',
             'card_holder': 'Test User'
         }
@@ -195,7 +200,7 @@ class TestOrderIntegration:
         """Test order cancellation flow."""
         client.force_login(user)
 
-        order = PendingOrderFactory(user=user)
+        order = PaidOrderFactory(user=user)
         OrderItemFactory(
             order=order, product=product, quantity=2, price=product.price)
 
@@ -209,3 +214,85 @@ class TestOrderIntegration:
 
         product.refresh_from_db()
         assert product.stock == initial_stock + 2
+
+
+@pytest.mark.django_db
+class TestCheckoutPipeline:
+    """Test cases for the transactional checkout pipeline."""
+
+    checkout_data = {
+        'shipping_address': '123 Test St, Test City, TC 12345',
+        'payment_method': 'cash_on_delivery',
+    }
+
+    def fill_cart(self, client, products, quantity=1):
+        for product in products:
+            client.post(
+                reverse('orders:cart_add', args=[product.id]),
+                {'quantity': quantity}
+            )
+
+    @pytest.mark.integration
+    def test_checkout_constant_queries(self, client, user):
+        """Test large carts commit in the same number of queries."""
+        client.force_login(user)
+        query_counts = []
+        for size in (2, 30):
+            products = ProductFactory.create_batch(size, stock=10)
+            self.fill_cart(client, products, quantity=2)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(
+                    reverse('orders:checkout'), data=self.checkout_data
+                )
+            assert response.status_code == 302
+            query_counts.append(len(queries))
+
+            order = user.orders.latest('id')
+            assert order.status == 'placed'
+            assert order.items.count() == size
+            assert order.items_count == size * 2
+            assert set(Product.objects.filter(
+                pk__in=[p.pk for p in products]
+            ).values_list('stock', flat=True)) == {8}
+
+        assert query_counts[0] == query_counts[1]
+
+    @pytest.mark.integration
+    def test_checkout_insufficient_stock_rolls_back(self, client, user):
+        """Test stock shortfall leaves no order and no stock change."""
+        plenty = ProductFactory(stock=10)
+        scarce = ProductFactory(stock=5)
+        client.force_login(user)
+        self.fill_cart(client, [plenty, scarce], quantity=3)
+        scarce.stock = 1
+        scarce.save()
+
+        response = client.post(
+            reverse('orders:checkout'), data=self.checkout_data
+        )
+
+        assert response.status_code == 200
+        assert not user.orders.exists()
+        assert not OutboxEmail.objects.exists()
+        plenty.refresh_from_db()
+        assert plenty.stock == 10
+
+    @pytest.mark.integration
+    def test_checkout_payment_failure_rolls_back(
+            self, client, user, monkeypatch):
+        """Test failed payment leaves no order behind."""
+        monkeypatch.setattr(
+            'orders.views.process_payment', lambda *args, **kwargs: False)
+        product = ProductFactory(stock=10)
+        client.force_login(user)
+        self.fill_cart(client, [product], quantity=2)
+
+        response = client.post(
+            reverse('orders:checkout'), data=self.checkout_data
+        )
+
+        assert response.status_code == 200
+        assert not user.orders.exists()
+        assert not OutboxEmail.objects.exists()
+        product.refresh_from_db()
+        assert product.stock == 10
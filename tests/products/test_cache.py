@@ -0,0 +1,225 @@
+import pytest
+from django.urls import reverse
+
+from products.cache import (bump_catalog_version, get_cache_stats,
+                            get_catalog_version, make_key)
+from products.stock import take_stock
+from tests.factories import (CategoryFactory, OrderFactory, OrderItemFactory,
+                             ProductFactory, ReviewFactory)
+
+
+class TestCacheKeys:
+    """Test cases for versioned catalog cache keys."""
+
+    def test_key_ignores_parameter_order(self):
+        """Test equal parameters produce the same key."""
+        assert make_key('list', {'a': 1, 'b': 2}) == make_key(
+            'list', {'b': 2, 'a': 1}
+        )
+
+    def test_key_changes_with_version(self):
+        """Test bumping the version changes every key."""
+        key = make_key('list', {'page': 1})
+        version = get_catalog_version()
+
+        bump_catalog_version()
+
+        assert get_catalog_version() == version + 1
+        assert make_key('list', {'page': 1}) != key
+
+
+@pytest.mark.django_db
+class TestCatalogPageCache:
+    """Test cases for cached storefront pages."""
+
+    @pytest.mark.view
+    def test_product_list_served_from_cache(self, client):
+        """Test repeated product list requests hit the cache."""
+        ProductFactory.create_batch(3)
+        url = reverse('products:product-list')
+
+        assert client.get(url)['X-Cache'] == 'MISS'
+        response = client.get(url)
+
+        assert response['X-Cache'] == 'HIT'
+        assert len(response.context['products']) == 3
+        assert response.context['page_obj'].paginator.count == 3
+
+    @pytest.mark.view
+    def test_product_list_key_uses_query(self, client, settings):
+        """Test each page and sort order is cached separately."""
+        ProductFactory.create_batch(settings.PRODUCTS_PER_PAGE + 1)
+        url = reverse('products:product-list')
+        client.get(url)
+
+        response = client.get(url, {'page': 2})
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.context['products']) == 1
+
+        response = client.get(url, {'page': 2})
+        assert response['X-Cache'] == 'HIT'
+        assert response.context['page_obj'].number == 2
+        assert response.context['is_paginated']
+
+        assert client.get(url, {'sort': 'price_asc'})['X-Cache'] == 'MISS'
+
+    @pytest.mark.view
+    def test_product_change_invalidates_list(self, client):
+        """Test saving a product drops cached pages."""
+        product = ProductFactory(name='Old Name')
+        url = reverse('products:product-list')
+        client.get(url)
+
+        product.name = 'New Name'
+        product.save()
+        response = client.get(url)
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.context['products'][0].name == 'New Name'
+
+    @pytest.mark.view
+    def test_category_change_invalidates_list(self, client):
+        """Test saving a category drops cached pages."""
+        ProductFactory()
+        url = reverse('products:product-list')
+        client.get(url)
+
+        CategoryFactory()
+
+        assert client.get(url)['X-Cache'] == 'MISS'
+
+    @pytest.mark.view
+    def test_stock_reduction_keeps_list(self, client):
+        """Test stock sold through an order leaves list pages cached."""
+        product = ProductFactory(stock=10)
+        url = reverse('products:product-list')
+        client.get(url)
+        order = OrderFactory()
+        OrderItemFactory(order=order, product=product, quantity=3)
+
+        order.reduce_stock()
+
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+    @pytest.mark.view
+    def test_stock_reduction_expires_sold_detail(self, client):
+        """Test only the page of the sold product is rebuilt."""
+        sold, other = ProductFactory.create_batch(2, stock=10)
+        urls = [reverse('products:product-detail', args=[product.slug])
+                for product in (sold, other)]
+        for url in urls:
+            client.get(url)
+        order = OrderFactory()
+        OrderItemFactory(order=order, product=sold, quantity=3)
+
+        order.reduce_stock()
+        rebuilt, kept = [client.get(url) for url in urls]
+
+        assert rebuilt['X-Cache'] == 'MISS'
+        assert rebuilt.context['product'].stock == 7
+        assert kept['X-Cache'] == 'HIT'
+
+    @pytest.mark.view
+    def test_product_detail_cached(self, client):
+        """Test product detail serves product and reviews from cache."""
+        product = ProductFactory()
+        ReviewFactory(product=product)
+        url = reverse('products:product-detail', args=[product.slug])
+
+        assert client.get(url)['X-Cache'] == 'MISS'
+        response = client.get(url)
+
+        assert response['X-Cache'] == 'HIT'
+        assert response.context['product'] == product
+        assert len(response.context['reviews']) == 1
+
+    @pytest.mark.view
+    def test_review_invalidates_detail(self, client):
+        """Test a new review is shown immediately."""
+        product = ProductFactory()
+        url = reverse('products:product-detail', args=[product.slug])
+        client.get(url)
+
+        ReviewFactory(product=product)
+        response = client.get(url)
+
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.context['reviews']) == 1
+
+    @pytest.mark.view
+    def test_cart_quantity_not_cached(self, client):
+        """Test per-session cart quantity stays correct on cache hits."""
+        product = ProductFactory(stock=10)
+        url = reverse('products:product-detail', args=[product.slug])
+        client.get(url)
+        client.post(
+            reverse('orders:cart_add', args=[product.id]), {'quantity': 2}
+        )
+
+        response = client.get(url)
+
+        assert response['X-Cache'] == 'HIT'
+        assert response.context['cart_quantity'] == 2
+
+    @pytest.mark.view
+    def test_missing_product_not_cached(self, client):
+        """Test unknown slugs keep returning 404."""
+        url = reverse('products:product-detail', args=['missing'])
+        assert client.get(url).status_code == 404
+        assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+class TestCatalogApiCache:
+    """Test cases for cached API product lists."""
+
+    @pytest.mark.api
+    def test_product_list_served_from_cache(self, api_client):
+        """Test repeated API list requests hit the cache."""
+        ProductFactory.create_batch(2)
+
+        first = api_client.get('/api/products/', {'ordering': 'price'})
+        second = api_client.get('/api/products/', {'ordering': 'price'})
+
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT'
+        assert second.data == first.data
+
+    @pytest.mark.api
+    def test_sale_expires_list_showing_product(self, api_client):
+        """Test a sale rebuilds cached lists with the sold product."""
+        product = ProductFactory(stock=10)
+        first = api_client.get('/api/products/')
+
+        take_stock({product.pk: 3})
+        again = api_client.get(
+            '/api/products/', headers={'If-None-Match': first['ETag']}
+        )
+
+        assert again.status_code == 200
+        assert again['X-Cache'] == 'MISS'
+        assert again.data['results'][0]['stock'] == 7
+
+    @pytest.mark.api
+    def test_staff_bypasses_cache(self, admin_api_client):
+        """Test staff see inactive products and are never cached."""
+        ProductFactory(is_active=False)
+
+        response = admin_api_client.get('/api/products/')
+
+        assert 'X-Cache' not in response
+        assert len(response.data['results']) == 1
+
+    @pytest.mark.api
+    def test_stats_endpoint(self, api_client, admin_api_client):
+        """Test hit and miss counters are exposed to admins."""
+        ProductFactory()
+        api_client.get('/api/products/')
+        api_client.get('/api/products/')
+
+        assert api_client.get('/api/cache/stats/').status_code in (401, 403)
+        response = admin_api_client.get('/api/cache/stats/')
+
+        assert response.status_code == 200
+        assert response.data['api_product_list'] == {'hit': 1, 'miss': 1}
+        assert get_cache_stats()['product_list'] == {'hit': 0, 'miss': 0}
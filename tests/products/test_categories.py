@@ -0,0 +1,167 @@
+import pytest
+from django.urls import reverse
+
+from products.categories import (CategoryTree, get_category_tree,
+                                 get_subtree_ids)
+from products.models import Category
+from tests.factories import CategoryFactory, ProductFactory
+
+
+@pytest.fixture
+def hierarchy():
+    """Three level category hierarchy with a sibling branch."""
+    root = CategoryFactory(name='Ingredients')
+    grains = CategoryFactory(name='Grains', parent=root)
+    malt = CategoryFactory(name='Malt', parent=grains)
+    hops = CategoryFactory(name='Hops', parent=root)
+    equipment = CategoryFactory(name='Equipment')
+    return {
+        'root': root, 'grains': grains, 'malt': malt, 'hops': hops,
+        'equipment': equipment,
+    }
+
+
+@pytest.mark.django_db
+class TestCategoryTree:
+    """Test cases for the cached category tree service."""
+
+    @pytest.mark.model
+    def test_loads_in_one_query(self, hierarchy, django_assert_num_queries):
+        """Test the whole hierarchy is loaded with a single query."""
+        with django_assert_num_queries(1):
+            tree = get_category_tree()
+            assert len(tree) == 5
+            assert tree.get(hierarchy['malt'].pk).parent.parent.name == (
+                'Ingredients'
+            )
+
+    @pytest.mark.model
+    def test_reused_until_invalidated(self, hierarchy,
+                                      django_assert_num_queries):
+        """Test tree is kept in process until a category changes."""
+        tree = get_category_tree()
+        with django_assert_num_queries(0):
+            assert get_category_tree() is tree
+
+        CategoryFactory(name='Yeast')
+
+        assert get_category_tree() is not tree
+        assert len(get_category_tree()) == 6
+
+    @pytest.mark.model
+    def test_ancestors(self, hierarchy):
+        """Test ancestors are returned from the root down."""
+        tree = get_category_tree()
+        assert tree.ancestors(hierarchy['malt'].pk) == [
+            hierarchy['root'], hierarchy['grains']
+        ]
+        assert tree.ancestors(hierarchy['root'].pk) == []
+
+    @pytest.mark.model
+    def test_descendants(self, hierarchy):
+        """Test descendants include the whole subtree."""
+        tree = get_category_tree()
+        assert set(tree.descendants(hierarchy['root'].pk)) == {
+            hierarchy['grains'], hierarchy['malt'], hierarchy['hops']
+        }
+        assert tree.descendant_ids(hierarchy['grains'].pk) == {
+            hierarchy['grains'].pk, hierarchy['malt'].pk
+        }
+
+    @pytest.mark.model
+    def test_roots_and_children(self, hierarchy):
+        """Test top-level categories and direct children."""
+        tree = get_category_tree()
+        assert set(tree.roots()) == {
+            hierarchy['root'], hierarchy['equipment']
+        }
+        assert set(tree.children(hierarchy['root'].pk)) == {
+            hierarchy['grains'], hierarchy['hops']
+        }
+
+    @pytest.mark.model
+    def test_cycle_does_not_loop(self):
+        """Test malformed cyclic data terminates."""
+        first = Category(pk=1, name='A', slug='a', parent_id=2)
+        second = Category(pk=2, name='B', slug='b', parent_id=1)
+        tree = CategoryTree([first, second])
+
+        assert tree.ancestors(1) == [second]
+        assert tree.descendants(1) == [second]
+
+    @pytest.mark.model
+    def test_subtree_ids_ignore_invalid(self, hierarchy):
+        """Test unknown and malformed ids are skipped."""
+        assert get_subtree_ids(
+            [str(hierarchy['hops'].pk), 'abc', '999999']
+        ) == {hierarchy['hops'].pk}
+
+
+@pytest.mark.django_db
+class TestCategoryTreeEndpoints:
+    """Test storefront and API use the category tree."""
+
+    @pytest.mark.view
+    def test_product_list_includes_subcategories(self, client, hierarchy):
+        """Test filtering by a parent category shows child products."""
+        malt_product = ProductFactory(category=hierarchy['malt'])
+        hops_product = ProductFactory(category=hierarchy['hops'])
+        ProductFactory(category=hierarchy['equipment'])
+
+        response = client.get(
+            reverse('products:product-list'),
+            {'category': hierarchy['root'].pk}
+        )
+
+        assert set(response.context['products']) == {
+            malt_product, hops_product
+        }
+        assert len(response.context['categories']) == 5
+
+    @pytest.mark.api
+    def test_api_product_filter_includes_subcategories(self, api_client,
+                                                       hierarchy):
+        """Test API category filter covers the whole subtree."""
+        ProductFactory(category=hierarchy['malt'])
+        ProductFactory(category=hierarchy['hops'])
+
+        response = api_client.get(
+            '/api/products/', {'category': hierarchy['grains'].slug}
+        )
+
+        assert response.data['count'] == 1
+
+    @pytest.mark.api
+    def test_api_category_list_from_tree(self, api_client, hierarchy,
+                                         django_assert_num_queries):
+        """Test category list needs no queries once the tree is loaded."""
+        get_category_tree()
+
+        with django_assert_num_queries(0):
+            response = api_client.get('/api/categories/')
+
+        names = [category['name'] for category in response.data['results']]
+        assert names == sorted(names)
+        malt = next(c for c in response.data['results']
+                    if c['name'] == 'Malt')
+        assert malt['parent']['slug'] == hierarchy['grains'].slug
+
+    @pytest.mark.api
+    def test_api_ancestors_and_descendants(self, api_client, hierarchy):
+        """Test hierarchy actions of the category API."""
+        response = api_client.get(
+            f"/api/categories/{hierarchy['malt'].pk}/ancestors/"
+        )
+        assert [c['name'] for c in response.data] == [
+            'Ingredients', 'Grains'
+        ]
+
+        response = api_client.get(
+            f"/api/categories/{hierarchy['root'].pk}/descendants/"
+        )
+        assert {c['name'] for c in response.data} == {
+            'Grains', 'Malt', 'Hops'
+        }
+
+        response = api_client.get('/api/categories/999999/descendants/')
+        assert response.status_code == 404
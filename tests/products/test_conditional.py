@@ -0,0 +1,153 @@
+import pytest
+from django.http import HttpResponse
+from django.urls import reverse
+from django.views import View
+
+from orders.reservations import place_holds
+from products.conditional import ConditionalGetMixin
+from products.models import Product
+from products.stock import return_stock, take_stock
+from tests.factories import (DeliveredOrderFactory, OrderItemFactory,
+                             PendingOrderFactory, ProductFactory,
+                             ReviewFactory)
+
+
+def detail_url(product) -> str:
+    """Return product detail URL."""
+    return reverse('products:product-detail', args=[product.slug])
+
+
+def revalidate(client, url: str, response, **params):
+    """Request url again, sending the ETag of an earlier response."""
+    return client.get(url, params,
+                      headers={'If-None-Match': response['ETag']})
+
+
+@pytest.mark.django_db
+class TestConditionalPages:
+    """Test cases for conditional GET of catalog pages."""
+
+    @pytest.mark.view
+    def test_unchanged_detail_not_modified(self, client):
+        """Test an unchanged product page is not rendered again."""
+        product = ProductFactory()
+        url = detail_url(product)
+
+        response = client.get(url)
+        again = revalidate(client, url, response)
+
+        assert response['ETag'].startswith('W/"')
+        assert again.status_code == 304
+        assert again['ETag'] == response['ETag']
+        assert not again.templates
+
+    @pytest.mark.view
+    def test_detail_follows_reviews_and_stock(self, client):
+        """Test review edits and stock changes produce a new page."""
+        product = ProductFactory(stock=10)
+        review = ReviewFactory(product=product)
+        url = detail_url(product)
+        response = client.get(url)
+
+        review.comment = 'Edited after a second brew'
+        review.save()
+        edited = revalidate(client, url, response)
+        take_stock({product.pk: 1})
+        taken = revalidate(client, url, edited)
+
+        assert edited.status_code == 200
+        assert taken.status_code == 200
+        assert taken['ETag'] != edited['ETag']
+
+    @pytest.mark.view
+    def test_detail_follows_reservations(self, client, user):
+        """Test holds of other checkouts update the available count."""
+        product = ProductFactory(stock=10)
+        url = detail_url(product)
+        response = client.get(url)
+        order = PendingOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=4)
+
+        place_holds(order)
+        held = revalidate(client, url, response)
+
+        assert held.status_code == 200
+        assert held['X-Cache'] == 'MISS'
+        assert held.context['product'].available_stock == 6
+        assert b'Available: 6' in held.content
+
+    @pytest.mark.view
+    def test_detail_follows_review_eligibility(self, client, user):
+        """Test a delivered order changes the page of its buyer."""
+        product = ProductFactory()
+        client.force_login(user)
+        url = detail_url(product)
+        response = client.get(url)
+
+        OrderItemFactory(order=DeliveredOrderFactory(user=user),
+                         product=product, quantity=1)
+        again = revalidate(client, url, response)
+
+        assert again.status_code == 200
+        assert again.context['can_review']
+
+    @pytest.mark.view
+    def test_detail_varies_by_visitor(self, client, user):
+        """Test signing in changes the page validator."""
+        url = detail_url(ProductFactory())
+        anonymous = client.get(url)
+
+        client.force_login(user)
+
+        assert revalidate(client, url, anonymous).status_code == 200
+
+    @pytest.mark.view
+    def test_pending_messages_rendered(self, client, user):
+        """Test pages showing flash messages carry no ETag."""
+        product = ProductFactory()
+        client.force_login(user)
+        url = detail_url(product)
+        response = client.get(url)
+        client.get(reverse('products:review-create', args=[product.slug]))
+
+        again = revalidate(client, url, response)
+
+        assert again.status_code == 200
+        assert 'ETag' not in again
+
+    @pytest.mark.view
+    def test_list_follows_deletions(self, client):
+        """Test deleting a listed product produces a new list."""
+        products = ProductFactory.create_batch(3)
+        url = reverse('products:product-list')
+        response = client.get(url, {'sort': 'price_asc'})
+
+        unchanged = revalidate(client, url, response, sort='price_asc')
+        Product.objects.filter(pk=products[0].pk).delete()
+        deleted = revalidate(client, url, response, sort='price_asc')
+
+        assert unchanged.status_code == 304
+        assert deleted.status_code == 200
+
+    @pytest.mark.view
+    def test_mixin_renders_without_etag_parts(self, rf):
+        """Test views not providing validators are always rendered."""
+        class PlainView(ConditionalGetMixin, View):
+            def get(self, request):
+                return HttpResponse('rendered')
+
+        response = PlainView.as_view()(rf.get('/'))
+
+        assert response.status_code == 200
+        assert 'ETag' not in response
+
+    @pytest.mark.model
+    def test_stock_updates_move_updated_at(self):
+        """Test stock changes made by UPDATE refresh updated_at."""
+        product = ProductFactory(stock=10)
+        updated_at = product.updated_at
+
+        return_stock({product.pk: 2})
+        product.refresh_from_db()
+
+        assert product.updated_at > updated_at
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from products.detail import get_user_state
+from tests.factories import (DeliveredOrderFactory, OrderItemFactory,
+                             ProductFactory, ReviewFactory)
+
+
+def detail_url(product) -> str:
+    """Return product detail URL."""
+    return reverse('products:product-detail', args=[product.slug])
+
+
+@pytest.mark.django_db
+class TestProductDetailLoader:
+    """Test cases for assembling the product detail page."""
+
+    @pytest.mark.view
+    def test_reviews_loaded_by_cursor(self, client, settings):
+        """Test reviews are shown a page at a time following a cursor."""
+        settings.REVIEWS_PER_PAGE = 3
+        product = ProductFactory()
+        reviews = ReviewFactory.create_batch(5, product=product)
+        newest = [review.pk for review in reversed(reviews)]
+
+        response = client.get(detail_url(product))
+        cursor = response.context['next_review_cursor']
+        more = client.get(
+            detail_url(product), {'reviews_cursor': cursor},
+            headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+
+        assert [r.pk for r in response.context['reviews']] == newest[:3]
+        assert [r.pk for r in more.context['reviews']] == newest[3:]
+        assert more.context['next_review_cursor'] is None
+        assert [t.name for t in more.templates][0] == (
+            'products/includes/review-cards.html'
+        )
+
+    @pytest.mark.view
+    def test_invalid_cursor(self, client):
+        """Test an undecodable cursor is not found."""
+        product = ProductFactory()
+
+        response = client.get(detail_url(product), {'reviews_cursor': 'x'})
+
+        assert response.status_code == 404
+
+    @pytest.mark.view
+    def test_queries_independent_of_reviews(self, client, user):
+        """Test many reviews cost the same queries as a few."""
+        client.force_login(user)
+        counts = []
+        for reviews in (2, 20):
+            product = ProductFactory()
+            ReviewFactory.create_batch(reviews, product=product)
+            with CaptureQueriesContext(connection) as queries:
+                client.get(detail_url(product))
+            counts.append(len(queries))
+
+        assert counts[0] == counts[1]
+
+    @pytest.mark.view
+    def test_cache_hit_only_loads_user_state(self, client, user,
+                                             django_assert_num_queries):
+        """Test a cached page only queries session, user and review state."""
+        product = ProductFactory()
+        ReviewFactory.create_batch(3, product=product)
+        client.force_login(user)
+        client.get(detail_url(product))
+
+        with django_assert_num_queries(3):
+            response = client.get(detail_url(product))
+
+        assert response['X-Cache'] == 'HIT'
+
+    @pytest.mark.model
+    def test_cached_authors_hold_display_fields(self, client):
+        """Test cached reviews do not carry private author fields."""
+        product = ProductFactory()
+        ReviewFactory(product=product)
+
+        author = client.get(detail_url(product)).context['reviews'][0].user
+
+        assert {'email', 'password', 'address'} <= (
+            author.get_deferred_fields()
+        )
+
+    @pytest.mark.model
+    def test_user_state_single_query(self, user, django_assert_num_queries):
+        """Test eligibility and own review are loaded together."""
+        product = ProductFactory()
+        order = DeliveredOrderFactory(user=user)
+        OrderItemFactory(order=order, product=product, quantity=1)
+        review = ReviewFactory(product=product, user=user)
+
+        with django_assert_num_queries(1):
+            state = get_user_state(product, user)
+
+        assert state == {'can_review': True, 'has_reviewed': True,
+                         'user_review_id': review.pk}
@@ -0,0 +1,224 @@
+import io
+import json
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from products.importer import (CatalogImporter, JsonStream, iter_catalog,
+                               iter_jsonl)
+from products.models import Category, Product
+from tests.factories import CategoryFactory, ProductFactory
+
+
+def product_record(n: int, **fields) -> dict:
+    """Build a catalog product record."""
+    return {
+        'name': f'Import {n}',
+        'description': f'Imported product {n}',
+        'category': 'Hops',
+        'price': '1.50',
+        **fields,
+    }
+
+
+def run_import(records: list[dict], **kwargs):
+    """Import product records and return the stats."""
+    return CatalogImporter(**kwargs).run(
+        ('products', record) for record in records
+    )
+
+
+class TestCatalogStream:
+    """Test cases for streaming catalog files."""
+
+    @pytest.mark.unit
+    def test_small_chunks_match_json_load(self):
+        """Test values split across chunk boundaries decode intact."""
+        catalog = {
+            'categories': ['Malt', 'Hops'],
+            'products': [
+                {'name': 'Citra "Hops"', 'price': 12345.678, 'stock': 1000},
+                {'name': 'Malt', 'price': 3, 'tags': [1, 2, {'a': None}]},
+            ],
+        }
+        fp = io.StringIO(json.dumps(catalog, indent=2))
+        fp.read = lambda size, read=fp.read: read(min(size, 5))
+
+        items = list(iter_catalog(fp))
+
+        assert items == [
+            ('categories', 'Malt'),
+            ('categories', 'Hops'),
+            ('products', {'name': 'Citra "Hops"',
+                          'price': Decimal('12345.678'), 'stock': 1000}),
+            ('products', {'name': 'Malt', 'price': 3,
+                          'tags': [1, 2, {'a': None}]}),
+        ]
+
+    @pytest.mark.unit
+    def test_bare_array_and_empty_sections(self):
+        """Test bare product arrays and empty catalogs are accepted."""
+        assert list(iter_catalog(io.StringIO('[{"name": "A"}]'))) == [
+            ('products', {'name': 'A'})
+        ]
+        assert list(iter_catalog(io.StringIO('{"products": []}'))) == []
+        assert list(iter_catalog(io.StringIO('{}'))) == []
+
+    @pytest.mark.unit
+    def test_truncated_catalog(self):
+        """Test a truncated file raises ValueError."""
+        with pytest.raises(ValueError):
+            list(iter_catalog(io.StringIO('{"products": [{"name": "A"}')))
+
+    @pytest.mark.unit
+    def test_stream_keeps_buffer_bounded(self):
+        """Test consumed input is dropped from the buffer."""
+        items = ','.join(json.dumps(product_record(n)) for n in range(500))
+        stream = JsonStream(io.StringIO(f'[{items}]'), chunk_size=256)
+
+        assert sum(1 for _ in stream.iter_array()) == 500
+        assert len(stream.buffer) < 1024
+
+    @pytest.mark.unit
+    def test_jsonl(self):
+        """Test JSON Lines catalogs yield one product per line."""
+        fp = io.StringIO('{"name": "A", "price": 1.5}\n\n{"name": "B"}\n')
+
+        assert list(iter_jsonl(fp)) == [
+            ('products', {'name': 'A', 'price': Decimal('1.5')}),
+            ('products', {'name': 'B'}),
+        ]
+
+
+@pytest.mark.django_db
+class TestCatalogImporter:
+    """Test cases for bulk catalog import."""
+
+    @pytest.mark.model
+    def test_creates_products_and_categories(self):
+        """Test new records become products in new categories."""
+        stats = run_import([
+            product_record(1), product_record(2, category='Yeast', stock=7)
+        ])
+
+        assert (stats.created, stats.updated, stats.categories) == (2, 0, 2)
+        product = Product.objects.get(name='Import 2')
+        assert product.category.name == 'Yeast'
+        assert product.price == Decimal('1.50')
+        assert product.stock == 7
+        assert Product.objects.get(name='Import 1').stock == 100
+
+    @pytest.mark.model
+    def test_upserts_by_name(self):
+        """Test records matching existing names update those products."""
+        product = ProductFactory(name='Import 1', stock=3)
+
+        stats = run_import([product_record(1, price='9.99')])
+
+        assert (stats.created, stats.updated) == (0, 1)
+        product.refresh_from_db()
+        assert product.price == Decimal('9.99')
+        assert product.stock == 3
+        assert product.category.name == 'Hops'
+
+    @pytest.mark.model
+    def test_slugs_avoid_existing(self):
+        """Test slugs are unique against stored and imported products."""
+        ProductFactory(name='Other', slug='import-1')
+        CategoryFactory(name='Old hops', slug='hops')
+
+        run_import([product_record(1), {**product_record(1),
+                                        'name': 'Import-1'}])
+
+        slugs = set(Product.objects.filter(
+            name__in=['Import 1', 'Import-1']
+        ).values_list('slug', flat=True))
+        assert slugs == {'import-1_1', 'import-1_2'}
+        assert Category.objects.get(name='Hops').slug == 'hops_1'
+
+    @pytest.mark.model
+    def test_invalid_records_skipped(self):
+        """Test malformed records are reported and not imported."""
+        stats = run_import([
+            product_record(1), {'name': 'No price', 'category': 'Hops'},
+            product_record(2, price='free'), 'not a record',
+        ])
+
+        assert stats.created == 1
+        assert len(stats.errors) == 3
+
+    @pytest.mark.model
+    def test_queries_do_not_grow_with_batch(self):
+        """Test a batch costs the same queries whatever its size."""
+        run_import([product_record(0)])
+        counts = []
+        for start, size in ((100, 3), (200, 30)):
+            records = [product_record(n) for n in range(start, start + size)]
+            records.append(product_record(0))
+            with CaptureQueriesContext(connection) as queries:
+                run_import(records)
+            counts.append(len(queries))
+
+        assert counts[0] == counts[1]
+
+    @pytest.mark.model
+    def test_batches(self):
+        """Test records are written in batches of the configured size."""
+        stats = run_import(
+            [product_record(n) for n in range(7)], batch_size=3
+        )
+
+        assert stats.created == 7
+        assert stats.rows_per_second > 0
+
+
+@pytest.mark.django_db
+class TestLoadProductsCommand:
+    """Test cases for the load_products command."""
+
+    @pytest.mark.integration
+    def test_load_jsonl(self, tmp_path):
+        """Test a JSON Lines catalog is loaded and reported."""
+        path = tmp_path / 'catalog.jsonl'
+        path.write_text('\n'.join(
+            json.dumps(product_record(n, image_name='missing.jpg'))
+            for n in range(3)
+        ))
+        out = StringIO()
+
+        call_command('load_products', '--json-file', str(path),
+                     '--image-dir', str(tmp_path), stdout=out)
+
+        assert Product.objects.filter(name__startswith='Import').count() == 3
+        assert 'Successfully created 3 and updated 0 products' in (
+            out.getvalue()
+        )
+        assert 'rows/s' in out.getvalue()
+        assert '  - missing.jpg' in out.getvalue()
+
+    @pytest.mark.integration
+    def test_images_outside_media_copied(self, tmp_path, settings):
+        """Test images from another directory are saved to storage."""
+        settings.MEDIA_ROOT = tmp_path / 'media'
+        (tmp_path / 'hops.jpg').write_bytes(b'image')
+
+        run_import([product_record(1, image_name='hops.jpg')],
+                   image_dir=tmp_path)
+
+        product = Product.objects.get(name='Import 1')
+        assert product.image.name.startswith('product_images/hops')
+        assert product.image.read() == b'image'
+
+    @pytest.mark.integration
+    def test_invalid_json(self, tmp_path):
+        """Test a broken catalog aborts the command."""
+        path = tmp_path / 'catalog.json'
+        path.write_text('{"products": [')
+
+        with pytest.raises(CommandError, match='Invalid catalog'):
+            call_command('load_products', '--json-file', str(path),
+                         stdout=StringIO())
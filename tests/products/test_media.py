@@ -0,0 +1,220 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from products.media import (get_url_builder, process_product_images,
+                            render_image)
+from products.models import Product
+from tests.factories import ProductFactory
+
+
+def make_image(size: tuple[int, int] = (1200, 800), color: str = 'teal',
+               noise: bool = False) -> bytes:
+    """Return JPEG bytes of a generated image."""
+    image = (Image.effect_noise(size, 64).convert('RGB') if noise
+             else Image.new('RGB', size, color))
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Store media files in a temporary directory."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def stored_product(name: str, content: bytes) -> Product:
+    """Create a product whose image file is already in storage."""
+    path = default_storage.save(f'product_images/{name}',
+                                ContentFile(content))
+    product = ProductFactory()
+    Product.objects.filter(pk=product.pk).update(image=path)
+    return Product.objects.get(pk=product.pk)
+
+
+class TestRenderImage:
+    """Test cases for resizing images into renditions."""
+
+    SIZES = {'card': (420, 370), 'cart': (240, 240)}
+
+    @pytest.mark.unit
+    def test_renditions_cover_box(self):
+        """Test renditions are the smallest size covering their box."""
+        result = render_image(make_image(), self.SIZES, ('jpeg', 'webp'), 80)
+
+        assert (result['width'], result['height']) == (1200, 800)
+        card = result['renditions']['card']
+        assert (card['width'], card['height']) == (555, 370)
+        cart = result['renditions']['cart']
+        assert (cart['width'], cart['height']) == (360, 240)
+        assert Image.open(BytesIO(card['files']['webp'])).format == 'WEBP'
+
+    @pytest.mark.unit
+    def test_small_images_not_upscaled(self):
+        """Test images smaller than the box keep their size."""
+        result = render_image(
+            make_image((100, 50)), self.SIZES, ('jpeg',), 80
+        )
+
+        assert result['renditions']['card']['width'] == 100
+
+    @pytest.mark.unit
+    def test_unreadable_content(self):
+        """Test content that is not an image is skipped."""
+        assert render_image(b'not an image', self.SIZES, ('jpeg',), 80) is None
+
+    @pytest.mark.unit
+    def test_url_builder_matches_storage(self, settings):
+        """Test built URLs equal those of the storage for any name."""
+        settings.MEDIA_URL = '/media/'
+        url = get_url_builder()
+
+        for name in ('product_images/ab/abc.jpg', 'a b/ü.webp', 'a//b.jpg',
+                     'a/./b.jpg', 'a/../b.jpg', 'x?#.jpg', '/abs.jpg'):
+            assert url(name) == default_storage.url(name)
+
+
+@pytest.mark.django_db
+class TestProductImagePipeline:
+    """Test cases for product image processing."""
+
+    @pytest.mark.model
+    def test_upload_records_size_and_renditions(self, media_root):
+        """Test an uploaded image gets renditions once saved."""
+        product = ProductFactory()
+        product.image = SimpleUploadedFile('hops.jpg', make_image())
+        product.save()
+        product.refresh_from_db()
+
+        assert (product.image_width, product.image_height) == (1200, 800)
+        assert set(product.image_renditions) == {'card', 'detail', 'cart'}
+        rendition = product.get_rendition('card')
+        assert rendition['url'].endswith('/card.jpg')
+        assert rendition['webp_url'].endswith('/card.webp')
+        assert default_storage.exists(product.image_renditions['cart']['webp'])
+
+    @pytest.mark.model
+    def test_duplicate_upload_reuses_file(self, media_root):
+        """Test identical content is stored and rendered once."""
+        first = ProductFactory()
+        first.image = SimpleUploadedFile('hops.jpg', make_image())
+        first.save()
+        files = sorted(p.name for p in media_root.rglob('*') if p.is_file())
+
+        second = ProductFactory()
+        second.image = SimpleUploadedFile('copy.jpg', make_image())
+        second.save()
+
+        assert second.image.name == first.image.name
+        assert second.image_renditions == first.image_renditions
+        assert sorted(
+            p.name for p in media_root.rglob('*') if p.is_file()
+        ) == files
+
+    @pytest.mark.model
+    def test_batch_deduplicates_and_renders_in_pool(self, media_root):
+        """Test a batch renders each distinct image once in a pool."""
+        duplicate = make_image(color='olive')
+        products = [
+            stored_product('a.jpg', duplicate),
+            stored_product('b.jpg', duplicate),
+            stored_product('c.jpg', make_image(color='navy')),
+        ]
+
+        updated, rendered = process_product_images(products, workers=2)
+
+        assert (updated, rendered) == (3, 2)
+        first, second, third = Product.objects.filter(
+            pk__in=[p.pk for p in products]
+        ).order_by('pk')
+        assert second.image.name == first.image.name
+        assert second.image_renditions == first.image_renditions
+        assert third.image_renditions != first.image_renditions
+
+    @pytest.mark.model
+    def test_clearing_image_clears_renditions(self, media_root):
+        """Test removing the image drops its recorded renditions."""
+        product = ProductFactory()
+        product.image = SimpleUploadedFile('hops.jpg', make_image())
+        product.save()
+
+        product.image = None
+        product.save()
+        product.refresh_from_db()
+
+        assert product.image_renditions == {}
+        assert product.image_width is None
+
+    @pytest.mark.model
+    def test_card_rendition_much_smaller(self, media_root):
+        """Test list cards download a fraction of the original bytes."""
+        product = stored_product(
+            'big.jpg', make_image((2400, 1600), noise=True)
+        )
+
+        process_product_images([product], workers=1)
+
+        card = default_storage.size(product.image_renditions['card']['webp'])
+        assert default_storage.size(product.image.name) > 10 * card
+
+    @pytest.mark.integration
+    def test_command_processes_missing(self, media_root):
+        """Test the command renders products without renditions."""
+        product = stored_product('a.jpg', make_image())
+        out = StringIO()
+
+        call_command('process_product_images', '--workers', '1', stdout=out)
+        call_command('process_product_images', '--workers', '1', stdout=out)
+
+        assert 'Updated 1 products, rendered 1 images' in out.getvalue()
+        assert 'Updated 0 products, rendered 0 images' in out.getvalue()
+        product.refresh_from_db()
+        assert product.image_width == 1200
+
+
+@pytest.mark.django_db
+class TestRenditionRendering:
+    """Test cases for serving renditions to clients."""
+
+    @pytest.mark.view
+    def test_product_list_uses_card_rendition(self, client, media_root):
+        """Test product cards show sized card renditions."""
+        product = stored_product('a.jpg', make_image())
+        process_product_images([product], workers=1)
+        product.refresh_from_db()
+
+        response = client.get(reverse('products:product-list'))
+
+        rendition = product.get_rendition('card')
+        content = response.content.decode()
+        assert f'src="{rendition["url"]}" width="555" height="370"' in content
+        assert f'srcset="{rendition["webp_url"]}"' in content
+
+    @pytest.mark.view
+    def test_fallback_to_original(self, client):
+        """Test products without renditions show the original image."""
+        ProductFactory()
+
+        response = client.get(reverse('products:product-list'))
+
+        assert b'/media/product_images/default.png' in response.content
+
+    @pytest.mark.api
+    def test_api_image_urls(self, api_client, media_root):
+        """Test the API exposes the card rendition and all sizes."""
+        product = stored_product('a.jpg', make_image())
+        process_product_images([product], workers=1)
+        product.refresh_from_db()
+
+        data = api_client.get(f'/api/products/{product.id}/').data
+
+        assert data['get_image_url'] == product.get_rendition('card')['url']
+        assert data['images']['cart']['width'] == 360
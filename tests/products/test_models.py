@@ -1,4 +1,5 @@
 from decimal import Decimal
+from io import StringIO
 
 import pytest
 from django.core.exceptions import ValidationError
@@ -181,3 +182,194 @@ class TestReviewModel:
         ReviewFactory(user=user, product=product)
         with pytest.raises(Exception):
             ReviewFactory(user=user, product=product)
+
+
+@pytest.mark.django_db
+class TestProductRatingAggregates:
+    """Test cases for denormalized product rating aggregates."""
+
+    @pytest.mark.model
+    def test_review_create_updates_aggregates(self):
+        """Test creating reviews updates product rating columns."""
+        product = ProductFactory()
+        ReviewFactory(product=product, rating=4)
+        ReviewFactory(product=product, rating=5)
+
+        product.refresh_from_db()
+        assert product.rating_sum == 9
+        assert product.rating_count == 2
+        assert product.rating_avg == 4.5
+        assert product.rating_rounded == 4
+
+    @pytest.mark.model
+    def test_review_update_adjusts_aggregates(self):
+        """Test changing a review rating shifts the aggregates."""
+        product = ProductFactory()
+        review = ReviewFactory(product=product, rating=2)
+
+        review.rating = 5
+        review.save()
+
+        product.refresh_from_db()
+        assert product.rating_sum == 5
+        assert product.rating_count == 1
+        assert product.rating_avg == 5
+
+    @pytest.mark.model
+    def test_review_delete_adjusts_aggregates(self):
+        """Test deleting reviews removes them from aggregates."""
+        product = ProductFactory()
+        review = ReviewFactory(product=product, rating=3)
+        ReviewFactory(product=product, rating=5)
+
+        review.delete()
+        product.refresh_from_db()
+        assert product.rating_sum == 5
+        assert product.rating_count == 1
+
+        product.reviews.all().delete()
+        product.refresh_from_db()
+        assert product.rating_sum == 0
+        assert product.rating_count == 0
+        assert product.rating_avg == 0
+
+    @pytest.mark.model
+    def test_full_save_keeps_aggregates(self):
+        """Test saving a stale product copy does not drop ratings."""
+        product = ProductFactory()
+        stale = Product.objects.get(pk=product.pk)
+        ReviewFactory(product=product, rating=4)
+
+        stale.name = 'Renamed stout'
+        stale.save()
+        stale.refresh_from_db()
+
+        assert stale.name == 'Renamed stout'
+        assert (stale.rating_sum, stale.rating_count) == (4, 1)
+        assert (stale.rating_avg, stale.rating_4_count) == (4, 1)
+
+    @pytest.mark.model
+    def test_histogram_follows_reviews(self):
+        """Test star counts follow created, changed and deleted reviews."""
+        product = ProductFactory()
+        review = ReviewFactory(product=product, rating=2)
+        ReviewFactory(product=product, rating=5)
+
+        review.rating = 4
+        review.save()
+        product.refresh_from_db()
+        assert [row['count'] for row in product.rating_histogram] == [
+            1, 1, 0, 0, 0
+        ]
+        assert product.rating_histogram[0]['percent'] == 50
+
+        review.delete()
+        product.refresh_from_db()
+        assert product.rating_4_count == 0
+        assert product.rating_5_count == 1
+
+    @pytest.mark.model
+    def test_rebuild_ratings_command(self):
+        """Test rebuild_ratings command recalculates aggregates."""
+        from django.core.management import call_command
+
+        product = ProductFactory()
+        ReviewFactory(product=product, rating=1)
+        ReviewFactory(product=product, rating=4)
+        Product.objects.filter(pk=product.pk).update(
+            rating_sum=0, rating_count=0, rating_avg=0, rating_4_count=0)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        product.refresh_from_db()
+        assert product.rating_sum == 5
+        assert product.rating_count == 2
+        assert product.rating_avg == 2.5
+        assert (product.rating_1_count, product.rating_4_count) == (1, 1)
+
+    @pytest.mark.model
+    def test_admin_list_editable_rating_updates_aggregates(
+            self, client, admin_user):
+        """Test inline rating edits in ReviewAdmin update aggregates."""
+        from django.urls import reverse
+
+        product = ProductFactory()
+        review = ReviewFactory(product=product, rating=1)
+        client.force_login(admin_user)
+
+        response = client.post(reverse('admin:products_review_changelist'), {
+            'form-TOTAL_FORMS': '1',
+            'form-INITIAL_FORMS': '1',
+            'form-0-id': str(review.id),
+            'form-0-rating': '4',
+            '_save': 'Save',
+        })
+
+        assert response.status_code == 302
+        product.refresh_from_db()
+        assert product.rating_sum == 4
+        assert product.rating_avg == 4
+
+
+@pytest.mark.django_db
+class TestQueryIndexes:
+    """Test cases for indexes backing the storefront's hot queries."""
+
+    @pytest.mark.model
+    def test_canonical_queries_use_indexes(self):
+        """Test explain_queries finds no full table scans."""
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-scan', stdout=out)
+
+        assert 'full scan' not in out.getvalue()
+        assert 'product_list_category: index scan' in out.getvalue()
+
+    @pytest.mark.model
+    def test_full_scan_detection(self):
+        """Test full scans are recognised in SQLite and PostgreSQL plans."""
+        from products.management.commands.explain_queries import \
+            uses_full_scan
+
+        assert uses_full_scan('SCAN products_product', 'sqlite')
+        assert not uses_full_scan(
+            'SCAN products_product USING INDEX product_active_new_idx',
+            'sqlite'
+        )
+        assert uses_full_scan('Seq Scan on orders_order', 'postgresql')
+        assert not uses_full_scan(
+            'Index Scan using order_status_idx on orders_order',
+            'postgresql'
+        )
+
+
+class TestMoney:
+    """Test cases for integer-cents money helpers."""
+
+    def test_to_cents_rounds_half_up(self):
+        """Test amounts, floats and legacy strings convert exactly."""
+        from products.money import to_cents
+
+        assert to_cents(Decimal('12.345')) == 1235
+        assert to_cents(0.1 + 0.2) == 30
+        assert to_cents('$9.99') == 999
+        assert to_cents('abc') == 0
+
+    def test_from_cents_and_format(self):
+        """Test cents are turned into two-place amounts and labels."""
+        from products.money import format_money, from_cents
+
+        assert from_cents(1999) == Decimal('19.99')
+        assert format_money(from_cents(5)) == '$0.05'
+        assert format_money(None) == ''
+
+    def test_money_filter(self):
+        """Test the template filter renders Decimal amounts."""
+        from django.template import Context, Template
+
+        template = Template('{% load my_filters %}{{ amount|money }}')
+
+        assert template.render(Context({'amount': Decimal('4.5')})) == (
+            '$4.50'
+        )
@@ -0,0 +1,229 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order
+from products.models import Product
+from products.pagination import (InvalidCursor, KeysetPaginator,
+                                 decode_cursor, encode_cursor)
+from tests.factories import OrderFactory, ProductFactory, ReviewFactory
+
+
+def collect_pages(paginator: KeysetPaginator) -> list[list]:
+    """Walk every keyset page and return their objects."""
+    pages = []
+    cursor = None
+    while True:
+        page = paginator.page(cursor)
+        pages.append(page.object_list)
+        if not page.has_next():
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.django_db
+class TestKeysetPaginator:
+    """Test cases for keyset pagination."""
+
+    @pytest.mark.model
+    def test_pages_cover_ties_once(self):
+        """Test rows sharing the sort value are neither lost nor repeated."""
+        products = ProductFactory.create_batch(7)
+        Product.objects.update(created_at=timezone.now())
+
+        pages = collect_pages(KeysetPaginator(
+            Product.objects.order_by('-created_at'), 3
+        ))
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        ids = [product.pk for page in pages for product in page]
+        assert ids == sorted((p.pk for p in products), reverse=True)
+
+    @pytest.mark.model
+    def test_price_ordering(self):
+        """Test ascending price pages follow price then id."""
+        for price in ('5.00', '1.00', '5.00', '3.00', '1.00'):
+            ProductFactory(price=Decimal(price))
+
+        pages = collect_pages(KeysetPaginator(
+            Product.objects.order_by('price'), 2
+        ))
+
+        prices = [p.price for page in pages for p in page]
+        assert prices == sorted(prices)
+        assert len(prices) == 5
+
+    @pytest.mark.model
+    def test_page_is_single_query(self, django_assert_num_queries):
+        """Test a deep page is fetched without counting rows."""
+        ProductFactory.create_batch(5)
+        paginator = KeysetPaginator(Product.objects.order_by('-id'), 2)
+        cursor = paginator.page().next_cursor
+
+        with django_assert_num_queries(1):
+            page = paginator.page(cursor)
+
+        assert len(page) == 2
+
+    @pytest.mark.model
+    def test_invalid_cursor(self):
+        """Test malformed cursors are rejected."""
+        queryset = Product.objects.order_by('price', 'id')
+
+        for cursor in ('!!!', encode_cursor([1]),
+                       encode_cursor(['abc', 1])):
+            with pytest.raises(InvalidCursor):
+                decode_cursor(cursor, queryset, ('price', 'id'))
+
+
+@pytest.mark.django_db
+class TestLoadMore:
+    """Test cases for the storefront "load more" pagination."""
+
+    @pytest.mark.view
+    def test_next_cursor_continues_numbered_page(self, client, settings):
+        """Test the cursor of page one loads exactly the next products."""
+        ProductFactory.create_batch(settings.PRODUCTS_PER_PAGE + 2)
+        url = reverse('products:product-list')
+        first = client.get(url, {'sort': 'price_asc'})
+        cursor = first.context['next_cursor']
+
+        second = client.get(url, {'sort': 'price_asc', 'cursor': cursor})
+
+        assert second.status_code == 200
+        assert len(second.context['products']) == 2
+        assert not set(first.context['products']) & set(
+            second.context['products']
+        )
+        assert second.context['next_cursor'] is None
+
+    @pytest.mark.view
+    def test_xhr_renders_cards_only(self, client, settings):
+        """Test XHR requests receive the product cards partial."""
+        ProductFactory.create_batch(settings.PRODUCTS_PER_PAGE + 1)
+        url = reverse('products:product-list')
+        cursor = client.get(url).context['next_cursor']
+
+        response = client.get(
+            url, {'cursor': cursor},
+            headers={'X-Requested-With': 'XMLHttpRequest'}
+        )
+
+        assert [t.name for t in response.templates][0] == (
+            'products/includes/product-cards.html'
+        )
+        assert b'<html' not in response.content
+        assert b'product-card' in response.content
+
+    @pytest.mark.view
+    def test_invalid_cursor_not_found(self, client):
+        """Test a tampered cursor returns 404."""
+        response = client.get(
+            reverse('products:product-list'), {'cursor': 'bogus'}
+        )
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestApiCursorPagination:
+    """Test cases for cursor mode of API list endpoints."""
+
+    @pytest.mark.api
+    def test_products_cursor_pages(self, api_client, settings):
+        """Test product pages chain through next links."""
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        ProductFactory.create_batch(page_size + 3)
+
+        first = api_client.get('/api/products/', {'cursor': ''})
+        second = api_client.get(first.data['next'])
+
+        assert 'count' not in first.data
+        assert len(first.data['results']) == page_size
+        assert len(second.data['results']) == 3
+        assert second.data['next'] is None
+        first_ids = {p['id'] for p in first.data['results']}
+        assert not first_ids & {p['id'] for p in second.data['results']}
+
+    @pytest.mark.api
+    def test_products_cursor_with_ordering(self, api_client):
+        """Test cursor mode follows the requested ordering."""
+        for price in ('9.00', '2.00', '5.00'):
+            ProductFactory(price=Decimal(price))
+
+        response = api_client.get(
+            '/api/products/',
+            {'cursor': '', 'ordering': '-price', 'page_size': 2}
+        )
+        prices = [p['price'] for p in response.data['results']]
+        response = api_client.get(response.data['next'])
+        prices += [p['price'] for p in response.data['results']]
+
+        assert prices == ['9.00', '5.00', '2.00']
+
+    @pytest.mark.api
+    def test_optional_cached_count(self, api_client,
+                                   django_assert_num_queries):
+        """Test count is only computed on request and then cached."""
+        ProductFactory.create_batch(3)
+        params = {'cursor': '', 'count': 'true', 'ordering': 'name'}
+
+        response = api_client.get('/api/products/', params)
+        assert response.data['count'] == 3
+
+        params['ordering'] = 'price'
+        with django_assert_num_queries(1):
+            response = api_client.get('/api/products/', params)
+        assert response.data['count'] == 3
+
+    @pytest.mark.api
+    def test_invalid_cursor_not_found(self, api_client):
+        """Test a tampered cursor returns 404."""
+        response = api_client.get('/api/products/', {'cursor': 'bogus'})
+
+        assert response.status_code == 404
+
+    @pytest.mark.api
+    def test_orders_cursor_by_alias(self, authenticated_api_client, user):
+        """Test order pages can be ordered by the stored total."""
+        for subtotal in ('30.00', '10.00', '20.00'):
+            order = OrderFactory(user=user)
+            Order.objects.filter(pk=order.pk).update(
+                subtotal=Decimal(subtotal)
+            )
+
+        response = authenticated_api_client.get(
+            '/api/orders/',
+            {'cursor': '', 'ordering': 'total_price', 'page_size': 2}
+        )
+        totals = [o['total_price'] for o in response.data['results']]
+        response = authenticated_api_client.get(response.data['next'])
+        totals += [o['total_price'] for o in response.data['results']]
+
+        assert totals == ['10.00', '20.00', '30.00']
+
+    @pytest.mark.api
+    def test_reviews_cursor_pages(self, authenticated_api_client):
+        """Test reviews are paginated by cursor."""
+        ReviewFactory.create_batch(3)
+
+        response = authenticated_api_client.get(
+            '/api/reviews/', {'cursor': '', 'page_size': 2}
+        )
+        ids = [r['id'] for r in response.data['results']]
+        response = authenticated_api_client.get(response.data['next'])
+        ids += [r['id'] for r in response.data['results']]
+
+        assert len(set(ids)) == 3
+
+    @pytest.mark.api
+    def test_page_numbers_still_supported(self, api_client):
+        """Test requests without a cursor keep page number responses."""
+        ProductFactory.create_batch(2)
+
+        response = api_client.get('/api/products/')
+
+        assert response.data['count'] == 2
+        assert response.data['previous'] is None
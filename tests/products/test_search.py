@@ -0,0 +1,151 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from products.models import Product
+from products.search import (FTS_TABLE, get_search_backend, parse_terms,
+                             search_products)
+from tests.factories import ProductFactory
+
+
+def search(query):
+    return list(search_products(Product.objects.all(), query).order_by(
+        '-search_rank', 'id'
+    ))
+
+
+@pytest.fixture
+def brewing_products():
+    """Products with search terms in names and descriptions."""
+    return {
+        'cascade': ProductFactory(
+            name='Cascade Hops', description='Citrus aroma for pale ales'
+        ),
+        'malt': ProductFactory(
+            name='Pale Malt', description='Base malt, pairs with cascade'
+        ),
+        'yeast': ProductFactory(
+            name='Ale Yeast', description='Clean fermenting strain'
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    """Test cases for the full-text product search index."""
+
+    def test_sqlite_uses_fts5(self):
+        """Test SQLite test database uses the FTS5 backend."""
+        assert get_search_backend() == 'sqlite'
+        assert FTS_TABLE in connection.introspection.table_names()
+
+    def test_parse_terms_strips_syntax(self):
+        """Test search operators and quotes are not passed through."""
+        assert parse_terms('"pale" OR ale*-(x)') == [
+            'pale', 'or', 'ale', 'x'
+        ]
+
+    def test_name_match_ranks_first(self, brewing_products):
+        """Test name matches rank above description matches."""
+        assert search('cascade') == [
+            brewing_products['cascade'], brewing_products['malt']
+        ]
+
+    def test_all_terms_must_match(self, brewing_products):
+        """Test every term narrows the results."""
+        assert search('pale ale') == [brewing_products['cascade']]
+        assert search('pale yeast') == []
+
+    def test_prefix_match(self, brewing_products):
+        """Test partial words match while typing."""
+        assert search('ferm') == [brewing_products['yeast']]
+
+    def test_empty_query_matches_nothing(self, brewing_products):
+        """Test queries without terms return no products."""
+        assert search('!!! ***') == []
+
+    def test_index_updates_on_save(self, brewing_products):
+        """Test changing searchable fields refreshes the index."""
+        product = brewing_products['yeast']
+        product.name = 'Lager Yeast'
+        product.save()
+
+        assert search('lager') == [product]
+
+    def test_stock_update_skips_reindex(self, brewing_products,
+                                        django_assert_num_queries):
+        """Test saves of unrelated fields do not touch the index."""
+        product = brewing_products['yeast']
+        product.stock = 3
+        with django_assert_num_queries(1):
+            product.save(update_fields=['stock'])
+
+    def test_index_updates_on_delete(self, brewing_products):
+        """Test deleted products leave the index."""
+        brewing_products['cascade'].delete()
+
+        assert search('cascade') == [brewing_products['malt']]
+
+    def test_rebuild_command(self, brewing_products):
+        """Test rebuild command restores a stale index."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        assert search('malt') == []
+        out = StringIO()
+
+        call_command('rebuild_search_index', '--batch-size=2', stdout=out)
+
+        assert search('malt') == [brewing_products['malt']]
+        assert 'Indexed 3 products' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestSearchEndpoints:
+    """Test HTML and API product lists use the search index."""
+
+    @pytest.mark.view
+    def test_product_list_ranked(self, client, brewing_products):
+        """Test storefront search orders results by relevance."""
+        response = client.get(
+            reverse('products:product-list'), {'search': 'cascade'}
+        )
+        assert list(response.context['products']) == [
+            brewing_products['cascade'], brewing_products['malt']
+        ]
+
+    @pytest.mark.view
+    def test_product_list_search_keeps_sort(self, client, brewing_products):
+        """Test explicit sort overrides relevance ordering."""
+        brewing_products['cascade'].price = 50
+        brewing_products['cascade'].save()
+        brewing_products['malt'].price = 5
+        brewing_products['malt'].save()
+
+        response = client.get(
+            reverse('products:product-list'),
+            {'search': 'cascade', 'sort': 'price_asc'}
+        )
+        assert list(response.context['products']) == [
+            brewing_products['malt'], brewing_products['cascade']
+        ]
+
+    @pytest.mark.api
+    def test_api_search_ranked(self, api_client, brewing_products):
+        """Test API search orders results by relevance."""
+        response = api_client.get('/api/products/', {'search': 'cascade'})
+        assert [p['id'] for p in response.data['results']] == [
+            brewing_products['cascade'].id, brewing_products['malt'].id
+        ]
+
+    @pytest.mark.api
+    def test_api_search_with_ordering(self, api_client, brewing_products):
+        """Test API ordering parameter overrides relevance."""
+        response = api_client.get(
+            '/api/products/', {'search': 'cascade', 'ordering': '-name'}
+        )
+        assert [p['name'] for p in response.data['results']] == [
+            'Pale Malt', 'Cascade Hops'
+        ]
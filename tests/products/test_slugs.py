@@ -0,0 +1,108 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from products import mixins
+from products.models import Category, Product
+from products.slugs import SlugAllocator, allocate_slug, pick_free_slug
+from tests.factories import CategoryFactory, ProductFactory
+
+
+class TestPickFreeSlug:
+    """Test cases for choosing a free slug suffix."""
+
+    @pytest.mark.unit
+    def test_fills_first_gap(self):
+        """Test the lowest free suffix is used."""
+        assert pick_free_slug('ipa', ['ipa', 'ipa_1', 'ipa_3']) == 'ipa_2'
+        assert pick_free_slug('ipa', ['ipa_1']) == 'ipa'
+
+    @pytest.mark.unit
+    def test_ignores_other_slugs(self):
+        """Test slugs merely sharing the prefix are not counted."""
+        assert pick_free_slug('ipa', ['ipa', 'ipa_kit', 'ipa_1_2']) == (
+            'ipa_1'
+        )
+
+
+@pytest.mark.django_db
+class TestSlugAllocation:
+    """Test cases for set-based slug allocation."""
+
+    @pytest.mark.model
+    def test_popular_name_constant_queries(self, category):
+        """Test saving a popular name costs the same queries every time."""
+        counts = []
+        for _ in range(6):
+            with CaptureQueriesContext(connection) as queries:
+                Product.objects.create(
+                    name='Popular Kit', description='Kit',
+                    category=category, price=1, stock=1
+                )
+            counts.append(len(queries))
+
+        assert len(set(counts[1:])) == 1
+        assert set(Product.objects.filter(
+            name='Popular Kit'
+        ).values_list('slug', flat=True)) == {
+            'popular-kit', *(f'popular-kit_{n}' for n in range(1, 6))
+        }
+
+    @pytest.mark.model
+    def test_no_suffix_limit(self, category):
+        """Test more than a hundred duplicates still get unique slugs."""
+        Product.objects.bulk_create([
+            Product(name='Hops', slug='hops' if n == 0 else f'hops_{n}',
+                    description='Hops', category=category, price=1, stock=1)
+            for n in range(150)
+        ])
+
+        assert allocate_slug(Product, 'Hops') == 'hops_150'
+
+    @pytest.mark.model
+    def test_long_names_fit(self, category):
+        """Test suffixed slugs of long names fit the column."""
+        name = 'x' * 100
+        first = ProductFactory(name=name, slug='')
+        second = ProductFactory(name=name, slug='')
+
+        assert second.slug == f'{first.slug}_1'
+        assert len(second.slug) <= 100
+
+    @pytest.mark.model
+    def test_bulk_allocator(self, django_assert_num_queries):
+        """Test one query serves a batch, repeats are allocated in memory."""
+        CategoryFactory(name='Malt', slug='malt')
+        CategoryFactory(name='Malt', slug='malt_2')
+        allocator = SlugAllocator(Category)
+
+        with django_assert_num_queries(1):
+            allocator.prefetch(['Malt', 'Yeast', 'Malt'])
+            slugs = [allocator.allocate(name)
+                     for name in ('Malt', 'Yeast', 'Malt', 'Yeast')]
+
+        assert slugs == ['malt_1', 'yeast', 'malt_3', 'yeast_1']
+
+    @pytest.mark.model
+    def test_retries_after_concurrent_insert(self, monkeypatch):
+        """Test a slug taken between allocation and insert is replaced."""
+        CategoryFactory(name='Other', slug='ales')
+        allocated = iter(['ales'])
+        real_allocate = mixins.allocate_slug
+        monkeypatch.setattr(
+            mixins, 'allocate_slug',
+            lambda *args, **kwargs: next(allocated, None)
+            or real_allocate(*args, **kwargs)
+        )
+
+        category = Category.objects.create(name='Ales')
+
+        assert category.slug == 'ales_1'
+
+    @pytest.mark.model
+    def test_explicit_duplicate_not_retried(self):
+        """Test a duplicate slug given by the caller is rejected."""
+        CategoryFactory(slug='stouts')
+
+        with pytest.raises(IntegrityError):
+            Category.objects.create(name='Stouts', slug='stouts')
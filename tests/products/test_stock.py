@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from orders.models import Order
+from products.models import Product
+from products.stock import return_stock, take_stock
+from tests.factories import OrderFactory, OrderItemFactory, ProductFactory
+
+
+@pytest.mark.django_db
+class TestStockUpdates:
+    """Test cases for set-based stock updates."""
+
+    @pytest.mark.model
+    def test_take_stock_single_update(self, django_assert_num_queries):
+        """Test all products are decremented by one guarded statement."""
+        products = ProductFactory.create_batch(3, stock=5)
+
+        with django_assert_num_queries(3):
+            short = take_stock({product.pk: 2 for product in products})
+
+        assert short == []
+        assert set(Product.objects.filter(
+            pk__in=[p.pk for p in products]
+        ).values_list('stock', flat=True)) == {3}
+
+    @pytest.mark.model
+    def test_take_stock_reports_short_products(self):
+        """Test short products are returned and nothing is taken."""
+        plenty, scarce, empty = (
+            ProductFactory(stock=stock) for stock in (10, 1, 0)
+        )
+
+        short = take_stock({plenty.pk: 2, scarce.pk: 2, empty.pk: 1})
+
+        assert short == sorted([scarce.pk, empty.pk])
+        plenty.refresh_from_db()
+        assert plenty.stock == 10
+
+    @pytest.mark.model
+    def test_reserved_stock_not_taken(self):
+        """Test stock held by pending checkouts is not sold."""
+        product = ProductFactory(stock=5)
+        Product.objects.filter(pk=product.pk).update(reserved=4)
+
+        assert take_stock({product.pk: 2}) == [product.pk]
+
+    @pytest.mark.model
+    def test_restore_stock_single_update(self, django_assert_num_queries):
+        """Test canceled order items are returned in one statement."""
+        order = OrderFactory()
+        products = ProductFactory.create_batch(2, stock=1)
+        for product in products:
+            OrderItemFactory(order=order, product=product, quantity=2)
+
+        with django_assert_num_queries(2):
+            order.restore_stock()
+
+        assert set(Product.objects.filter(
+            pk__in=[p.pk for p in products]
+        ).values_list('stock', flat=True)) == {3}
+
+    @pytest.mark.model
+    def test_return_stock_nothing(self, django_assert_num_queries):
+        """Test returning no quantities runs no query."""
+        with django_assert_num_queries(0):
+            return_stock({})
+
+
+@pytest.mark.slow
+@pytest.mark.django_db(transaction=True)
+class TestStockBenchmark:
+    """Test cases for the concurrent checkout benchmark."""
+
+    @pytest.mark.integration
+    def test_parallel_checkouts_never_oversell(self):
+        """Test parallel checkouts sell exactly the available stock."""
+        out = StringIO()
+
+        call_command(
+            'benchmark_stock', '--stock', '20', '--checkouts', '60',
+            '--workers', '6', '--quantity', '2', stdout=out
+        )
+
+        assert 'Sold 10, 0 left, no holds' in out.getvalue()
+        assert not Product.objects.exists()
+        assert not Order.objects.exists()
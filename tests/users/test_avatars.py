@@ -0,0 +1,213 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import (SimpleUploadedFile,
+                                            TemporaryUploadedFile)
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from tests.factories import ReviewFactory, UserFactory
+from users import forms
+from users.avatars import render_avatar
+from users.forms import UserProfileForm
+from users.models import User
+
+SIZES = {'small': 80, 'medium': 160}
+
+
+def make_image(size: tuple[int, int] = (1200, 800), image_format='JPEG',
+               noise: bool = False) -> bytes:
+    """Return bytes of a generated photo carrying EXIF metadata."""
+    image = (Image.effect_noise(size, 64).convert('RGB') if noise
+             else Image.new('RGB', size, 'teal'))
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera Maker'
+    exif[0x0132] = '2024:01:01 10:00:00'
+    buffer = BytesIO()
+    image.save(buffer, image_format, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """Store media files in a temporary directory."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def profile_form(user: User, content: bytes,
+                 name: str = 'me.jpg') -> UserProfileForm:
+    """Return a profile form uploading content as the image."""
+    return UserProfileForm(
+        data={'first_name': 'Test', 'last_name': 'User',
+              'email': user.email},
+        files={'image': SimpleUploadedFile(name, content)},
+        instance=user
+    )
+
+
+class TestRenderAvatar:
+    """Test cases for re-encoding profile images."""
+
+    @pytest.mark.unit
+    def test_strips_metadata_and_caps_size(self):
+        """Test the stored image is capped and carries no EXIF."""
+        result = render_avatar(make_image(), SIZES, ('jpeg', 'webp'), 80, 512)
+
+        with Image.open(BytesIO(result['image'])) as image:
+            assert image.size == (512, 341)
+            assert not image.getexif()
+        small = result['renditions']['small']['files']
+        with Image.open(BytesIO(small['webp'])) as image:
+            assert (image.format, image.size) == ('WEBP', (80, 80))
+
+    @pytest.mark.unit
+    def test_transparent_image_flattened(self):
+        """Test transparent pixels turn white in the JPEG output."""
+        buffer = BytesIO()
+        Image.new('RGBA', (200, 200), (0, 0, 0, 0)).save(buffer, 'PNG')
+
+        result = render_avatar(buffer.getvalue(), SIZES, ('jpeg',), 80, 512)
+
+        with Image.open(BytesIO(result['image'])) as image:
+            assert image.getpixel((100, 100)) == (255, 255, 255)
+
+    @pytest.mark.unit
+    def test_unreadable_content(self):
+        """Test content that is not an image is skipped."""
+        assert render_avatar(b'not an image', SIZES, ('jpeg',), 80, 512) is (
+            None
+        )
+
+
+@pytest.mark.django_db
+class TestAvatarValidation:
+    """Test cases for validating profile image uploads."""
+
+    @pytest.mark.form
+    def test_rejects_large_file(self, settings):
+        """Test uploads over the size cap are rejected."""
+        settings.AVATAR_MAX_UPLOAD_SIZE = 1024
+        form = profile_form(UserFactory(), make_image(noise=True))
+
+        assert not form.is_valid()
+        assert form.errors['image'][0].startswith('Image file is too large')
+
+    @pytest.mark.form
+    def test_rejects_too_many_pixels(self, settings):
+        """Test images over the pixel cap are rejected."""
+        settings.AVATAR_MAX_PIXELS = 100 * 100
+        form = profile_form(UserFactory(), make_image((200, 200)))
+
+        assert not form.is_valid()
+        assert form.errors['image'] == ['Image dimensions are too large.']
+
+    @pytest.mark.form
+    def test_rejects_other_formats(self):
+        """Test formats outside the allowed list are rejected."""
+        form = profile_form(
+            UserFactory(), make_image((50, 50), 'TIFF'), 'me.tiff'
+        )
+
+        assert not form.is_valid()
+        assert form.errors['image'] == [
+            'Upload a JPEG, PNG, WebP or GIF image.'
+        ]
+
+
+@pytest.mark.django_db
+class TestAvatarUpload:
+    """Test cases for storing profile image uploads."""
+
+    @pytest.mark.view
+    def test_upload_streamed_and_re_encoded(self, client, user, media_root,
+                                            monkeypatch):
+        """Test a large upload reaches the form on disk and is cleaned."""
+        uploads = []
+        validate = forms.validate_avatar
+        monkeypatch.setattr(forms, 'validate_avatar', lambda file: (
+            uploads.append(type(file)), validate(file)
+        ))
+        client.force_login(user)
+        content = make_image((2000, 2000), noise=True)
+
+        response = client.post(reverse('users:account_edit'), data={
+            'first_name': 'Test', 'last_name': 'User', 'email': user.email,
+            'image': SimpleUploadedFile('me.jpg', content),
+        })
+
+        assert response.status_code == 302
+        assert uploads == [TemporaryUploadedFile]
+        user.refresh_from_db()
+        with default_storage.open(user.image.name) as file:
+            with Image.open(file) as image:
+                assert image.size == (512, 512)
+                assert not image.getexif()
+        assert default_storage.size(user.image.name) < len(content)
+        assert user.get_avatar('small')['url'].endswith('/small.jpg')
+        assert default_storage.exists(user.image_renditions['medium']['webp'])
+
+    @pytest.mark.model
+    def test_identical_uploads_share_files(self, media_root):
+        """Test identical uploads are stored once."""
+        first, second = UserFactory(), UserFactory()
+        for user in (first, second):
+            user.image = SimpleUploadedFile('me.jpg', make_image())
+            user.save()
+
+        assert second.image.name == first.image.name
+        assert second.image_renditions == first.image_renditions
+        assert len([p for p in media_root.rglob('*') if p.is_file()]) == 5
+
+    @pytest.mark.model
+    def test_clearing_image_clears_renditions(self, media_root):
+        """Test removing the image drops its avatars."""
+        user = UserFactory()
+        user.image = SimpleUploadedFile('me.jpg', make_image())
+        user.save()
+
+        user.image = None
+        user.save()
+        user.refresh_from_db()
+
+        assert user.image_renditions == {}
+        assert user.get_avatar_url('small') == '/static/img/users/default.jpg'
+
+    @pytest.mark.integration
+    def test_command_processes_existing(self, media_root):
+        """Test the command renders stored avatars once per content."""
+        path = default_storage.save('profile_image/old.jpg',
+                                    ContentFile(make_image()))
+        users = [UserFactory(), UserFactory()]
+        User.objects.filter(pk__in=[u.pk for u in users]).update(image=path)
+        out = StringIO()
+
+        call_command('process_avatars', '--workers', '1', stdout=out)
+        call_command('process_avatars', '--workers', '1', stdout=out)
+
+        assert 'Updated 2 users, rendered 1 images' in out.getvalue()
+        assert 'Updated 0 users, rendered 0 images' in out.getvalue()
+        first, second = User.objects.filter(
+            pk__in=[u.pk for u in users]
+        ).order_by('pk')
+        assert first.image.name != path
+        assert second.image_renditions == first.image_renditions
+
+    @pytest.mark.view
+    def test_review_shows_small_avatar(self, client, media_root):
+        """Test review authors are shown with their small avatar."""
+        user = UserFactory()
+        user.image = SimpleUploadedFile('me.jpg', make_image())
+        user.save()
+        review = ReviewFactory(user=user)
+
+        response = client.get(reverse('products:product-detail',
+                                      args=[review.product.slug]))
+
+        avatar = user.get_avatar('small')
+        content = response.content.decode()
+        assert f'src="{avatar["url"]}" width="80" height="80"' in content
+        assert f'srcset="{avatar["webp_url"]}"' in content
@@ -0,0 +1,186 @@
+from io import BytesIO
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+
+from products.media import (FORMAT_EXTENSIONS, get_source, hash_file,
+                            map_in_pool)
+from users.models import User
+
+AVATAR_DIR = 'profile_image'
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+
+
+def get_upload_source(file: File) -> str | bytes:
+    """Return path of an upload streamed to disk, or its content."""
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    file.seek(0)
+    try:
+        return file.read()
+    finally:
+        file.seek(0)
+
+
+def validate_avatar(file: File) -> None:
+    """Reject uploads too large, not images or of too many pixels.
+
+    Only the image header is read, so oversized pictures are refused
+    before any pixel data is decoded.
+    """
+    if file.size > settings.AVATAR_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Image file is too large (maximum is %(size)s).',
+            code='file_too_large',
+            params={'size': filesizeformat(settings.AVATAR_MAX_UPLOAD_SIZE)}
+        )
+    source = get_upload_source(file)
+    try:
+        with Image.open(BytesIO(source) if isinstance(source, bytes)
+                        else source) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        raise ValidationError('Upload a valid image.', code='invalid_image')
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(
+            'Upload a JPEG, PNG, WebP or GIF image.', code='invalid_format'
+        )
+    if width * height > settings.AVATAR_MAX_PIXELS:
+        raise ValidationError(
+            'Image dimensions are too large.', code='too_many_pixels'
+        )
+
+
+def encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    """Return image encoded without any metadata."""
+    buffer = BytesIO()
+    image.save(buffer, image_format.upper(), quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_avatar(source: str | bytes, sizes: dict[str, int],
+                  formats: tuple[str, ...], quality: int, max_dimension: int
+                  ) -> dict[str, Any] | None:
+    """Re-encode an avatar and crop it into square renditions.
+
+    The original is scaled down to max_dimension and saved as JPEG;
+    neither it nor the renditions keep EXIF, GPS or ICC metadata.
+
+    Runs in worker processes, so it only uses Pillow and returns the
+    encoded files. Returns None for content Pillow cannot read.
+    """
+    try:
+        with Image.open(BytesIO(source) if isinstance(source, bytes)
+                        else source) as original:
+            image = ImageOps.exif_transpose(original).convert('RGBA')
+            flat = Image.new('RGB', image.size, 'white')
+            flat.paste(image, mask=image.getchannel('A'))
+            capped = flat.copy()
+            capped.thumbnail((max_dimension, max_dimension),
+                             Image.Resampling.LANCZOS)
+            result = {'image': encode(capped, 'jpeg', quality),
+                      'renditions': {}}
+            for name, size in sizes.items():
+                square = ImageOps.fit(flat, (size, size),
+                                      Image.Resampling.LANCZOS)
+                result['renditions'][name] = {
+                    'size': size,
+                    'files': {image_format: encode(square, image_format,
+                                                   quality)
+                              for image_format in formats},
+                }
+            return result
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        return None
+
+
+def get_options() -> tuple:
+    """Return rendering options configured in settings."""
+    return (settings.AVATAR_RENDITIONS, tuple(settings.AVATAR_FORMATS),
+            settings.AVATAR_QUALITY, settings.AVATAR_MAX_DIMENSION)
+
+
+def store_avatar(content_hash: str, result: dict[str, Any]
+                 ) -> tuple[str, dict[str, dict[str, Any]]]:
+    """Save a rendered avatar under its content hash.
+
+    Returns the name of the re-encoded image and the rendition map.
+    Identical uploads share the files written for the first one.
+    """
+    folder = f'{content_hash[:2]}/{content_hash}'
+    name = f'{AVATAR_DIR}/{folder}.jpg'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(result['image']))
+    renditions = {}
+    for rendition_name, rendition in result['renditions'].items():
+        entry = {'size': rendition['size']}
+        for image_format, data in rendition['files'].items():
+            path = (f'{AVATAR_DIR}/renditions/{folder}/{rendition_name}.'
+                    f'{FORMAT_EXTENSIONS[image_format]}')
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(data))
+            entry[image_format] = path
+        renditions[rendition_name] = entry
+    return name, renditions
+
+
+def process_upload(user: User) -> None:
+    """Replace a fresh upload by its re-encoded image and renditions.
+
+    Called before the user is saved, so the upload itself, with its
+    metadata, is never written to storage.
+    """
+    image = user.image
+    if not image:
+        user.image_renditions = {}
+        return
+    if image._committed:
+        return
+    result = render_avatar(get_upload_source(image.file), *get_options())
+    if result is None:
+        user.image_renditions = {}
+        return
+    image.name, user.image_renditions = store_avatar(hash_file(image),
+                                                     result)
+    image._committed = True
+
+
+def process_avatars(users: Iterable[User], workers: int | None = None
+                    ) -> tuple[int, int]:
+    """Re-encode and render stored avatars of users.
+
+    Each distinct image is rendered once in a process pool. Returns
+    the number of updated users and of rendered images.
+    """
+    by_hash: dict[str, list[User]] = {}
+    for user in users:
+        if not user.image:
+            continue
+        try:
+            content_hash = hash_file(user.image)
+        except OSError:
+            continue
+        by_hash.setdefault(content_hash, []).append(user)
+    if not by_hash:
+        return 0, 0
+
+    sources = {content_hash: get_source(group[0].image.name)
+               for content_hash, group in by_hash.items()}
+    rendered = map_in_pool(render_avatar, sources, get_options(), workers)
+    updated = []
+    for content_hash, result in rendered.items():
+        if result is None:
+            continue
+        name, renditions = store_avatar(content_hash, result)
+        for user in by_hash[content_hash]:
+            user.image.name = name
+            user.image_renditions = renditions
+            updated.append(user)
+    User.objects.bulk_update(updated, ['image', 'image_renditions'])
+    return len(updated), sum(1 for result in rendered.values() if result)
@@ -4,8 +4,11 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import (AuthenticationForm, PasswordChangeForm,
                                        UserCreationForm)
+from django.core.files.uploadedfile import UploadedFile
 from phonenumber_field.formfields import PhoneNumberField
 
+from users.avatars import validate_avatar
+
 User = get_user_model()
 
 
@@ -127,6 +130,13 @@ class UserProfileForm(forms.ModelForm):
         phone = self.cleaned_data.get('phone')
         return phone
 
+    def clean_image(self) -> Any:
+        """Validate size, format and dimensions of a new upload."""
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            validate_avatar(image)
+        return image
+
 
 class CustomPasswordChangeForm(PasswordChangeForm):
     """Custom password change form with better styling."""
@@ -0,0 +1,60 @@
+"""
+Django management command for generating profile image avatars.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.avatars import process_avatars
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Re-encode profile images and generate square avatars'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.MEDIA_PIPELINE_WORKERS,
+            help='Number of processes resizing images'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of users processed per batch'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Process again images that already have avatars'
+        )
+
+    def handle(self, *args, **options):
+        queryset = User.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).only('image', 'image_renditions').order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(image_renditions={})
+
+        started = time.monotonic()
+        updated = rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            counts = process_avatars(batch, options['workers'])
+            updated += counts[0]
+            rendered += counts[1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Updated {updated} users, rendered {rendered} images '
+            f'in {time.monotonic() - started:.2f}s'
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_address_alter_user_city_alter_user_email_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, help_text='Square avatar files and sizes by rendition name'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import default_storage
 from django.db import models
 from phonenumber_field.modelfields import PhoneNumberField
 
@@ -28,6 +29,11 @@ class User(AbstractUser):
         default='profile_image/default.jpg',
         help_text="User's profile image"
     )
+    image_renditions = models.JSONField(
+        default=dict,
+        editable=False,
+        help_text="Square avatar files and sizes by rendition name"
+    )
     city = models.CharField(
         max_length=100,
         blank=True,
@@ -59,3 +65,20 @@ class User(AbstractUser):
         if self.image and hasattr(self.image, 'url'):
             return self.image.url
         return '/static/img/users/default.jpg'
+
+    def get_avatar(self, name: str) -> dict | None:
+        """Return URLs and size of a square avatar, if generated."""
+        rendition = (self.image_renditions or {}).get(name)
+        if not rendition:
+            return None
+        return {
+            'url': default_storage.url(rendition['jpeg']),
+            'webp_url': (default_storage.url(rendition['webp'])
+                         if rendition.get('webp') else None),
+            'size': rendition['size'],
+        }
+
+    def get_avatar_url(self, name: str) -> str:
+        """Return URL of a square avatar, falling back to the image."""
+        avatar = self.get_avatar(name)
+        return avatar['url'] if avatar else self.get_image_url
@@ -0,0 +1,11 @@
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from users.avatars import process_upload
+from users.models import User
+
+
+@receiver(pre_save, sender=User)
+def user_image_changing(sender, instance: User, **kwargs) -> None:
+    """Store new uploads re-encoded along with their avatar renditions."""
+    process_upload(instance)